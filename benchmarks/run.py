@@ -0,0 +1,266 @@
+"""
+Offline benchmarks of the public `HyperManager` query methods against a mock Hypersync client.
+
+Every method runs in its own process. The reported numbers are the rows returned per second, the peak resident
+memory added by the query and the time spent per phase of the query. The mock client caches its generated
+responses, which an untimed warm-up run fills, so the timings cover the manager alone. The memory is the peak
+resident memory of each timed run minus the resident memory before it, so the warm-up and the cached responses are
+not counted. It is measured in a separate process that returns freed memory to the system right away, so the run
+can not reuse the memory of the warm-up unmeasured. Measuring it needs the peak reset of Linux, on other platforms
+it is not reported.
+
+Usage:
+    python benchmarks/run.py --blocks 10000 --logs-per-block 10 --latency 0.05 --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import polars as pl
+
+from hypermanager.events import EventConfig
+from hypermanager.manager import HyperManager
+from hypermanager.metrics import QueryMetrics, measure_query
+from hypersync import ColumnMapping, DataType
+
+# the offline mock of the Hypersync client lives with the tests
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+from mock_client import MockHypersyncClient, ReplayHypersyncClient, tx_hash  # noqa: E402
+
+METHODS = [
+    "execute_event_query",
+    "execute_events_query",
+    "stream_event_query",
+    "get_txs",
+    "get_blocks",
+    "search_txs",
+]
+
+TRANSFER = EventConfig(
+    name="Transfer",
+    # WETH style parameter names, which do not collide with the transaction columns
+    signature="Transfer(address indexed src, address indexed dst, uint256 wad)",
+    column_mapping=ColumnMapping(decoded_log={"wad": DataType.FLOAT64}),
+)
+APPROVAL = EventConfig(
+    name="Approval",
+    signature="Approval(address indexed src, address indexed guy, uint256 wad)",
+    column_mapping=ColumnMapping(decoded_log={"wad": DataType.INTSTR}),
+)
+
+
+def _memory_status_mb(field: str) -> Optional[float]:
+    """
+    Read a memory field of /proc/self/status, such as VmRSS or VmHWM, in megabytes.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) / 2**10
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the peak resident memory of the process to its current resident memory, which is only supported on Linux.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def count_rows(result) -> int:
+    if isinstance(result, pl.DataFrame):
+        return result.height
+    if isinstance(result, dict):
+        return sum(df.height for df in result.values())
+    return 0
+
+
+async def run_method(manager: HyperManager, method: str, args) -> int:
+    """
+    Run a single query method over the benchmarked block range, returning the number of rows.
+    """
+    from_block = args.from_block
+    to_block = args.from_block + args.blocks
+    if method == "execute_event_query":
+        result = await manager.execute_event_query(
+            TRANSFER, from_block, to_block, shards=args.shards, print_time=False
+        )
+    elif method == "execute_events_query":
+        result = await manager.execute_events_query(
+            [TRANSFER, APPROVAL], from_block, to_block, shards=args.shards, print_time=False
+        )
+    elif method == "stream_event_query":
+        rows = 0
+        async for batch_df in manager.stream_event_query(TRANSFER, from_block, to_block):
+            rows += batch_df.height
+        return rows
+    elif method == "get_txs":
+        result = await manager.get_txs(
+            from_block, to_block, shards=args.shards, print_time=False
+        )
+    elif method == "get_blocks":
+        result = await manager.get_blocks(
+            from_block, to_block, shards=args.shards, print_time=False
+        )
+    elif method == "search_txs":
+        step = max(1, args.blocks // args.search_txs)
+        hashes = [tx_hash(block, 0) for block in range(from_block, to_block, step)]
+        result = await manager.search_txs(
+            hashes, from_block=from_block, to_block=to_block, print_time=False
+        )
+    else:
+        raise ValueError(f"Unknown method: {method}")
+    return count_rows(result)
+
+
+def worker(args) -> Dict:
+    """
+    Benchmark a single method in the current process.
+    """
+    if args.replay:
+        client = ReplayHypersyncClient(args.replay, latency=args.latency)
+    else:
+        client = MockHypersyncClient(
+            height=args.from_block + args.blocks,
+            logs_per_block=args.logs_per_block,
+            latency=args.latency,
+            page_blocks=args.page_blocks,
+        )
+    manager = HyperManager(
+        url="http://benchmark", client=client, binary_output=args.binary_output
+    )
+
+    # the warm-up runs fill the response cache of the mock client, so the timed runs do not include data generation
+    for _ in range(args.warmup):
+        asyncio.run(run_method(manager, args.worker, args))
+
+    runs = []
+    for _ in range(args.repeat):
+        rss_before = _memory_status_mb("VmRSS") if reset_peak_rss() else None
+        record = QueryMetrics(method=args.worker, chain=manager.chain)
+        start_time = time.perf_counter()
+        with measure_query(record):
+            rows = asyncio.run(run_method(manager, args.worker, args))
+        seconds = time.perf_counter() - start_time
+        peak_rss = _memory_status_mb("VmHWM")
+        runs.append(
+            {
+                "rows": rows,
+                "seconds": seconds,
+                "rows_per_second": rows / seconds if seconds else 0.0,
+                # the memory the run added on top of the warm-up and the cached responses
+                "peak_rss_increase_mb": (
+                    max(0.0, peak_rss - rss_before)
+                    if rss_before is not None and peak_rss is not None
+                    else None
+                ),
+                "bytes": record.bytes,
+                "pages": record.pages,
+                "phases": record.phases,
+            }
+        )
+
+    # report the fastest run, the slower ones are mostly noise from the rest of the system
+    result = min(runs, key=lambda run: run["seconds"])
+    result["method"] = args.worker
+    return result
+
+
+def format_table(results: List[Dict]) -> str:
+    phase_names = sorted({name for result in results for name in result["phases"]})
+    header = ["method", "rows", "seconds", "rows/s", "+rss MB", *phase_names]
+    rows = [
+        [
+            result["method"],
+            f"{result['rows']:,}",
+            f"{result['seconds']:.3f}",
+            f"{result['rows_per_second']:,.0f}",
+            (
+                f"{result['peak_rss_increase_mb']:.1f}"
+                if result["peak_rss_increase_mb"] is not None
+                else "n/a"
+            ),
+            *[f"{result['phases'].get(name, 0.0):.3f}" for name in phase_names],
+        ]
+        for result in results
+    ]
+    widths = [max(len(row[i]) for row in [header, *rows]) for i in range(len(header))]
+    return "\n".join(
+        "  ".join(value.rjust(width) for value, width in zip(row, widths))
+        for row in [header, *rows]
+    )
+
+
+# The Polars allocator keeps freed pages for a while, which the timed runs would reuse from the warm-up unmeasured.
+# Returning them right away slows the queries down, so it is only done in the runs that measure the memory. Polars
+# sets its own default on import, so it is overridden rather than defaulted.
+MEMORY_ENV = {**os.environ, "_RJEM_MALLOC_CONF": "dirty_decay_ms:0,muzzy_decay_ms:0"}
+
+
+def run_worker(method: str, *extra_args: str, env: Optional[Dict] = None) -> Dict:
+    """
+    Benchmark a single method in a fresh process, so the memory of one method does not affect the next.
+    """
+    output = subprocess.run(
+        [sys.executable, __file__, *sys.argv[1:], *extra_args, "--worker", method],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if output.returncode != 0:
+        sys.exit(f"{method} failed:\n{output.stderr}")
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--methods", nargs="+", default=METHODS, choices=METHODS)
+    parser.add_argument("--from-block", type=int, default=20_000_000)
+    parser.add_argument("--blocks", type=int, default=10_000)
+    parser.add_argument("--logs-per-block", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per page")
+    parser.add_argument("--page-blocks", type=int, default=10_000)
+    parser.add_argument("--shards", type=int, default=1)
+    parser.add_argument("--search-txs", type=int, default=100, help="hashes searched by search_txs")
+    parser.add_argument("--binary-output", action="store_true")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs before the timed ones")
+    parser.add_argument("--replay", help="directory of a response recorded with mock_client.save_response")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(args)))
+        return
+
+    results = []
+    for method in args.methods:
+        result = run_worker(method)
+        # the memory is measured in a separate run, see `MEMORY_ENV`
+        memory = run_worker(method, "--repeat", "1", env=MEMORY_ENV)
+        result["peak_rss_increase_mb"] = memory["peak_rss_increase_mb"]
+        results.append(result)
+
+    print(format_table(results))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,55 +1,35 @@
 import asyncio
+from dataclasses import replace
+
 import polars as pl
-from hypermanager.events import EventConfig
 from hypermanager.manager import HyperManager
 from hypermanager.protocols.mev_commit import mev_commit_config
 
 
 async def get_events():
     """
-    Fetch event logs for the UnopenedCommitmentStored event from the MEV-Commit system.
-    Demonstrates three different queries:
-    1. All historical events.
-    2. Events from a specific block onward.
-    3. Events within the most recent block range.
+    Fetch the commitment event logs from the MEV-Commit system and merge them into a single DataFrame.
+    The OpenedCommitmentStored, UnopenedCommitmentStored and CommitmentProcessed events are fetched in a
+    single query over the full history of the chain.
 
     The results are returned as Polars DataFrames and their shapes are printed.
     """
     manager = HyperManager(url="https://mev-commit.hypersync.xyz")
 
-    opened_commits_config = EventConfig(
-        name=mev_commit_config["OpenedCommitmentStored"].name,
-        signature=mev_commit_config["OpenedCommitmentStored"].signature,
-        column_mapping=mev_commit_config["OpenedCommitmentStored"].column_mapping,
-    )
-
-    unopened_commits_config = EventConfig(
-        name=mev_commit_config["UnopenedCommitmentStored"].name,
-        signature=mev_commit_config["UnopenedCommitmentStored"].signature,
-        column_mapping=mev_commit_config["UnopenedCommitmentStored"].column_mapping,
-    )
-
-    commits_processed_config = EventConfig(
-        name=mev_commit_config["CommitmentProcessed"].name,
-        signature=mev_commit_config["CommitmentProcessed"].signature,
-        column_mapping=mev_commit_config["CommitmentProcessed"].column_mapping,
-    )
-
-    # Query events using the event configuration and return the result as a Polars DataFrame
-    commit_stores: pl.DataFrame = await manager.execute_event_query(
-        opened_commits_config,
-        tx_data=True,
-    )
-
-    encrypted_stores: pl.DataFrame = await manager.execute_event_query(
-        unopened_commits_config,
-        tx_data=True,
-    )
+    # copy the full configs, so the uint256 amounts such as `bid` are still decoded exactly
+    opened_commits_config = replace(mev_commit_config["OpenedCommitmentStored"])
+    unopened_commits_config = replace(mev_commit_config["UnopenedCommitmentStored"])
+    commits_processed_config = replace(mev_commit_config["CommitmentProcessed"])
 
-    commits_processed: pl.DataFrame = await manager.execute_event_query(
-        commits_processed_config,
+    # Query all three events in a single scan, the logs are decoded per event and returned by event name
+    events = await manager.execute_events_query(
+        [opened_commits_config, unopened_commits_config, commits_processed_config],
         tx_data=True,
+        shards=8,  # fetch the full history in 8 concurrent block range shards
     )
+    commit_stores: pl.DataFrame = events[opened_commits_config.name]
+    encrypted_stores: pl.DataFrame = events[unopened_commits_config.name]
+    commits_processed: pl.DataFrame = events[commits_processed_config.name]
 
     # merge dataframes into unified one
     commitments_df = (
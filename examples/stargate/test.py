@@ -4,7 +4,7 @@ import polars as pl
 from hypermanager.events import EventConfig
 from hypermanager.networks import HyperSyncClients
 from hypermanager.schema import COMMON_TRANSACTION_MAPPING, COMMON_BLOCK_MAPPING
-from hypermanager.manager import HyperManager
+from hypermanager.clients import get_manager
 from hypersync import ColumnMapping, DataType
 
 # contracts listed on optimism - https://optimistic.etherscan.io/accounts/label/stargate
@@ -33,7 +33,8 @@ events = EventConfig(
 
 async def get_events():
     try:
-        manager = HyperManager(url=hypersync_client)
+        # reuse the shared manager of the chain instead of opening a new client per query
+        manager = get_manager(hypersync_client)
         df: pl.DataFrame = await manager.execute_event_query(
             events, tx_data=True, block_range=25_000
         )
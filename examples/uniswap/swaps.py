@@ -2,7 +2,8 @@ import asyncio
 import os
 import polars as pl
 from hypermanager.events import EventConfig
-from hypermanager.manager import HyperManager
+from hypermanager.clients import get_manager
+from hypermanager.networks import HyperSyncClients
 from hypermanager.protocols.uniswap_v3 import uniswap_config
 
 
@@ -22,7 +23,7 @@ async def get_events():
         The function skips events if they are not found or if errors occur during querying.
     """
 
-    manager = HyperManager(url="https://base.hypersync.xyz")
+    manager = get_manager(HyperSyncClients.BASE)
 
     try:
         # Query events using the event configuration and return the result as a Polars DataFrame
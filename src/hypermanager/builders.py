@@ -0,0 +1,169 @@
+import polars as pl
+from typing import Dict, Optional
+
+# Lowercase substrings of the block extra data mapped to normalized builder labels, in priority order
+BUILDER_LABELS: Dict[str, str] = {
+    "beaverbuild": "beaverbuild",
+    "titan": "titan",
+    "rsync": "rsync",
+    "illuminate dmocratize dstribute": "flashbots",
+    "flashbots": "flashbots",
+    "buildernet": "buildernet",
+    "bloxroute": "bloxroute",
+    "jetbldr": "jetbuilder",
+    "jetbuilder": "jetbuilder",
+    "penguinbuild": "penguinbuild",
+    "buildai": "buildai",
+    "lokibuilder": "loki",
+    "builder0x69": "builder0x69",
+    "bobthebuilder": "bobthebuilder",
+    "boba-builder": "boba",
+    "gambit": "gambit",
+    "eigenphi": "eigenphi",
+    "f1b.io": "f1b",
+    "eth-builder": "eth-builder",
+    "quasar": "quasar",
+    "manifold": "manifold",
+    "blocknative": "blocknative",
+    "nethermind": "nethermind",
+    "besu": "besu",
+    "erigon": "erigon",
+    "reth/": "reth",
+    "geth/": "geth",
+}
+
+
+# A continuation byte of a UTF-8 sequence, as lowercase hex
+_CONTINUATION_BYTE = "(?:[89ab][0-9a-f])"
+# A well-formed UTF-8 sequence as lowercase hex, following the byte ranges of RFC 3629
+_UTF8_SEQUENCE = "|".join(
+    [
+        "[0-7][0-9a-f]",
+        f"(?:c[2-9a-f]|d[0-9a-f]){_CONTINUATION_BYTE}",
+        f"e0[ab][0-9a-f]{_CONTINUATION_BYTE}",
+        f"(?:e[1-9a-cef]){_CONTINUATION_BYTE}{{2}}",
+        f"ed[89][0-9a-f]{_CONTINUATION_BYTE}",
+        f"f0[9ab][0-9a-f]{_CONTINUATION_BYTE}{{2}}",
+        f"f[1-3]{_CONTINUATION_BYTE}{{3}}",
+        f"f48[0-9a-f]{_CONTINUATION_BYTE}{{2}}",
+    ]
+)
+_UTF8_PATTERN = f"^(?:{_UTF8_SEQUENCE})*$"
+# Every byte decodes to the code point of the same value in Latin-1
+_LATIN1_CHARACTERS = [chr(byte) for byte in range(256)]
+# Control characters, including the C1 controls that Latin-1 bytes 0x80 to 0x9f decode to
+_CONTROL_CHARACTERS = r"[\x00-\x1f\x7f-\x9f]"
+
+
+def decode_extra_data_expr(extra_data: pl.Expr, binary: bool = False) -> pl.Expr:
+    """
+    Decodes block extra data, as prefixed hex strings or binary values, into UTF-8 or Latin-1 strings without
+    control characters.
+
+    This is the columnar version of `byte_to_string`: values that are valid UTF-8 are decoded as UTF-8 and the others
+    as Latin-1, with vectorized expressions only. Control characters, such as the zero padding of fixed-size extra
+    data, are removed.
+
+    Args:
+        extra_data (pl.Expr): The extra data of the blocks.
+        binary (bool): Whether the extra data holds binary values instead of prefixed hex strings. Defaults to False.
+
+    Returns:
+        pl.Expr: The decoded extra data, with nulls kept as nulls.
+    """
+    if binary:
+        raw = extra_data
+        hex_data = extra_data.bin.encode("hex")
+    else:
+        hex_data = extra_data.str.strip_prefix("0x").str.to_lowercase()
+        raw = hex_data.str.decode("hex")
+
+    is_utf8 = hex_data.str.contains(_UTF8_PATTERN)
+    # masked values are still validated by the cast, so they are replaced instead of nulled
+    utf8 = pl.when(is_utf8).then(raw).otherwise(pl.lit(b"")).cast(pl.String)
+    latin1 = (
+        raw.cast(pl.List(pl.UInt8))
+        .list.eval(
+            pl.element().replace_strict(
+                list(range(256)), _LATIN1_CHARACTERS, return_dtype=pl.String
+            )
+        )
+        .list.join("")
+    )
+    return pl.coalesce(pl.when(is_utf8).then(utf8), latin1).str.replace_all(
+        _CONTROL_CHARACTERS, ""
+    )
+
+
+def decode_extra_data(extra_data: pl.Series) -> pl.Series:
+    """
+    Decodes a column of block extra data, as prefixed hex strings or binary values, into UTF-8 or Latin-1 strings.
+
+    See `decode_extra_data_expr`.
+
+    Args:
+        extra_data (pl.Series): The extra data of the blocks.
+
+    Returns:
+        pl.Series: The decoded extra data, with nulls kept as nulls.
+    """
+    return extra_data.to_frame("extra_data").select(
+        decode_extra_data_expr(
+            pl.col("extra_data"), binary=extra_data.dtype == pl.Binary
+        ).alias(extra_data.name)
+    )[extra_data.name]
+
+
+def builder_label(
+    text: pl.Expr, labels: Optional[Dict[str, str]] = None
+) -> pl.Expr:
+    """
+    Maps decoded extra data to normalized builder labels, using the first label whose substring it contains.
+
+    Args:
+        text (pl.Expr): The decoded extra data.
+        labels (Optional[Dict[str, str]]): The lowercase substrings mapped to builder labels, in priority order.
+            Defaults to `BUILDER_LABELS`.
+
+    Returns:
+        pl.Expr: The builder labels, or null if no substring matches.
+    """
+    labels = BUILDER_LABELS if labels is None else labels
+    lowercase = text.str.to_lowercase()
+    return pl.coalesce(
+        pl.when(lowercase.str.contains(pattern, literal=True)).then(pl.lit(label))
+        for pattern, label in labels.items()
+    )
+
+
+def label_builders(
+    df: pl.DataFrame,
+    column: str = "extra_data",
+    labels: Optional[Dict[str, str]] = None,
+) -> pl.DataFrame:
+    """
+    Adds the decoded extra data and the normalized builder label of every block.
+
+    The extra data is decoded and labelled with vectorized expressions only, without a Python loop over the values.
+
+    Args:
+        df (pl.DataFrame): The blocks or transactions, such as the results of `get_blocks` or `get_txs`.
+        column (str): The extra data column. Defaults to "extra_data".
+        labels (Optional[Dict[str, str]]): The lowercase substrings mapped to builder labels, in priority order.
+            Defaults to `BUILDER_LABELS`.
+
+    Returns:
+        pl.DataFrame: The data with the `extra_data_text` and `builder` columns.
+
+    Raises:
+        ValueError: If the data has no extra data column.
+    """
+    if column not in df.columns:
+        raise ValueError(f"Cannot label builders without a {column} column.")
+
+    text = decode_extra_data_expr(
+        pl.col(column), binary=df.schema[column] == pl.Binary
+    )
+    return df.with_columns(text.alias("extra_data_text")).with_columns(
+        builder_label(pl.col("extra_data_text"), labels).alias("builder")
+    )
@@ -0,0 +1,327 @@
+import hashlib
+import json
+import os
+import polars as pl
+from typing import Dict, List, Optional, Tuple
+
+from dataclasses import dataclass
+
+
+@dataclass
+class EventCache:
+    """
+    A local parquet-backed cache of event query results.
+
+    Every query identity (url, event, filters and output columns) gets its own directory, holding a catalog of the
+    block intervals that are already stored and the parquet segments holding their rows. Intervals are half-open
+    `[from_block, to_block)` ranges, and adjacent or overlapping intervals are coalesced in the catalog so it stays
+    small. Every written range gets its own segment file, so an incremental refresh only writes the new rows, and
+    the segments of an interval are compacted into a single file once a query holds more than `max_segments`.
+
+    Attributes:
+        path (str): The root directory of the cache. Defaults to "cache".
+        confirmations (int): The number of most recent blocks that are never cached, since they could still be
+            reorganized. Their rows are fetched on every query instead. Defaults to 0.
+        max_segments (int): The number of segment files of a query above which they are compacted. Defaults to 32.
+    """
+
+    path: str = "cache"
+    confirmations: int = 0
+    max_segments: int = 32
+
+    @staticmethod
+    def get_key(*identity) -> str:
+        """
+        Create a cache key from the values that identify a query.
+
+        Args:
+            *identity: The values that identify the query, e.g. the url, topic0, contract and address filter.
+
+        Returns:
+            str: The hex digest identifying the query.
+        """
+        return hashlib.sha256(
+            json.dumps([str(value) for value in identity]).encode()
+        ).hexdigest()
+
+    def _query_path(self, key: str) -> str:
+        return os.path.join(self.path, key)
+
+    def _catalog_path(self, key: str) -> str:
+        return os.path.join(self._query_path(key), "catalog.json")
+
+    def _interval_path(self, key: str, interval: Tuple[int, int]) -> str:
+        return os.path.join(self._query_path(key), f"{interval[0]}_{interval[1]}.parquet")
+
+    def _read_catalog(self, key: str) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Read the catalog of a query, with its sorted `intervals` and the `segments` that hold their rows.
+        """
+        try:
+            with open(self._catalog_path(key)) as f:
+                catalog = json.load(f)
+        except FileNotFoundError:
+            return {"intervals": [], "segments": []}
+
+        intervals = sorted((start, end) for start, end in catalog["intervals"])
+        # catalogs written before segments were introduced hold one file per interval
+        segments = sorted(
+            (start, end)
+            for start, end in catalog.get("segments", catalog["intervals"])
+        )
+        return {"intervals": intervals, "segments": segments}
+
+    def get_intervals(self, key: str) -> List[Tuple[int, int]]:
+        """
+        Get the block intervals that are stored for a query, sorted by block number.
+
+        Args:
+            key (str): The cache key of the query.
+
+        Returns:
+            List[Tuple[int, int]]: The stored `[from_block, to_block)` intervals.
+        """
+        return self._read_catalog(key)["intervals"]
+
+    def _write_catalog(
+        self,
+        key: str,
+        intervals: List[Tuple[int, int]],
+        segments: List[Tuple[int, int]],
+    ) -> None:
+        """
+        Atomically replace the catalog of a query.
+        """
+        catalog_path = self._catalog_path(key)
+        with open(f"{catalog_path}.tmp", "w") as f:
+            json.dump(
+                {
+                    "intervals": [list(interval) for interval in intervals],
+                    "segments": [list(segment) for segment in segments],
+                },
+                f,
+            )
+        os.replace(f"{catalog_path}.tmp", catalog_path)
+
+    def _read_interval(
+        self, key: str, interval: Tuple[int, int]
+    ) -> Optional[pl.DataFrame]:
+        """
+        Read the rows stored in a segment, or None if the segment file does not exist.
+        """
+        interval_path = self._interval_path(key, interval)
+        if not os.path.exists(interval_path):
+            return None
+        return pl.read_parquet(interval_path)
+
+    def _write_segment(
+        self, key: str, segment: Tuple[int, int], df: pl.DataFrame
+    ) -> None:
+        """
+        Atomically write the rows of a segment.
+        """
+        segment_path = self._interval_path(key, segment)
+        df.write_parquet(f"{segment_path}.tmp")
+        os.replace(f"{segment_path}.tmp", segment_path)
+
+    def cacheable_to_block(self, to_block: int, height: int) -> int:
+        """
+        Get the end of the part of a block range that may be cached, which excludes the last `confirmations`
+        blocks of the chain.
+
+        Args:
+            to_block (int): The ending block number of the range (exclusive).
+            height (int): The current block height of the chain, the exclusive end of its blocks.
+
+        Returns:
+            int: The exclusive end of the cacheable part of the range.
+        """
+        return min(to_block, height - self.confirmations)
+
+    def get_missing_ranges(
+        self, key: str, from_block: int, to_block: int
+    ) -> List[Tuple[int, int]]:
+        """
+        Get the gaps of a block range that are not stored in the cache yet.
+
+        Args:
+            key (str): The cache key of the query.
+            from_block (int): The starting block number of the range (inclusive).
+            to_block (int): The ending block number of the range (exclusive).
+
+        Returns:
+            List[Tuple[int, int]]: The missing `[from_block, to_block)` ranges, sorted by block number.
+        """
+        missing_ranges = []
+        cursor = from_block
+        for start, end in self.get_intervals(key):
+            if end <= cursor:
+                continue
+            if start >= to_block:
+                break
+            if start > cursor:
+                missing_ranges.append((cursor, start))
+            cursor = max(cursor, end)
+
+        if cursor < to_block:
+            missing_ranges.append((cursor, to_block))
+        return missing_ranges
+
+    def read(
+        self,
+        key: str,
+        from_block: int,
+        to_block: int,
+        block_column: str = "block_number",
+    ) -> Optional[pl.DataFrame]:
+        """
+        Read the cached rows of a block range.
+
+        Args:
+            key (str): The cache key of the query.
+            from_block (int): The starting block number of the range (inclusive).
+            to_block (int): The ending block number of the range (exclusive).
+            block_column (str): The block number column of the cached rows. Defaults to "block_number".
+
+        Returns:
+            Optional[pl.DataFrame]: The cached rows in block order, or None if no rows are cached for the range.
+        """
+        dfs = []
+        for segment in self._read_catalog(key)["segments"]:
+            if segment[1] <= from_block or segment[0] >= to_block:
+                continue
+            segment_df = self._read_interval(key, segment)
+            if segment_df is not None:
+                dfs.append(
+                    segment_df.filter(
+                        pl.col(block_column).is_between(
+                            from_block, to_block, closed="left"
+                        )
+                    )
+                )
+
+        dfs = [df for df in dfs if not df.is_empty()]
+        if not dfs:
+            return None
+        return pl.concat(dfs, how="diagonal_relaxed").sort(
+            block_column, maintain_order=True
+        )
+
+    def write(
+        self,
+        key: str,
+        from_block: int,
+        to_block: int,
+        df: Optional[pl.DataFrame],
+        block_column: str = "block_number",
+    ) -> None:
+        """
+        Store the rows of a fetched block range as a new segment and add the range to the cached intervals.
+
+        Rows of the fetched range replace any previously cached rows of the same blocks, so only segments that
+        overlap the range are rewritten. Once the query holds more than `max_segments` segments, they are compacted.
+
+        Args:
+            key (str): The cache key of the query.
+            from_block (int): The starting block number of the fetched range (inclusive).
+            to_block (int): The ending block number of the fetched range (exclusive).
+            df (Optional[pl.DataFrame]): The rows of the fetched range, or None if the range holds no rows.
+            block_column (str): The block number column of the rows. Defaults to "block_number".
+        """
+        os.makedirs(self._query_path(key), exist_ok=True)
+        catalog = self._read_catalog(key)
+
+        segments = []
+        removed = []
+        for segment in catalog["segments"]:
+            if segment[1] <= from_block or segment[0] >= to_block:
+                segments.append(segment)
+            elif from_block <= segment[0] and segment[1] <= to_block:
+                removed.append(segment)
+            else:
+                # a segment that only partly overlaps the range keeps its rows outside of the range
+                segment_df = self._read_interval(key, segment)
+                if segment_df is not None:
+                    self._write_segment(
+                        key,
+                        segment,
+                        segment_df.filter(
+                            ~pl.col(block_column).is_between(
+                                from_block, to_block, closed="left"
+                            )
+                        ),
+                    )
+                segments.append(segment)
+
+        new_segment = (from_block, to_block)
+        if df is not None and not df.is_empty():
+            self._write_segment(
+                key, new_segment, df.sort(block_column, maintain_order=True)
+            )
+            segments.append(new_segment)
+
+        self._write_catalog(
+            key,
+            self._coalesce(catalog["intervals"] + [new_segment]),
+            sorted(segments),
+        )
+
+        # remove the files of the replaced segments once the catalog no longer references them
+        for segment in removed:
+            segment_path = self._interval_path(key, segment)
+            if segment not in segments and os.path.exists(segment_path):
+                os.remove(segment_path)
+
+        if len(segments) > self.max_segments:
+            self.compact(key, block_column=block_column)
+
+    @staticmethod
+    def _coalesce(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """
+        Merge adjacent and overlapping intervals.
+        """
+        coalesced: List[Tuple[int, int]] = []
+        for start, end in sorted(intervals):
+            if coalesced and start <= coalesced[-1][1]:
+                coalesced[-1] = (coalesced[-1][0], max(coalesced[-1][1], end))
+            else:
+                coalesced.append((start, end))
+        return coalesced
+
+    def compact(self, key: str, block_column: str = "block_number") -> None:
+        """
+        Merge the segments of every cached interval into a single segment file.
+
+        Args:
+            key (str): The cache key of the query.
+            block_column (str): The block number column of the rows. Defaults to "block_number".
+        """
+        catalog = self._read_catalog(key)
+        segments = []
+        removed = []
+        for interval in catalog["intervals"]:
+            interval_segments = [
+                segment
+                for segment in catalog["segments"]
+                if interval[0] <= segment[0] and segment[1] <= interval[1]
+            ]
+            if len(interval_segments) <= 1:
+                segments += interval_segments
+                continue
+
+            dfs = [self._read_interval(key, segment) for segment in interval_segments]
+            self._write_segment(
+                key,
+                interval,
+                pl.concat(
+                    [df for df in dfs if df is not None], how="diagonal_relaxed"
+                ).sort(block_column, maintain_order=True),
+            )
+            segments.append(interval)
+            removed += [segment for segment in interval_segments if segment != interval]
+
+        self._write_catalog(key, catalog["intervals"], segments)
+        for segment in removed:
+            segment_path = self._interval_path(key, segment)
+            if os.path.exists(segment_path):
+                os.remove(segment_path)
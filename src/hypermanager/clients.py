@@ -0,0 +1,145 @@
+from collections import OrderedDict
+from typing import Optional, Union
+import hypersync
+
+from dataclasses import dataclass, field
+from hypermanager.manager import HyperManager
+from hypermanager.metrics import Metrics
+from hypermanager.networks import HyperSyncClients
+
+
+@dataclass
+class ClientRegistry:
+    """
+    A registry of shared `HyperManager` instances, one per Hypersync url.
+
+    Every manager wraps a single `hypersync.HypersyncClient`, so handing out the same manager for the same url reuses
+    its connections across queries instead of paying for connection setup on every query. The least recently used
+    managers are dropped once more than `max_clients` urls are in use, and their background height refreshers are
+    stopped.
+
+    Attributes:
+        max_clients (int): The maximum number of clients kept alive at the same time. Defaults to 64.
+        api_token (Optional[str]): The API token sent with every request. Defaults to None.
+        http_req_timeout_millis (Optional[int]): The timeout of a single HTTP request in milliseconds. Defaults to
+            the client default.
+        max_num_retries (Optional[int]): The maximum number of retries of a failed request. Defaults to the client
+            default.
+        retry_backoff_ms (Optional[int]): The backoff increment between retries in milliseconds. Defaults to the
+            client default.
+        retry_base_ms (Optional[int]): The initial retry delay in milliseconds. Defaults to the client default.
+        retry_ceiling_ms (Optional[int]): The maximum retry delay in milliseconds. Defaults to the client default.
+        metrics (Optional[Metrics]): The metrics shared by every manager of the registry. Defaults to None, which
+            disables metrics.
+    """
+
+    max_clients: int = 64
+    api_token: Optional[str] = None
+    http_req_timeout_millis: Optional[int] = None
+    max_num_retries: Optional[int] = None
+    retry_backoff_ms: Optional[int] = None
+    retry_base_ms: Optional[int] = None
+    retry_ceiling_ms: Optional[int] = None
+    metrics: Optional[Metrics] = None
+    managers: "OrderedDict[str, HyperManager]" = field(
+        init=False, default_factory=OrderedDict
+    )
+
+    def _client_config(self, url: str) -> hypersync.ClientConfig:
+        """
+        Create the client configuration of a url with the limits of the registry.
+        """
+        return hypersync.ClientConfig(
+            url=url,
+            api_token=self.api_token,
+            http_req_timeout_millis=self.http_req_timeout_millis,
+            max_num_retries=self.max_num_retries,
+            retry_backoff_ms=self.retry_backoff_ms,
+            retry_base_ms=self.retry_base_ms,
+            retry_ceiling_ms=self.retry_ceiling_ms,
+        )
+
+    def get_manager(self, client: Union[str, HyperSyncClients]) -> HyperManager:
+        """
+        Get the shared manager of a Hypersync endpoint, creating it on first use.
+
+        Args:
+            client (Union[str, HyperSyncClients]): The url of the endpoint, or the network to query.
+
+        Returns:
+            HyperManager: The shared manager of the endpoint.
+        """
+        url = client.client if isinstance(client, HyperSyncClients) else client
+
+        if url in self.managers:
+            self.managers.move_to_end(url)
+            return self.managers[url]
+
+        manager = HyperManager(
+            url=url,
+            client=hypersync.HypersyncClient(self._client_config(url)),
+            metrics=self.metrics,
+        )
+        self.managers[url] = manager
+
+        # drop the least recently used clients beyond the limit, stopping their height refreshers, which would
+        # otherwise keep polling with the dropped client; another manager of the same url restarts the refresher
+        while len(self.managers) > self.max_clients:
+            _, evicted = self.managers.popitem(last=False)
+            evicted.height_cache.cancel_refresher()
+
+        return manager
+
+    def get_client(
+        self, client: Union[str, HyperSyncClients]
+    ) -> hypersync.HypersyncClient:
+        """
+        Get the shared Hypersync client of an endpoint, creating it on first use.
+
+        Args:
+            client (Union[str, HyperSyncClients]): The url of the endpoint, or the network to query.
+
+        Returns:
+            hypersync.HypersyncClient: The shared client of the endpoint.
+        """
+        return self.get_manager(client).client
+
+    async def close(self) -> None:
+        """
+        Stop the background height refreshers of the managed endpoints and release every client.
+        """
+        for manager in self.managers.values():
+            await manager.height_cache.stop_refresher()
+        self.managers.clear()
+
+    async def __aenter__(self) -> "ClientRegistry":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+_registry = ClientRegistry()
+
+
+def get_registry() -> ClientRegistry:
+    """
+    Get the process-wide client registry.
+
+    Returns:
+        ClientRegistry: The process-wide client registry.
+    """
+    return _registry
+
+
+def get_manager(client: Union[str, HyperSyncClients]) -> HyperManager:
+    """
+    Get the shared manager of a Hypersync endpoint from the process-wide client registry.
+
+    Args:
+        client (Union[str, HyperSyncClients]): The url of the endpoint, or the network to query.
+
+    Returns:
+        HyperManager: The shared manager of the endpoint.
+    """
+    return _registry.get_manager(client)
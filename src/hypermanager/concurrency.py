@@ -0,0 +1,310 @@
+import asyncio
+import random
+import re
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from dataclasses import dataclass, field
+from hypermanager.metrics import current_query
+from hypermanager.networks import HyperSyncClients
+
+T = TypeVar("T")
+
+
+@dataclass
+class TierPolicy:
+    """
+    The concurrency limits of a Hypersync service tier.
+
+    Attributes:
+        initial_concurrency (int): The number of concurrent requests allowed before any feedback.
+        max_concurrency (int): The upper bound of concurrent requests.
+        min_concurrency (int): The lower bound of concurrent requests. Defaults to 1.
+        latency_tolerance (float): How many times slower than the average latency a request may be before it counts
+            as congestion. Defaults to 2.0.
+        min_latency (float): The latency in seconds below which a request never counts as congestion. Defaults to 1.0.
+    """
+
+    initial_concurrency: int
+    max_concurrency: int
+    min_concurrency: int = 1
+    latency_tolerance: float = 2.0
+    min_latency: float = 1.0
+
+
+# Gold endpoints sustain far more parallel requests than bronze endpoints, which throttle early
+TIER_POLICIES: Dict[str, TierPolicy] = {
+    "gold": TierPolicy(initial_concurrency=8, max_concurrency=32),
+    "bronze": TierPolicy(initial_concurrency=2, max_concurrency=8),
+}
+
+# Endpoints that are not listed in `HyperSyncClients` are treated as the most restrictive tier
+DEFAULT_TIER = "bronze"
+
+# The Hypersync client raises plain exceptions, so transient failures are recognized by their message: the HTTP
+# status of a throttled or failed response, or the cause of a timed out or dropped connection
+RETRYABLE_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+RETRYABLE_MESSAGES = (
+    "timed out",
+    "timeout",
+    "connection",
+    "reset by peer",
+    "broken pipe",
+    "too many requests",
+    "internal server error",
+    "bad gateway",
+    "service unavailable",
+)
+_STATUS_CODE = re.compile(r"status(?: code)?\D{0,3}(\d{3})\b")
+
+
+@dataclass
+class RetryPolicy:
+    """
+    How failed requests are retried.
+
+    Attributes:
+        max_retries (int): The number of retries after the first attempt. Defaults to 5.
+        base_delay (float): The backoff ceiling of the first retry in seconds, doubled on every retry. Defaults to 0.5.
+        max_delay (float): The largest backoff ceiling in seconds. Defaults to 30.0.
+    """
+
+    max_retries: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    def delay(self, attempt: int) -> float:
+        """
+        Get the backoff before a retry, drawn uniformly below an exponentially growing ceiling so that concurrent
+        requests that failed together do not retry together.
+
+        Args:
+            attempt (int): The number of the retry, starting at 1.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    def is_retryable(self, error: Exception) -> bool:
+        """
+        Whether a failed request is worth retrying. Only transient failures are retried: timeouts, connection
+        errors, and throttled (429) or failed (5xx) responses. Any other error, such as an invalid query, fails the
+        same way every time and is raised right away.
+
+        Args:
+            error (Exception): The error of the failed request.
+
+        Returns:
+            bool: Whether to retry the request.
+        """
+        if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+            return True
+
+        message = str(error).lower()
+        status_code = _STATUS_CODE.search(message)
+        if status_code is not None:
+            return int(status_code.group(1)) in RETRYABLE_STATUS_CODES
+        return any(text in message for text in RETRYABLE_MESSAGES)
+
+
+@dataclass
+class ConcurrencyController:
+    """
+    An adaptive limit on the concurrent requests to a single Hypersync endpoint.
+
+    The limit starts at the tier's initial concurrency and follows additive increase, multiplicative decrease: every
+    request that completes without congestion raises the limit by one request per full window of requests, while a
+    failed request, or one much slower than the average latency, halves it. Requests that were already in flight when
+    the limit was lowered do not lower it again, so one burst of failures only counts once.
+
+    Attributes:
+        url (str): The url of the Hypersync endpoint.
+        policy (TierPolicy): The concurrency limits of the endpoint's tier.
+        retry (RetryPolicy): How failed requests are retried.
+        limit (float): The current concurrency limit.
+        in_flight (int): The number of requests currently running.
+        latency (Optional[float]): The moving average latency of successful requests in seconds.
+    """
+
+    url: str
+    policy: TierPolicy
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+    limit: float = field(init=False)
+    in_flight: int = field(init=False, default=0)
+    latency: Optional[float] = field(init=False, default=None)
+    _decreased_at: float = field(init=False, default=0.0, repr=False)
+    _waiters: Deque[asyncio.Future] = field(
+        init=False, default_factory=deque, repr=False
+    )
+
+    def __post_init__(self):
+        self.limit = float(self.policy.initial_concurrency)
+
+    @property
+    def concurrency(self) -> int:
+        """
+        The number of requests allowed to run at the same time.
+        """
+        return max(self.policy.min_concurrency, int(self.limit))
+
+    async def acquire(self) -> float:
+        """
+        Wait until a request may start.
+
+        Returns:
+            float: The monotonic start time of the request, to be passed to `release`.
+        """
+        while self.in_flight >= self.concurrency:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                else:
+                    # the slot this waiter was woken for goes to the next one
+                    self._wake()
+                raise
+        self.in_flight += 1
+        return time.monotonic()
+
+    def release(self, started_at: float, failed: bool = False) -> None:
+        """
+        Finish a request, adjusting the limit to its outcome and waking the requests waiting for a slot.
+
+        Args:
+            started_at (float): The start time returned by `acquire`.
+            failed (bool): Whether the request failed. Defaults to False.
+        """
+        self.in_flight -= 1
+        latency = time.monotonic() - started_at
+        if failed or self._is_congested(latency):
+            self._decrease(started_at)
+        else:
+            self._increase(latency)
+        self._wake()
+
+    def _is_congested(self, latency: float) -> bool:
+        return (
+            self.latency is not None
+            and latency > self.policy.min_latency
+            and latency > self.latency * self.policy.latency_tolerance
+        )
+
+    def _increase(self, latency: float) -> None:
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = 0.8 * self.latency + 0.2 * latency
+        self.limit = min(
+            self.policy.max_concurrency, self.limit + 1 / self.concurrency
+        )
+
+    def _decrease(self, started_at: float) -> None:
+        # requests issued before the last decrease were issued under the old limit
+        if started_at < self._decreased_at:
+            return
+        self.limit = max(self.policy.min_concurrency, self.limit / 2)
+        self._decreased_at = time.monotonic()
+
+    def _wake(self) -> None:
+        for _ in range(self.concurrency - self.in_flight):
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                # waiters of an event loop that has since been closed are dropped
+                if not waiter.done() and not waiter.get_loop().is_closed():
+                    waiter.set_result(None)
+                    break
+
+    async def backoff(self, attempt: int, error: Exception) -> None:
+        """
+        Wait before retrying a failed request, or raise the error if it should not be retried.
+
+        The retry is counted in the metrics of the running query.
+
+        Args:
+            attempt (int): The number of the retry, starting at 1.
+            error (Exception): The error of the failed request.
+
+        Raises:
+            Exception: The error of the failed request, once the retries are exhausted or if it is not retryable.
+        """
+        if attempt > self.retry.max_retries or not self.retry.is_retryable(error):
+            raise error
+
+        record = current_query()
+        if record is not None:
+            record.retries += 1
+        await asyncio.sleep(self.retry.delay(attempt))
+
+    async def call(self, request: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a request once a slot is free, retrying it with jittered exponential backoff if it fails.
+
+        The request is called again on every retry, so a request that keeps track of its progress resumes where the
+        failed attempt stopped.
+
+        Args:
+            request (Callable[[], Awaitable[T]]): Starts the request.
+
+        Returns:
+            T: The result of the request.
+        """
+        attempt = 0
+        while True:
+            started_at = await self.acquire()
+            try:
+                result = await request()
+            except Exception as error:
+                self.release(started_at, failed=True)
+                attempt += 1
+                await self.backoff(attempt, error)
+                continue
+            except BaseException:
+                # a cancelled request says nothing about the endpoint
+                self.in_flight -= 1
+                self._wake()
+                raise
+            self.release(started_at)
+            return result
+
+
+def get_tier(url: str) -> str:
+    """
+    Get the service tier of a Hypersync endpoint.
+
+    Args:
+        url (str): The url of the Hypersync endpoint.
+
+    Returns:
+        str: The tier of the endpoint, or `DEFAULT_TIER` if the endpoint is not a known network.
+    """
+    for network in HyperSyncClients:
+        if network.client == url.rstrip("/"):
+            return network.tier
+    return DEFAULT_TIER
+
+
+_controllers: Dict[str, ConcurrencyController] = {}
+
+
+def get_controller(url: str) -> ConcurrencyController:
+    """
+    Get the concurrency controller of a Hypersync endpoint, shared by every `HyperManager` pointing at the same url so
+    that they adapt to the endpoint together.
+
+    Args:
+        url (str): The url of the Hypersync endpoint.
+
+    Returns:
+        ConcurrencyController: The shared concurrency controller of the endpoint.
+    """
+    if url not in _controllers:
+        _controllers[url] = ConcurrencyController(
+            url=url, policy=TIER_POLICIES[get_tier(url)]
+        )
+    return _controllers[url]
@@ -0,0 +1,245 @@
+import os
+import uuid
+import polars as pl
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from typing import List, Optional, Union
+
+from dataclasses import dataclass
+
+
+@dataclass
+class DatasetWriter:
+    """
+    Writes query results into a hive-partitioned parquet dataset.
+
+    Rows are laid out as `<path>/chain=<chain>/event=<event>/block_bucket=<bucket>/part-<min>-<max>-<id>.parquet`,
+    where the bucket is the block number divided by `bucket_size`. Every write adds new part files, named after the
+    minimum and maximum block number they hold, and never rewrites existing ones. Each file is written to a temporary
+    name and renamed into place, so readers and concurrent writers never see partially written files. Binary
+    addresses and hashes are stored as `FixedSizeBinary` columns.
+
+    Attributes:
+        path (str): The root directory of the dataset. Defaults to "data".
+        bucket_size (int): The number of blocks per `block_bucket` partition. Defaults to 100,000.
+        row_group_size (Optional[int]): The number of rows per parquet row group. Defaults to the Polars default.
+        compression (str): The parquet compression codec. Defaults to "zstd".
+        max_rows_per_file (int): The number of streamed rows buffered before they are written as part files.
+            Defaults to 1,000,000.
+    """
+
+    path: str = "data"
+    bucket_size: int = 100_000
+    row_group_size: Optional[int] = None
+    compression: str = "zstd"
+    max_rows_per_file: int = 1_000_000
+
+    def partition_path(self, chain: Union[str, int], event: str, bucket: int) -> str:
+        """
+        Get the directory of a partition.
+
+        Args:
+            chain (Union[str, int]): The chain of the partition.
+            event (str): The event name, or the table name such as "transactions" or "blocks".
+            bucket (int): The block bucket of the partition.
+
+        Returns:
+            str: The directory of the partition.
+        """
+        return os.path.join(
+            self.path, f"chain={chain}", f"event={event}", f"block_bucket={bucket}"
+        )
+
+    def _write_file(self, df: pl.DataFrame, file_path: str) -> None:
+        """
+        Write a single part file with statistics.
+
+        Binary columns whose values all have the same length, such as addresses and hashes, are stored as
+        `FixedSizeBinary`, which Polars can not write itself, so they are written with pyarrow.
+        """
+        if pl.Binary not in df.schema.dtypes():
+            df.write_parquet(
+                file_path,
+                compression=self.compression,
+                row_group_size=self.row_group_size,
+                statistics=True,
+            )
+            return
+
+        table = df.to_arrow()
+        for name, dtype in df.schema.items():
+            if dtype != pl.Binary:
+                continue
+            lengths = pc.min_max(pc.binary_length(table[name]))
+            size = lengths["min"].as_py()
+            if size and size == lengths["max"].as_py():
+                table = table.set_column(
+                    table.schema.get_field_index(name),
+                    name,
+                    table[name].cast(pa.large_binary()).cast(pa.binary(size)),
+                )
+
+        pq.write_table(
+            table,
+            file_path,
+            compression=self.compression,
+            row_group_size=self.row_group_size,
+            write_statistics=True,
+        )
+
+    def write(
+        self,
+        df: pl.DataFrame,
+        chain: Union[str, int],
+        event: str,
+        block_column: str = "block_number",
+    ) -> List[str]:
+        """
+        Append rows to the dataset, adding one part file per block bucket they fall into.
+
+        Args:
+            df (pl.DataFrame): The rows to append.
+            chain (Union[str, int]): The chain the rows were queried from.
+            event (str): The event name, or the table name such as "transactions" or "blocks".
+            block_column (str): The block number column of the rows. Defaults to "block_number".
+
+        Returns:
+            List[str]: The paths of the written part files.
+
+        Raises:
+            ValueError: If the rows have no block number column.
+        """
+        if block_column not in df.columns:
+            raise ValueError(f"Cannot partition data without a {block_column} column.")
+        if df.is_empty():
+            return []
+
+        bucketed_df = df.with_columns(
+            (pl.col(block_column) // self.bucket_size).alias("__block_bucket")
+        )
+
+        written_paths = []
+        for (bucket,), bucket_df in bucketed_df.group_by(
+            "__block_bucket", maintain_order=True
+        ):
+            bucket_df = bucket_df.drop("__block_bucket").sort(
+                block_column, maintain_order=True
+            )
+            partition_path = self.partition_path(chain, event, bucket)
+            os.makedirs(partition_path, exist_ok=True)
+
+            min_block, max_block = (
+                bucket_df[block_column].min(),
+                bucket_df[block_column].max(),
+            )
+            file_path = os.path.join(
+                partition_path,
+                f"part-{min_block}-{max_block}-{uuid.uuid4().hex[:12]}.parquet",
+            )
+            self._write_file(bucket_df, f"{file_path}.tmp")
+            os.replace(f"{file_path}.tmp", file_path)
+            written_paths.append(file_path)
+
+        return written_paths
+
+    def files(
+        self,
+        chain: Optional[Union[str, int]] = None,
+        event: Optional[str] = None,
+        from_block: Optional[int] = None,
+        to_block: Optional[int] = None,
+    ) -> List[str]:
+        """
+        List the part files that can hold rows of the given chain, event and block range.
+
+        Partitions and files outside of the range are pruned using the bucket directories and the block range in
+        the file names, without opening any file.
+
+        Args:
+            chain (Optional[Union[str, int]]): The chain to list. Defaults to every chain.
+            event (Optional[str]): The event to list. Defaults to every event.
+            from_block (Optional[int]): The starting block number of the range (inclusive). Defaults to the first block.
+            to_block (Optional[int]): The ending block number of the range (exclusive). Defaults to the last block.
+
+        Returns:
+            List[str]: The paths of the matching part files.
+        """
+
+        def partitions(directory: str, key: str, value) -> List[str]:
+            if not os.path.isdir(directory):
+                return []
+            return [
+                os.path.join(directory, name)
+                for name in sorted(os.listdir(directory))
+                if name.startswith(f"{key}=")
+                and (value is None or name == f"{key}={value}")
+            ]
+
+        file_paths = []
+        for chain_path in partitions(self.path, "chain", chain):
+            for event_path in partitions(chain_path, "event", event):
+                for bucket_path in partitions(event_path, "block_bucket", None):
+                    bucket = int(bucket_path.rsplit("=", 1)[1])
+                    bucket_start = bucket * self.bucket_size
+                    bucket_end = bucket_start + self.bucket_size
+                    if from_block is not None and bucket_end <= from_block:
+                        continue
+                    if to_block is not None and bucket_start >= to_block:
+                        continue
+
+                    for name in sorted(os.listdir(bucket_path)):
+                        if not name.startswith("part-") or not name.endswith(
+                            ".parquet"
+                        ):
+                            continue
+                        _, min_block, max_block, _ = name.split("-")
+                        if from_block is not None and int(max_block) < from_block:
+                            continue
+                        if to_block is not None and int(min_block) >= to_block:
+                            continue
+                        file_paths.append(os.path.join(bucket_path, name))
+
+        return file_paths
+
+    def scan(
+        self,
+        chain: Optional[Union[str, int]] = None,
+        event: Optional[str] = None,
+        from_block: Optional[int] = None,
+        to_block: Optional[int] = None,
+        block_column: str = "block_number",
+    ) -> Optional[pl.LazyFrame]:
+        """
+        Lazily scan the rows of the given chain, event and block range, only opening the partitions that can hold
+        them.
+
+        Args:
+            chain (Optional[Union[str, int]]): The chain to scan. Defaults to every chain.
+            event (Optional[str]): The event to scan. Defaults to every event.
+            from_block (Optional[int]): The starting block number of the range (inclusive). Defaults to the first block.
+            to_block (Optional[int]): The ending block number of the range (exclusive). Defaults to the last block.
+            block_column (str): The block number column of the rows. Defaults to "block_number".
+
+        Returns:
+            Optional[pl.LazyFrame]: The rows with the `chain`, `event` and `block_bucket` partition columns, or None
+                if no files match.
+        """
+        file_paths = self.files(chain, event, from_block, to_block)
+        if not file_paths:
+            return None
+
+        lazy_df = pl.scan_parquet(
+            file_paths,
+            hive_partitioning=True,
+            hive_schema={
+                "chain": pl.String,
+                "event": pl.String,
+                "block_bucket": pl.Int64,
+            },
+        )
+        if from_block is not None:
+            lazy_df = lazy_df.filter(pl.col(block_column) >= from_block)
+        if to_block is not None:
+            lazy_df = lazy_df.filter(pl.col(block_column) < to_block)
+        return lazy_df
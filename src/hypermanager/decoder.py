@@ -0,0 +1,402 @@
+import re
+import polars as pl
+from typing import Dict, List, Optional, Tuple
+
+from dataclasses import dataclass
+from hypersync import DataType
+from hypermanager.uint256 import hex_to_uint256, uint256_to_int_string
+
+# Number of hex characters in a single 32 byte ABI word
+WORD_SIZE = 64
+
+STATIC_TYPE_PATTERN = re.compile(r"^(address|bool|u?int(\d*)|bytes(\d+))$")
+
+# The bits and signedness of the integer data types of the column mapping
+INTEGER_DATA_TYPES = {
+    DataType.UINT64: (64, False),
+    DataType.INT64: (64, True),
+    DataType.UINT32: (32, False),
+    DataType.INT32: (32, True),
+}
+
+
+@dataclass
+class EventParam:
+    """
+    A single parameter of an event signature.
+
+    Attributes:
+        name (str): The name of the parameter.
+        type (str): The canonical ABI type of the parameter, e.g. `uint256` or `address`.
+        indexed (bool): Whether the parameter is stored in the log topics.
+    """
+
+    name: str
+    type: str
+    indexed: bool = False
+
+    @property
+    def is_static(self) -> bool:
+        """
+        Whether the parameter is an elementary type that is encoded in a single ABI word.
+        """
+        return STATIC_TYPE_PATTERN.match(self.type) is not None
+
+    @property
+    def is_integer(self) -> bool:
+        """
+        Whether the parameter is a signed or unsigned integer.
+        """
+        return re.match(r"^u?int\d*$", self.type) is not None
+
+    @property
+    def is_signed(self) -> bool:
+        """
+        Whether the parameter is a signed integer.
+        """
+        return self.type.startswith("int")
+
+
+def _split_params(params: str) -> List[str]:
+    """
+    Split the parameter list of a signature on the commas that are not nested inside a tuple.
+    """
+    parts, depth, current = [], 0, ""
+    for char in params:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+        else:
+            current += char
+
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def parse_event_signature(signature: str) -> Tuple[str, List[EventParam]]:
+    """
+    Parse an event signature such as `Transfer(address indexed from, address indexed to, uint256 value)`.
+
+    Args:
+        signature (str): The human-readable event signature.
+
+    Returns:
+        Tuple[str, List[EventParam]]: The event name and its parameters in declaration order.
+
+    Raises:
+        ValueError: If the signature is malformed.
+    """
+    signature = signature.strip()
+    if "(" not in signature or not signature.endswith(")"):
+        raise ValueError(f"Invalid event signature: {signature}")
+
+    name, params = signature.split("(", 1)
+    params = params[:-1]
+
+    event_params = []
+    for i, param in enumerate(_split_params(params)):
+        tokens = param.split()
+        param_type = tokens[0]
+        # canonicalize the integer aliases
+        if param_type in ("uint", "int"):
+            param_type += "256"
+        indexed = "indexed" in tokens[1:]
+        names = [token for token in tokens[1:] if token != "indexed"]
+        event_params.append(
+            EventParam(
+                name=names[0] if names else f"param{i}",
+                type=param_type,
+                indexed=indexed,
+            )
+        )
+
+    return name.strip(), event_params
+
+
+def can_decode(
+    signature: str, decoded_log_mapping: Optional[Dict[str, DataType]] = None
+) -> bool:
+    """
+    Check whether `decode_logs` decodes the logs of an event exactly like the Hypersync client does.
+
+    Non-indexed tuple, array and other dynamic parameters besides `bytes` and `string` are not supported, and
+    neither are the decimal data types, since Polars decimals are limited to a precision of 38 digits.
+
+    Args:
+        signature (str): The human-readable event signature.
+        decoded_log_mapping (Optional[Dict[str, DataType]]): The data types of the decoded integer columns, as in
+            `hypersync.ColumnMapping.decoded_log`.
+
+    Returns:
+        bool: Whether the logs of the event can be decoded with `decode_logs`.
+    """
+    _, params = parse_event_signature(signature)
+    decoded_log_mapping = decoded_log_mapping or {}
+    for param in params:
+        if (
+            not param.indexed
+            and not param.is_static
+            and param.type not in ("bytes", "string")
+        ):
+            return False
+        if decoded_log_mapping.get(param.name) in (
+            DataType.DECIMAL128,
+            DataType.DECIMAL256,
+        ):
+            return False
+    return True
+
+
+def _word(hex_col: pl.Expr, start: pl.Expr | int) -> pl.Expr:
+    """
+    Slice a single ABI word out of a prefixed hex string column, returning null if the word is out of bounds.
+    """
+    word = hex_col.str.slice(start, WORD_SIZE)
+    return pl.when(word.str.len_chars() == WORD_SIZE).then(word)
+
+
+def _hex_to_int(hex_word: pl.Expr) -> pl.Expr:
+    """
+    Convert a hex string of at most 8 characters (32 bits) into an Int64.
+    """
+    return hex_word.str.to_integer(base=16, strict=False)
+
+
+def _word_to_uint64(word: pl.Expr) -> pl.Expr:
+    """
+    Convert the low 64 bits of an ABI word into a UInt64.
+    """
+    high = _hex_to_int(word.str.slice(48, 8)).cast(pl.UInt64)
+    low = _hex_to_int(word.str.slice(56, 8)).cast(pl.UInt64)
+    return high * (2**32) + low
+
+
+def _fits_integer(word: pl.Expr, param: EventParam, data_type: DataType) -> pl.Expr:
+    """
+    Check whether an integer ABI word fits into an integer data type of the column mapping. The Hypersync client
+    fails on values that do not fit instead of truncating them.
+    """
+    bits, signed = INTEGER_DATA_TYPES[data_type]
+    high = word.str.slice(0, WORD_SIZE - bits // 4)
+    top = word.str.slice(WORD_SIZE - bits // 4, 1)
+    is_positive = high == "0" * (WORD_SIZE - bits // 4)
+    if not signed:
+        # negative values of signed parameters have their high bits set too
+        return is_positive
+    fits = is_positive & top.is_in(list("01234567"))
+    if param.is_signed:
+        is_negative = high == "f" * (WORD_SIZE - bits // 4)
+        fits = fits | is_negative & top.is_in(list("89abcdef"))
+    return fits
+
+
+def _word_to_float(word: pl.Expr, signed: bool) -> pl.Expr:
+    """
+    Convert an ABI word into a Float64, interpreting it as a two's complement number if it is signed.
+    """
+    value = pl.lit(0.0, dtype=pl.Float64)
+    # magnitude of the two's complement, computed from the inverted limbs to avoid cancellation errors
+    negated_value = pl.lit(1.0, dtype=pl.Float64)
+    for i in range(0, WORD_SIZE, 8):
+        limb = _hex_to_int(word.str.slice(i, 8))
+        scale = float(2 ** (4 * (WORD_SIZE - 8 - i)))
+        value = value + limb.cast(pl.Float64) * scale
+        negated_value = negated_value + (0xFFFFFFFF - limb).cast(pl.Float64) * scale
+
+    if signed:
+        is_negative = word.str.slice(0, 1).is_in(list("89abcdefABCDEF"))
+        value = pl.when(is_negative).then(-negated_value).otherwise(value)
+    return value
+
+
+def _word_to_int_string(word: pl.Expr, signed: bool) -> pl.Expr:
+    """
+    Convert an ABI word into its exact decimal string representation.
+    """
+    return uint256_to_int_string(hex_to_uint256(word), signed=signed)
+
+
+def _decode_integer(
+    word: pl.Expr, param: EventParam, data_type: Optional[DataType]
+) -> pl.Expr:
+    """
+    Decode an integer ABI word into the data type of the column mapping.
+
+    Without a mapping the value is returned as the prefixed hex of its 32 byte big-endian representation, which
+    matches the output of the Hypersync client.
+    """
+    if data_type is None:
+        return pl.lit("0x") + word
+    if data_type == DataType.UINT64:
+        return _word_to_uint64(word)
+    if data_type == DataType.INT64:
+        return _word_to_uint64(word).reinterpret(signed=True)
+    if data_type in (DataType.UINT32, DataType.INT32):
+        value = _hex_to_int(word.str.slice(56, 8))
+        if data_type == DataType.INT32:
+            value = pl.when(value >= 2**31).then(value - 2**32).otherwise(value)
+            return value.cast(pl.Int32)
+        return value.cast(pl.UInt32)
+    if data_type == DataType.FLOAT64:
+        return _word_to_float(word, param.is_signed)
+    if data_type == DataType.FLOAT32:
+        return _word_to_float(word, param.is_signed).cast(pl.Float32)
+    if data_type == DataType.INTSTR:
+        return _word_to_int_string(word, param.is_signed)
+    raise ValueError(f"Unsupported data type for {param.name}: {data_type}")
+
+
+def _decode_static(
+    word: pl.Expr, param: EventParam, data_type: Optional[DataType]
+) -> pl.Expr:
+    """
+    Decode a static ABI word into a column.
+    """
+    if param.type == "address":
+        return pl.lit("0x") + word.str.slice(24, 40)
+    if param.type == "bool":
+        return word.str.slice(WORD_SIZE - 1, 1) == "1"
+    if param.is_integer:
+        return _decode_integer(word, param, data_type)
+
+    # fixed size bytes are left aligned
+    size = int(param.type[len("bytes") :])
+    return pl.lit("0x") + word.str.slice(0, size * 2)
+
+
+def _decode_dynamic(data: pl.Expr, head: int) -> pl.Expr:
+    """
+    Slice the hex content of a dynamic `bytes` or `string` parameter out of the data column.
+
+    The head word of the parameter holds the byte offset of its tail, which starts with the length of the content.
+    """
+    offset = _hex_to_int(_word(data, head).str.slice(WORD_SIZE - 8, 8))
+    tail = 2 + offset * 2
+    length = _hex_to_int(_word(data, tail).str.slice(WORD_SIZE - 8, 8))
+    return data.str.slice(tail + WORD_SIZE, length * 2)
+
+
+def _hex_to_utf8(content: pl.Series) -> pl.Series:
+    """
+    Convert a column of hex strings into UTF-8 strings, replacing invalid byte sequences.
+    """
+    content = content.str.decode("hex", strict=False)
+    try:
+        return content.cast(pl.String)
+    except pl.exceptions.PolarsError:
+        return content.map_elements(
+            lambda value: value.decode("utf-8", errors="replace"),
+            return_dtype=pl.String,
+        )
+
+
+def decode_logs(
+    logs_df: pl.DataFrame,
+    signature: str,
+    decoded_log_mapping: Optional[Dict[str, DataType]] = None,
+) -> pl.DataFrame:
+    """
+    Decode raw event logs into one column per event parameter, using vectorized Polars expressions.
+
+    The logs must contain the `topic1`, `topic2`, `topic3` and `data` columns, either as prefixed hex strings or as
+    binary columns. Static parameters, `bytes` and `string` are decoded; indexed dynamic parameters are returned as
+    their topic hash. When the logs are binary, addresses, hashes, bytes and unmapped integers are returned as
+    binary columns too. Use `can_decode` to check whether the logs of an event can be decoded.
+
+    Args:
+        logs_df (pl.DataFrame): The raw logs to decode, all emitted by the given event.
+        signature (str): The human-readable event signature.
+        decoded_log_mapping (Optional[Dict[str, DataType]]): The data types of the decoded integer columns, as in
+            `hypersync.ColumnMapping.decoded_log`.
+
+    Returns:
+        pl.DataFrame: The decoded logs, with one row per log.
+
+    Raises:
+        ValueError: If the event has a non-indexed parameter type or a data type that is not supported, or if a
+            value does not fit the integer data type of its column.
+    """
+    _, params = parse_event_signature(signature)
+    decoded_log_mapping = decoded_log_mapping or {}
+
+    # binary logs are decoded as hex and the byte columns are converted back to binary afterwards
+    raw_columns = ["topic1", "topic2", "topic3", "data"]
+    binary_columns = [
+        name for name in raw_columns if logs_df.schema.get(name) == pl.Binary
+    ]
+    if binary_columns:
+        logs_df = logs_df.with_columns(
+            (pl.lit("0x") + pl.col(name).bin.encode("hex")).alias(name)
+            for name in binary_columns
+        )
+
+    columns = []
+    integer_checks = []
+    string_columns = []
+    byte_columns = []
+    topic_index = 1
+    head = 2  # skip the "0x" prefix of the data column
+    for param in params:
+        data_type = decoded_log_mapping.get(param.name)
+        word = None
+        if param.indexed:
+            topic = pl.col(f"topic{topic_index}")
+            topic_index += 1
+            if param.is_static:
+                word = _word(topic, 2)
+                column = _decode_static(word, param, data_type)
+            else:
+                # indexed dynamic parameters are stored as the keccak hash of their value
+                column = topic
+        elif param.is_static:
+            word = _word(pl.col("data"), head)
+            column = _decode_static(word, param, data_type)
+            head += WORD_SIZE
+        elif param.type in ("bytes", "string"):
+            column = _decode_dynamic(pl.col("data"), head)
+            if param.type == "bytes":
+                column = pl.lit("0x") + column
+            else:
+                string_columns.append(param.name)
+            head += WORD_SIZE
+        else:
+            raise ValueError(
+                f"Unsupported event parameter type for {param.name}: {param.type}"
+            )
+        columns.append(column.alias(param.name))
+        if word is not None and param.is_integer and data_type in INTEGER_DATA_TYPES:
+            fits = _fits_integer(word, param, data_type).fill_null(True)
+            integer_checks.append(fits.all().alias(param.name))
+
+        # addresses, hashes, bytes and unmapped integers are hex encoded byte values
+        if (
+            (param.indexed and not param.is_static)
+            or param.type == "address"
+            or param.type.startswith("bytes")
+            or (param.is_integer and data_type is None)
+        ):
+            byte_columns.append(param.name)
+
+    # values that do not fit their integer data type fail like in the Hypersync client, instead of being truncated
+    if integer_checks:
+        for name, fits in logs_df.select(integer_checks).row(0, named=True).items():
+            if not fits:
+                raise ValueError(
+                    f"Values of {name} do not fit {decoded_log_mapping[name]}"
+                )
+
+    decoded_df = logs_df.select(columns)
+    if string_columns:
+        decoded_df = decoded_df.with_columns(
+            _hex_to_utf8(decoded_df[name]).alias(name) for name in string_columns
+        )
+    if binary_columns and byte_columns:
+        decoded_df = decoded_df.with_columns(
+            pl.col(name).str.slice(2).str.decode("hex") for name in byte_columns
+        )
+    return decoded_df
@@ -1,10 +1,44 @@
+import functools
+import inspect
+import logging
 import time
 from typing import Callable, Awaitable
 
+import polars as pl
+
+from hypermanager.metrics import QueryMetrics, measure_query
+
+logger = logging.getLogger("hypermanager")
+
+
+def _count_rows(result) -> int:
+    """
+    Count the rows of a query result, which is a DataFrame, a dict of DataFrames or None.
+    """
+    if isinstance(result, pl.DataFrame):
+        return result.height
+    if isinstance(result, dict):
+        return sum(df.height for df in result.values() if df is not None)
+    return 0
+
+
+def _event_label(arguments: dict) -> str:
+    """
+    Get the event label of a query from the arguments of the query method.
+    """
+    if arguments.get("event_config") is not None:
+        return arguments["event_config"].name
+    if arguments.get("event_configs"):
+        return ",".join(event_config.name for event_config in arguments["event_configs"])
+    return ""
+
 
 def timer(func: Callable[..., Awaitable[None]]) -> Callable[..., Awaitable[None]]:
     """
-    A decorator to measure and print the execution time of an asynchronous function.
+    A decorator to measure the execution time of an asynchronous `HyperManager` query method.
+
+    The execution time is logged at `INFO` level to the "hypermanager" logger unless the method is called with
+    `print_time=False`. If the manager has `metrics` enabled, the rows, bytes, server pages and time per phase of the query are recorded as well.
 
     Args:
         func (Callable[..., Awaitable[None]]): The asynchronous function to measure.
@@ -12,15 +46,34 @@ def timer(func: Callable[..., Awaitable[None]]) -> Callable[..., Awaitable[None]
     Returns:
         Callable[..., Awaitable[None]]: The wrapped function with timing functionality.
     """
+    signature = inspect.signature(func)
 
-    async def wrapper(*args, **kwargs):
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
         print_time = kwargs.pop("print_time", True)
         start_time = time.time()
-        result = await func(*args, **kwargs)
+        if self.metrics is None:
+            result = await func(self, *args, **kwargs)
+        else:
+            arguments = signature.bind_partial(self, *args, **kwargs).arguments
+            record = QueryMetrics(
+                method=func.__name__,
+                chain=self.chain,
+                event=_event_label(arguments),
+            )
+            try:
+                with measure_query(record):
+                    result = await func(self, *args, **kwargs)
+                    record.rows += _count_rows(result)
+            finally:
+                self.metrics.record(record)
         end_time = time.time()
         if print_time:
-            print(f"{func.__name__} query finished in {
-                  end_time - start_time:.2f} seconds.")
+            logger.info(
+                "%s query finished in %.2f seconds.",
+                func.__name__,
+                end_time - start_time,
+            )
         return result
 
     return wrapper
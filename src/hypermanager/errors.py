@@ -0,0 +1,7 @@
+class NoDataError(ValueError):
+    """
+    Raised when a query completes but returns no rows for the requested block range.
+
+    It subclasses `ValueError`, which queries raised before, so existing handlers keep working, while callers that
+    only want to skip empty ranges can catch it without hiding invalid queries.
+    """
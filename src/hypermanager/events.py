@@ -1,9 +1,24 @@
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional
 import hypersync
 from dataclasses import dataclass
 from hypermanager.schema import COMMON_TRANSACTION_MAPPING, COMMON_BLOCK_MAPPING
 
 
+@lru_cache(maxsize=None)
+def signature_to_topic0(signature: str) -> str:
+    """
+    Hashes an event signature into its topic0, once per distinct signature.
+
+    Args:
+        signature (str): The event signature.
+
+    Returns:
+        str: The topic0 of the event.
+    """
+    return hypersync.signature_to_topic0(signature)
+
+
 @dataclass
 class EventConfig:
     """
@@ -20,12 +35,16 @@ class EventConfig:
             no contract address is required or used. Defaults to None.
         column_mapping (Optional[hypersync.ColumnMapping]): A mapping of columns for
             transaction and block data. Defaults to a common column mapping if not provided.
+        uint256_columns (Optional[List[str]]): The integer parameters returned as exact
+            `uint256.UINT256` limb structs, such as token amounts. They must not be mapped in the
+            decoded log column mapping. Defaults to None.
     """
 
     name: str
     signature: str
     contract: Optional[str] = None
     column_mapping: Optional[hypersync.ColumnMapping] = None
+    uint256_columns: Optional[List[str]] = None
 
     def __post_init__(self):
         """
@@ -34,10 +53,22 @@ class EventConfig:
         This method is called automatically after the dataclass is initialized. If
         the `column_mapping` attribute is `None`, it will be assigned a default column
         mapping consisting of common transaction and block field mappings.
+
+        Raises:
+            ValueError: If a uint256 column is also mapped in the decoded log column mapping.
         """
         if self.column_mapping is None:
             self.column_mapping = self.get_default_column_mapping()
 
+        # the uint256 columns are converted from the raw integers, which are only returned when left unmapped
+        mapped = set(self.uint256_columns or []) & set(
+            self.column_mapping.decoded_log or {}
+        )
+        if mapped:
+            raise ValueError(
+                f"The uint256 columns of {self.name} must not be mapped: {sorted(mapped)}"
+            )
+
         # Ensure contract is lowercase if it is not None
         if self.contract is not None:
             self.contract = self.contract.lower()
@@ -47,12 +78,13 @@ class EventConfig:
         Retrieves the topic (hashed signature) of the event for use in event filtering.
 
         This method converts the event signature into its corresponding topic hash
-        using `hypersync.signature_to_topic0`.
+        using `hypersync.signature_to_topic0`. Every signature is hashed only once, so
+        building queries never hashes the same signature again.
 
         Returns:
             str: The topic (hashed signature) of the event.
         """
-        return hypersync.signature_to_topic0(self.signature)
+        return signature_to_topic0(self.signature)
 
     @staticmethod
     def get_default_column_mapping() -> hypersync.ColumnMapping:
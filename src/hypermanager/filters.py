@@ -0,0 +1,236 @@
+import itertools
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar, Union
+import hypersync
+
+from hypermanager.helpers import address_to_topic
+
+T = TypeVar("T")
+
+# The most addresses and topic values held by a single log selection, larger sets are split over several selections
+MAX_ADDRESSES_PER_SELECTION = 1000
+MAX_TOPICS_PER_SELECTION = 1000
+# The most log selections sent in a single query, larger sets of selections are split over concurrent queries
+MAX_SELECTIONS_PER_QUERY = 32
+
+AddressLike = Union[str, bytes, Enum]
+TopicLike = Union[str, bytes, int, Enum]
+
+
+def normalize_address(address: AddressLike) -> str:
+    """
+    Normalize an address, as a prefixed hex string in any case, raw bytes or an enum of addresses such as
+    `protocols.across.SpokePoolAddresses`, to a lowercase prefixed hex string.
+
+    Args:
+        address (AddressLike): The address.
+
+    Returns:
+        str: The lowercase prefixed hex address.
+
+    Raises:
+        ValueError: If the value is not a 20 byte address.
+    """
+    if isinstance(address, Enum):
+        address = address.value
+    if isinstance(address, bytes):
+        address = "0x" + address.hex()
+    if not isinstance(address, str) or len(address) != 42 or address[:2] != "0x":
+        raise ValueError(f"Invalid address: {address!r}")
+    try:
+        bytes.fromhex(address[2:])
+    except ValueError:
+        raise ValueError(f"Invalid address: {address!r}") from None
+    return address.lower()
+
+
+def normalize_topic_value(value: TopicLike) -> str:
+    """
+    Normalize an indexed topic value to a lowercase prefixed 32 byte hex string. Addresses are left padded like
+    `helpers.address_to_topic` and integers are encoded as 32 byte big endian words.
+
+    Args:
+        value (TopicLike): The topic value, as a hex string, raw bytes, an address or a non-negative integer.
+
+    Returns:
+        str: The lowercase prefixed hex topic.
+
+    Raises:
+        ValueError: If the value is neither a 32 byte topic, an address nor a 256 bit unsigned integer.
+    """
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, int):
+        if not 0 <= value < 2**256:
+            raise ValueError(f"Invalid topic value: {value!r}")
+        return f"0x{value:064x}"
+    if isinstance(value, bytes):
+        value = "0x" + value.hex()
+    if isinstance(value, str) and len(value) == 42:
+        return address_to_topic(normalize_address(value))
+    if not isinstance(value, str) or len(value) != 66 or value[:2] != "0x":
+        raise ValueError(f"Invalid topic value: {value!r}")
+    try:
+        bytes.fromhex(value[2:])
+    except ValueError:
+        raise ValueError(f"Invalid topic value: {value!r}") from None
+    return value.lower()
+
+
+def normalize_addresses(
+    addresses: Union[AddressLike, Iterable[AddressLike]],
+) -> List[str]:
+    """
+    Normalize and deduplicate a single address or a set of addresses, keeping their first-seen order.
+
+    Args:
+        addresses (Union[AddressLike, Iterable[AddressLike]]): The addresses.
+
+    Returns:
+        List[str]: The distinct lowercase prefixed hex addresses.
+    """
+    if isinstance(addresses, (str, bytes, Enum)):
+        addresses = [addresses]
+    return list(dict.fromkeys(normalize_address(address) for address in addresses))
+
+
+def normalize_topic_values(
+    values: Union[TopicLike, Iterable[TopicLike]],
+) -> List[str]:
+    """
+    Normalize and deduplicate a single topic value or a set of topic values, keeping their first-seen order.
+
+    Args:
+        values (Union[TopicLike, Iterable[TopicLike]]): The topic values.
+
+    Returns:
+        List[str]: The distinct lowercase prefixed hex topics.
+    """
+    if isinstance(values, (str, bytes, int, Enum)):
+        values = [values]
+    return list(dict.fromkeys(normalize_topic_value(value) for value in values))
+
+
+def chunk(values: Sequence[T], size: int) -> List[Sequence[T]]:
+    """
+    Split values into consecutive chunks of at most `size` values.
+
+    Args:
+        values (Sequence[T]): The values to split.
+        size (int): The largest chunk size.
+
+    Returns:
+        List[Sequence[T]]: The chunks, in order.
+    """
+    return [values[start : start + size] for start in range(0, len(values), size)]
+
+
+def build_log_selections(
+    topic0: Optional[str] = None,
+    contracts: Optional[Sequence[str]] = None,
+    topic_filters: Optional[Dict[int, Sequence[str]]] = None,
+    max_addresses: int = MAX_ADDRESSES_PER_SELECTION,
+    max_topics: int = MAX_TOPICS_PER_SELECTION,
+) -> List[hypersync.LogSelection]:
+    """
+    Build the log selections of an event filtered on sets of contracts and indexed topic values.
+
+    Sets that exceed the limits of a single selection are split into chunks, and every combination of chunks gets its
+    own selection. The chunks of a set are disjoint, so every log matches exactly one selection.
+
+    Args:
+        topic0 (Optional[str]): The topic0 of the event. Defaults to None, which matches every event.
+        contracts (Optional[Sequence[str]]): The normalized contracts that emit the logs. Defaults to None, which
+            matches every contract.
+        topic_filters (Optional[Dict[int, Sequence[str]]]): The normalized allowed values of topic1 to topic3, keyed
+            by topic position. Defaults to None.
+        max_addresses (int): The most contracts in a single selection. Defaults to `MAX_ADDRESSES_PER_SELECTION`.
+        max_topics (int): The most values of a topic in a single selection. Defaults to `MAX_TOPICS_PER_SELECTION`.
+
+    Returns:
+        List[hypersync.LogSelection]: The log selections. An empty contract or topic value set yields no selection.
+    """
+    topic_filters = topic_filters or {}
+    positions = sorted(topic_filters)
+
+    contract_chunks = [None] if contracts is None else chunk(contracts, max_addresses)
+    topic_chunks = [
+        chunk(topic_filters[position], max_topics) for position in positions
+    ]
+
+    selections = []
+    for contract_chunk, *value_chunks in itertools.product(
+        contract_chunks, *topic_chunks
+    ):
+        topics = [[topic0] if topic0 is not None else []]
+        for position, values in zip(positions, value_chunks):
+            topics += [[] for _ in range(position + 1 - len(topics))]
+            topics[position] = list(values)
+        selections.append(
+            hypersync.LogSelection(
+                address=list(contract_chunk) if contract_chunk is not None else None,
+                topics=topics,
+            )
+        )
+    return selections
+
+
+def batch_selections(
+    selections: List[hypersync.LogSelection],
+    max_selections: int = MAX_SELECTIONS_PER_QUERY,
+) -> List[List[hypersync.LogSelection]]:
+    """
+    Split log selections into the batches sent as separate queries.
+
+    Args:
+        selections (List[hypersync.LogSelection]): The log selections.
+        max_selections (int): The most selections of a single query. Defaults to `MAX_SELECTIONS_PER_QUERY`.
+
+    Returns:
+        List[List[hypersync.LogSelection]]: The batches of selections. No selections yield no batch, since a query
+            without log selections matches no logs.
+    """
+    return [list(batch) for batch in chunk(selections, max_selections)]
+
+
+def filter_keys(
+    address: Optional[Union[str, Iterable[AddressLike]]] = None,
+    topic_filters: Optional[Dict[int, Iterable[TopicLike]]] = None,
+    contracts: Optional[Iterable[AddressLike]] = None,
+) -> Tuple[Any, List[Tuple[str, Any]]]:
+    """
+    Get the values that identify the address, topic and contract filters of an event query in a cache or checkpoint
+    key.
+
+    Sets are keyed in sorted order, so the same set gets the same key, and an empty set is keyed apart from no filter.
+    The key of a single address and of queries without topic or contract sets are unchanged.
+
+    Args:
+        address (Optional[Union[str, Iterable[AddressLike]]]): The address, or set of addresses, filtering topic1.
+        topic_filters (Optional[Dict[int, Iterable[TopicLike]]]): The allowed values of topic1 to topic3, keyed by
+            topic position.
+        contracts (Optional[Iterable[AddressLike]]): The contracts whose logs are queried.
+
+    Returns:
+        Tuple[Any, List[Tuple[str, Any]]]: The key of the address filter, and the keys of the contract and topic
+            filters that are set.
+    """
+    if address is not None and not isinstance(address, str):
+        address = sorted(normalize_addresses(address))
+    elif address:
+        address = address.lower()
+
+    keys = []
+    if contracts is not None:
+        keys.append(("contracts", sorted(normalize_addresses(contracts))))
+    if topic_filters:
+        keys.append(
+            (
+                "topics",
+                sorted(
+                    (position, sorted(normalize_topic_values(values)))
+                    for position, values in topic_filters.items()
+                ),
+            )
+        )
+    return address, keys
@@ -0,0 +1,163 @@
+import asyncio
+import time
+from typing import Dict, Optional
+import hypersync
+
+from dataclasses import dataclass, field
+
+
+@dataclass
+class HeightCache:
+    """
+    A cache of the current block height of a single Hypersync endpoint.
+
+    Concurrent callers that find the cached height expired share a single `get_height` request, and an optional
+    background refresher keeps the height fresh so queries never wait on it. The shared request and the refresher are
+    tasks of the event loop that started them, and callers on another event loop start tasks of their own.
+
+    Attributes:
+        url (str): The url of the Hypersync endpoint.
+        height (Optional[int]): The last fetched block height, or None if it was never fetched.
+        updated_at (float): The monotonic time the height was last fetched at.
+    """
+
+    url: str
+    height: Optional[int] = field(init=False, default=None)
+    updated_at: float = field(init=False, default=0.0)
+    _pending: Optional[asyncio.Task] = field(init=False, default=None, repr=False)
+    _refresher: Optional[asyncio.Task] = field(init=False, default=None, repr=False)
+
+    async def refresh(self, client: hypersync.HypersyncClient) -> int:
+        """
+        Fetch the current block height, sharing the request with any refresh that is already in flight.
+
+        Args:
+            client (hypersync.HypersyncClient): The client used to fetch the height.
+
+        Returns:
+            int: The current block height.
+        """
+        if (
+            self._pending is None
+            or self._pending.done()
+            or self._pending.get_loop() is not asyncio.get_running_loop()
+        ):
+            self._pending = asyncio.create_task(self._fetch(client))
+        return await asyncio.shield(self._pending)
+
+    async def _fetch(self, client: hypersync.HypersyncClient) -> int:
+        height = await client.get_height()
+        # never move the cached height backwards if requests complete out of order
+        self.height = max(height, self.height or 0)
+        self.updated_at = time.monotonic()
+        return self.height
+
+    async def get(
+        self,
+        client: hypersync.HypersyncClient,
+        ttl: float = 0.0,
+        force_refresh: bool = False,
+    ) -> int:
+        """
+        Get the block height, fetching it only if the cached height is older than `ttl` seconds.
+
+        Args:
+            client (hypersync.HypersyncClient): The client used to fetch the height.
+            ttl (float): The maximum age of the cached height in seconds. Defaults to 0, which always fetches the
+                height, sharing the request with concurrent callers.
+            force_refresh (bool): Whether to always fetch the height. Defaults to False.
+
+        Returns:
+            int: The block height.
+        """
+        if (
+            force_refresh
+            or self.height is None
+            or time.monotonic() - self.updated_at > ttl
+        ):
+            return await self.refresh(client)
+        return self.height
+
+    def start_refresher(
+        self, client: hypersync.HypersyncClient, interval: float = 1.0
+    ) -> None:
+        """
+        Start refreshing the height in the background of the running event loop, if no refresher is running on it
+        yet. A refresher of another event loop is cancelled, since it only runs while its own loop does.
+
+        Args:
+            client (hypersync.HypersyncClient): The client used to fetch the height.
+            interval (float): The number of seconds between refreshes. Defaults to 1.0.
+        """
+        if self._refresher is not None and not self._refresher.done():
+            if self._refresher.get_loop() is asyncio.get_running_loop():
+                return
+            self.cancel_refresher()
+
+        async def refresh_loop():
+            while True:
+                try:
+                    await self.refresh(client)
+                except Exception:
+                    # a failed refresh is retried on the next interval, callers fetch the height themselves
+                    # once the cached height expires
+                    pass
+                await asyncio.sleep(interval)
+
+        self._refresher = asyncio.create_task(refresh_loop())
+
+    def cancel_refresher(self) -> None:
+        """
+        Cancel the background refresher, if it is running, without waiting for it to stop. The refresher stops on
+        the next iteration of its event loop, so this can be called outside of a coroutine or from another event loop.
+        """
+        if self._refresher is None:
+            return
+
+        refresher, self._refresher = self._refresher, None
+        loop = refresher.get_loop()
+        if loop.is_closed():
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is loop:
+            refresher.cancel()
+        else:
+            loop.call_soon_threadsafe(refresher.cancel)
+
+    async def stop_refresher(self) -> None:
+        """
+        Stop the background refresher, if it is running. A refresher of another event loop is cancelled without
+        waiting for it.
+        """
+        if self._refresher is None:
+            return
+
+        refresher = self._refresher
+        self.cancel_refresher()
+        if refresher.get_loop() is not asyncio.get_running_loop():
+            return
+        try:
+            await refresher
+        except asyncio.CancelledError:
+            pass
+
+
+_height_caches: Dict[str, HeightCache] = {}
+
+
+def get_height_cache(url: str) -> HeightCache:
+    """
+    Get the height cache of a Hypersync endpoint, shared by every `HyperManager` pointing at the same url.
+
+    Args:
+        url (str): The url of the Hypersync endpoint.
+
+    Returns:
+        HeightCache: The shared height cache of the endpoint.
+    """
+    if url not in _height_caches:
+        _height_caches[url] = HeightCache(url=url)
+    return _height_caches[url]
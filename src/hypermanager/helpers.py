@@ -1,9 +1,16 @@
+import polars as pl
+from typing import List, Optional, TypeVar
+
+Frame = TypeVar("Frame", pl.DataFrame, pl.LazyFrame)
+
+
 def byte_to_string(hex_string: str) -> str:
     """
     Converts a hex string into a human-readable UTF-8 or Latin-1 string.
 
     This function is primarily used to convert extra data (in hex format)
-    into readable text for identifying builders.
+    into readable text for identifying builders. Use `builders.label_builders`
+    to decode and label a whole column of blocks at once.
 
     Args:
         hex_string (str): The hex string to be converted (prefixed with '0x').
@@ -36,3 +43,23 @@ def address_to_topic(address: str) -> str:
         str: The padded address in the format suitable for log filtering.
     """
     return "0x000000000000000000000000" + address[2:]
+
+
+def format_hex(df: Frame, columns: Optional[List[str]] = None) -> Frame:
+    """
+    Formats binary columns, such as the addresses and hashes returned with `binary_output`, as prefixed hex strings.
+
+    Args:
+        df (Frame): The DataFrame or LazyFrame to format.
+        columns (Optional[List[str]]): The binary columns to format. Defaults to every binary column.
+
+    Returns:
+        Frame: The data with the binary columns formatted as prefixed hex strings.
+    """
+    if columns is None:
+        schema = df.collect_schema() if isinstance(df, pl.LazyFrame) else df.schema
+        columns = [name for name, dtype in schema.items() if dtype == pl.Binary]
+
+    return df.with_columns(
+        (pl.lit("0x") + pl.col(name).bin.encode("hex")).alias(name) for name in columns
+    )
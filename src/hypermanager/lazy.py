@@ -0,0 +1,393 @@
+import operator
+import polars as pl
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from dataclasses import dataclass, field, replace
+from hypermanager.decoder import EventParam, parse_event_signature
+from hypermanager.errors import NoDataError
+from hypermanager.events import EventConfig
+from hypermanager.helpers import address_to_topic
+
+if TYPE_CHECKING:
+    from hypermanager.manager import HyperManager
+
+COMPARISONS: Dict[str, Callable[[Any, Any], Any]] = {
+    "==": operator.eq,
+    ">=": operator.ge,
+    ">": operator.gt,
+    "<=": operator.le,
+    "<": operator.lt,
+}
+
+# the comparison to use when the literal is on the left hand side, e.g. `5 < pl.col("x")`
+MIRRORED_COMPARISONS = {"==": "==", ">=": "<=", ">": "<", "<=": ">=", "<": ">"}
+
+# transaction columns that can be filtered on the server, mapped to their `hypersync.TransactionSelection` field
+TRANSACTION_FILTERS = {"from": "from_", "to": "to", "hash": "hash"}
+
+_NOT_LITERAL = object()
+
+
+def _split_conjunction(predicate: pl.Expr) -> List[pl.Expr]:
+    """
+    Split a predicate on its top-level `&` operators.
+    """
+    inputs = predicate.meta.pop()
+    if len(inputs) == 2 and predicate.meta.eq(inputs[1] & inputs[0]):
+        return _split_conjunction(inputs[1]) + _split_conjunction(inputs[0])
+    return [predicate]
+
+
+def _literal_value(expr: pl.Expr) -> Any:
+    """
+    Evaluate a literal expression, returning `_NOT_LITERAL` if the expression references any column.
+    """
+    if expr.meta.root_names():
+        return _NOT_LITERAL
+    try:
+        values = pl.select(expr).to_series().to_list()
+    except pl.exceptions.PolarsError:
+        return _NOT_LITERAL
+
+    if len(values) != 1:
+        return values
+    return values[0]
+
+
+def _match_predicate(predicate: pl.Expr) -> Optional[Tuple[str, str, Any]]:
+    """
+    Match a predicate comparing a single column with a literal.
+
+    Returns:
+        Optional[Tuple[str, str, Any]]: The `(column, operator, value)` of the predicate, where the operator is a
+            comparison, `is_in` or `is_between` with a `(lower, upper, closed)` value, or None if the predicate has
+            another shape.
+    """
+    inputs = predicate.meta.pop()
+
+    # inputs are popped in reverse order
+    if len(inputs) == 2:
+        left, right = inputs[1], inputs[0]
+        if left.meta.is_column() and predicate.meta.eq(left.is_in(right)):
+            values = _literal_value(right)
+            if values is not _NOT_LITERAL:
+                values = values if isinstance(values, list) else [values]
+                return left.meta.output_name(), "is_in", values
+
+        for name, compare in COMPARISONS.items():
+            if not predicate.meta.eq(compare(left, right)):
+                continue
+            if left.meta.is_column():
+                value = _literal_value(right)
+                if value is not _NOT_LITERAL:
+                    return left.meta.output_name(), name, value
+            if right.meta.is_column():
+                value = _literal_value(left)
+                if value is not _NOT_LITERAL:
+                    return right.meta.output_name(), MIRRORED_COMPARISONS[name], value
+            return None
+
+    if len(inputs) == 3 and inputs[2].meta.is_column():
+        column, lower, upper = inputs[2], inputs[1], inputs[0]
+        for closed in ("both", "left", "right", "none"):
+            if predicate.meta.eq(column.is_between(lower, upper, closed=closed)):
+                lower_value, upper_value = _literal_value(lower), _literal_value(upper)
+                if _NOT_LITERAL in (lower_value, upper_value):
+                    return None
+                return (
+                    column.meta.output_name(),
+                    "is_between",
+                    (lower_value, upper_value, closed),
+                )
+
+    return None
+
+
+def _block_bounds(op: str, value: Any) -> Optional[Tuple[Optional[int], Optional[int]]]:
+    """
+    Convert a block number predicate into a half-open `[from_block, to_block)` range, or None if it is not a range.
+    """
+    if op == "is_between":
+        lower, upper, closed = value
+        if not isinstance(lower, int) or not isinstance(upper, int):
+            return None
+        return (
+            lower if closed in ("both", "left") else lower + 1,
+            upper + 1 if closed in ("both", "right") else upper,
+        )
+
+    if not isinstance(value, int):
+        return None
+    return {
+        "==": (value, value + 1),
+        ">=": (value, None),
+        ">": (value + 1, None),
+        "<=": (None, value + 1),
+        "<": (None, value),
+    }.get(op)
+
+
+def _encode_topic(param: EventParam, value: Any) -> Optional[str]:
+    """
+    Encode the value of an indexed event parameter as a log topic, or None if it can not be encoded.
+    """
+    if param.type == "address" and isinstance(value, str) and len(value) == 42:
+        return address_to_topic(value.lower())
+    if param.type == "bool" and isinstance(value, bool):
+        return f"0x{int(value):064x}"
+    if param.is_integer and isinstance(value, int) and not isinstance(value, bool):
+        if value < 0 and not param.is_signed:
+            return None
+        return f"0x{value % 2**256:064x}"
+    if param.type == "bytes32" and isinstance(value, str) and len(value) == 66:
+        return value.lower()
+    return None
+
+
+@dataclass
+class PushdownPlan:
+    """
+    The parts of a lazy query that are executed by the server and the parts that are executed locally.
+
+    Attributes:
+        from_block (Optional[int]): The lower block bound pushed into the query (inclusive).
+        to_block (Optional[int]): The upper block bound pushed into the query (exclusive).
+        topic_filters (Dict[int, List[str]]): The allowed values of the log topics, keyed by topic position.
+        transaction_filters (Dict[str, List[str]]): The `hypersync.TransactionSelection` fields to filter on.
+        columns (Optional[List[str]]): The transaction and block columns to request, or None for the defaults.
+        local_predicates (List[pl.Expr]): The predicates that are applied after collecting the data.
+    """
+
+    from_block: Optional[int] = None
+    to_block: Optional[int] = None
+    topic_filters: Dict[int, List[str]] = field(default_factory=dict)
+    transaction_filters: Dict[str, List[str]] = field(default_factory=dict)
+    columns: Optional[List[str]] = None
+    local_predicates: List[pl.Expr] = field(default_factory=list)
+
+    def _narrow(self, bounds: Tuple[Optional[int], Optional[int]]) -> None:
+        if bounds[0] is not None:
+            self.from_block = max(bounds[0], self.from_block or 0)
+        if bounds[1] is not None:
+            self.to_block = (
+                bounds[1] if self.to_block is None else min(bounds[1], self.to_block)
+            )
+
+    @property
+    def is_empty(self) -> bool:
+        """
+        Whether the pushed down filters can not match any row, e.g. because of contradicting equality filters.
+        """
+        if self.from_block is not None and self.to_block is not None:
+            if self.from_block >= self.to_block:
+                return True
+        return any(not values for values in self.topic_filters.values()) or any(
+            not values for values in self.transaction_filters.values()
+        )
+
+    @staticmethod
+    def _intersect(current: Optional[List[str]], values: List[str]) -> List[str]:
+        if current is None:
+            return values
+        return [value for value in current if value in values]
+
+
+@dataclass
+class LazyQuery:
+    """
+    A lazy handle on the results of an event or transaction query, which is only executed on `collect`.
+
+    Filters and column selections are recorded rather than executed. On `collect`, the predicates that the server can
+    evaluate are pushed into the `hypersync.Query`: block number ranges narrow the queried block range, equality on
+    indexed event parameters becomes a log topic filter, and equality on the `from`, `to` and `hash` transaction
+    columns becomes a `hypersync.TransactionSelection`. Selected columns limit the requested transaction and block
+    fields. Everything else is executed locally by Polars on the collected data.
+
+    Attributes:
+        manager (HyperManager): The manager used to execute the query.
+        event_config (Optional[EventConfig]): The event to query, or None to query transactions.
+        from_block (Optional[int]): The starting block number of the query.
+        to_block (Optional[int]): The ending block number of the query (exclusive).
+        block_range (Optional[int]): The number of most recent blocks to query if `from_block` is not given.
+        tx_data (bool): Whether to include transaction data in event results. Defaults to True.
+        shards (int): The number of block range shards to fetch concurrently. Defaults to 1.
+        predicates (List[pl.Expr]): The recorded filters.
+        projection (Optional[List[str]]): The recorded column selection, or None to return every column.
+    """
+
+    manager: "HyperManager"
+    event_config: Optional[EventConfig] = None
+    from_block: Optional[int] = None
+    to_block: Optional[int] = None
+    block_range: Optional[int] = None
+    tx_data: bool = True
+    shards: int = 1
+    predicates: List[pl.Expr] = field(default_factory=list)
+    projection: Optional[List[str]] = None
+
+    def filter(self, *predicates: pl.Expr) -> "LazyQuery":
+        """
+        Record filters, returning a new handle.
+
+        Args:
+            *predicates (pl.Expr): The predicates the rows must satisfy.
+
+        Returns:
+            LazyQuery: The filtered lazy query.
+        """
+        return replace(self, predicates=self.predicates + list(predicates))
+
+    def select(self, *columns: str) -> "LazyQuery":
+        """
+        Record a column selection, returning a new handle.
+
+        Args:
+            *columns (str): The names of the columns to return.
+
+        Returns:
+            LazyQuery: The lazy query returning only the selected columns.
+        """
+        return replace(self, projection=list(columns))
+
+    def _event_params(self) -> List[EventParam]:
+        """
+        Get the parameters of the queried event, or an empty list when querying transactions.
+        """
+        if self.event_config is None:
+            return []
+
+        _, params = parse_event_signature(self.event_config.signature)
+        return params
+
+    def plan(self) -> PushdownPlan:
+        """
+        Split the recorded filters and selection into the parts pushed into the query and the parts executed locally.
+
+        Returns:
+            PushdownPlan: The pushdown plan of the query.
+        """
+        plan = PushdownPlan()
+        params = self._event_params()
+        # indexed parameters are stored in topic1 to topic3, in declaration order
+        indexed_params = {
+            param.name: (position, param)
+            for position, param in enumerate(
+                [param for param in params if param.indexed], start=1
+            )
+        }
+
+        for predicate in self.predicates:
+            for conjunct in _split_conjunction(predicate):
+                match = _match_predicate(conjunct)
+                if match is None:
+                    plan.local_predicates.append(conjunct)
+                    continue
+
+                column, op, value = match
+                values = value if op == "is_in" else [value]
+
+                if column == "block_number":
+                    bounds = _block_bounds(op, value)
+                    if bounds is not None:
+                        plan._narrow(bounds)
+                        continue
+
+                elif column in indexed_params and op in ("==", "is_in"):
+                    position, param = indexed_params[column]
+                    topics = [_encode_topic(param, value) for value in values]
+                    if None not in topics:
+                        plan.topic_filters[position] = plan._intersect(
+                            plan.topic_filters.get(position), topics
+                        )
+                        continue
+
+                elif (
+                    self.event_config is None
+                    and column in TRANSACTION_FILTERS
+                    and op in ("==", "is_in")
+                    and all(isinstance(value, str) for value in values)
+                ):
+                    selection_field = TRANSACTION_FILTERS[column]
+                    plan.transaction_filters[selection_field] = plan._intersect(
+                        plan.transaction_filters.get(selection_field),
+                        [value.lower() for value in values],
+                    )
+                    continue
+
+                plan.local_predicates.append(conjunct)
+
+        if self.projection is not None:
+            # the columns referenced by the local predicates are needed too
+            needed = list(self.projection)
+            for predicate in plan.local_predicates:
+                needed += [
+                    name for name in predicate.meta.root_names() if name not in needed
+                ]
+            # decoded event parameters are always returned, only request the transaction and block columns
+            param_names = [param.name for param in params]
+            plan.columns = []
+            for name in needed:
+                if name in param_names:
+                    continue
+                # columns sharing a name with a parameter are returned with a `_right` suffix, e.g. `from_right`
+                if name.endswith("_right") and name[: -len("_right")] in param_names:
+                    name = name[: -len("_right")]
+                if name not in plan.columns:
+                    plan.columns.append(name)
+
+        return plan
+
+    async def collect(self) -> pl.DataFrame:
+        """
+        Execute the query, pushing the supported filters and the selection down to the server.
+
+        Returns:
+            pl.DataFrame: The filtered and selected rows.
+
+        Raises:
+            NoDataError: If the query returns no data.
+        """
+        plan = self.plan()
+
+        block_range_dict = await self.manager._get_block_range(
+            self.from_block, self.to_block, self.block_range
+        )
+        from_block = max(block_range_dict["from_block"], plan.from_block or 0)
+        to_block = block_range_dict["to_block"]
+        if plan.to_block is not None:
+            to_block = min(to_block, plan.to_block)
+
+        if from_block >= to_block or plan.is_empty:
+            result = None
+        elif self.event_config is not None:
+            result = await self.manager.fetch_event_range(
+                self.event_config,
+                from_block,
+                to_block,
+                tx_data=self.tx_data and plan.columns != [],
+                columns=plan.columns,
+                shards=self.shards,
+                topic_filters=plan.topic_filters,
+            )
+        else:
+            result = await self.manager._fetch_txs_range(
+                from_block,
+                to_block,
+                columns=plan.columns,
+                shards=self.shards,
+                transaction_filters=plan.transaction_filters,
+            )
+
+        if result is None:
+            name = self.event_config.name if self.event_config else "transactions"
+            raise NoDataError(
+                f"No data returned for {name} from blocks {from_block} to {to_block}"
+            )
+
+        # execute whatever could not be pushed down
+        lazy_df = result.lazy()
+        if plan.local_predicates:
+            lazy_df = lazy_df.filter(*plan.local_predicates)
+        if self.projection is not None:
+            lazy_df = lazy_df.select(self.projection)
+        return lazy_df.collect()
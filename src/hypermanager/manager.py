@@ -1,316 +1,2117 @@
+import asyncio
+import time
 import polars as pl
-from typing import List, Optional
+import pyarrow as pa
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 from functools import lru_cache
+from urllib.parse import urlparse
 import hypersync
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+from hypermanager.cache import EventCache
+from hypermanager.concurrency import ConcurrencyController, get_controller
+from hypermanager.dataset import DatasetWriter
+from hypermanager.errors import NoDataError
+from hypermanager.decoder import can_decode, decode_logs
 from hypermanager.decorators import timer
-from hypermanager.helpers import address_to_topic
-from hypermanager.schema import COMMON_TRANSACTION_MAPPING, COMMON_BLOCK_MAPPING
+from hypermanager.height import HeightCache, get_height_cache
+from hypermanager.lazy import LazyQuery
+from hypermanager.registry import (
+    UNKNOWN_TOPICS,
+    EventRegistry,
+    get_event_registry,
+    normalize_topic,
+    partition_logs,
+)
+from hypermanager.metrics import (
+    Metrics,
+    current_query,
+    measure_phase,
+    phase,
+    record_response,
+)
+from hypermanager.helpers import format_hex
+from hypermanager.filters import (
+    batch_selections,
+    build_log_selections,
+    filter_keys,
+    normalize_addresses,
+    normalize_topic_values,
+)
+from hypermanager.schema import (
+    COMMON_TRANSACTION_MAPPING,
+    COMMON_BLOCK_MAPPING,
+    EVENT_LOG_COLUMNS,
+    EVENT_LOG_EXTRA_COLUMNS,
+    EVENT_LOG_FIELDS,
+    EVENT_TRANSACTION_COLUMNS,
+    TRANSACTION_COLUMNS,
+)
 from hypermanager.events import EventConfig
+from hypermanager.networks import HyperSyncClients
+from hypermanager.txindex import TxIndex
+from hypermanager.uint256 import decode_uint256_columns
 
 
 @dataclass
 class HyperManager:
     url: str
-    client: hypersync.HypersyncClient = field(init=False)
+    client: Optional[hypersync.HypersyncClient] = None
+    cache: Optional[EventCache] = None
+    tx_index: Optional[TxIndex] = None
+    dataset: DatasetWriter = field(default_factory=DatasetWriter)
+    binary_output: bool = False
+    metrics: Optional[Metrics] = None
+    controller: Optional[ConcurrencyController] = None
+    height_ttl: float = 0.0
+    height_refresh_interval: Optional[float] = None
+    height_cache: HeightCache = field(init=False)
 
     def __post_init__(self):
-        self.client = hypersync.HypersyncClient(hypersync.ClientConfig(url=self.url))
+        if self.client is None:
+            self.client = hypersync.HypersyncClient(
+                hypersync.ClientConfig(url=self.url)
+            )
+        # the height cache is shared by every manager pointing at the same url
+        self.height_cache = get_height_cache(self.url)
+        # and so is the concurrency controller, unless one is given
+        if self.controller is None:
+            self.controller = get_controller(self.url)
+
+    def __hash__(self):
+        return hash(self.url)  # Make the object hashable based on URL
+
+    @property
+    def hex_output(self) -> hypersync.HexOutput:
+        """
+        The encoding of addresses, hashes and other byte columns in query results. With `binary_output`, they are
+        returned as raw bytes, which takes roughly half the memory of prefixed hex strings; use
+        `helpers.format_hex` to format them as hex on demand.
+        """
+        if self.binary_output:
+            return hypersync.HexOutput.NO_ENCODE
+        return hypersync.HexOutput.PREFIXED
+
+    def _encode_hex(self, value: str) -> str | bytes:
+        """
+        Encode a prefixed hex value the way it appears in query results, i.e. as bytes with `binary_output`.
+
+        Args:
+            value (str): The prefixed hex value, e.g. an address or a topic.
+
+        Returns:
+            str | bytes: The value as it appears in query results.
+        """
+        if self.binary_output:
+            return bytes.fromhex(value[2:])
+        return value
+
+    async def _get_height(self, force_refresh: bool = False) -> int:
+        """
+        Get the current block height from the blockchain.
+
+        By default the height is fetched on every call, sharing the request with concurrent calls. Setting
+        `height_ttl` opts in to serving the shared cached height while it is younger than `height_ttl` seconds. If
+        `height_refresh_interval` is set, a background task keeps the cached height fresh and the cached height is
+        served while it is younger than the refresh interval.
+
+        Args:
+            force_refresh (bool): Whether to fetch the height from the server, bypassing the cache. Defaults to False.
+
+        Returns:
+            int: The current block height, which is the exclusive end of the available blocks, i.e. the number of the
+                block after the latest one.
+        """
+        ttl = self.height_ttl
+        if self.height_refresh_interval is not None:
+            self.height_cache.start_refresher(self.client, self.height_refresh_interval)
+            ttl = max(ttl, self.height_refresh_interval)
+
+        return await self.height_cache.get(
+            self.client, ttl=ttl, force_refresh=force_refresh
+        )
+
+    async def _collect_arrow(
+        self, query: hypersync.Query, config: hypersync.StreamConfig
+    ) -> hypersync.ArrowResponse:
+        """
+        Run a query with the Hypersync client, recording the response in the metrics of the running query.
+
+        The query waits for a free slot of the endpoint's concurrency controller and is retried with backoff if it
+        fails. A retry streams the rest of the block range page by page, so a later failure resumes from the last
+        page received instead of fetching the whole range again.
+
+        Args:
+            query (hypersync.Query): The query object to execute.
+            config (hypersync.StreamConfig): The configuration for the data stream.
+
+        Returns:
+            hypersync.ArrowResponse: The response of the server.
+        """
+        pages: List[hypersync.ArrowResponse] = []
+        attempts = 0
+
+        async def collect() -> None:
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                start_time = time.perf_counter()
+                response = await self.client.collect_arrow(query, config)
+                record_response(response, time.perf_counter() - start_time)
+                pages.append(response)
+                return
+
+            if pages and query.to_block is not None:
+                if pages[-1].next_block >= query.to_block:
+                    return
+            resume_query = (
+                replace(query, from_block=pages[-1].next_block) if pages else query
+            )
+            stream = await self.client.stream_arrow(resume_query, config)
+            try:
+                while True:
+                    start_time = time.perf_counter()
+                    response = await stream.recv()
+                    if response is None:
+                        break
+                    record_response(response, time.perf_counter() - start_time)
+                    pages.append(response)
+            finally:
+                await stream.close()
+
+        await self.controller.call(collect)
+        return self._merge_responses(pages)
+
+    @staticmethod
+    def _merge_responses(
+        responses: List[hypersync.ArrowResponse],
+    ) -> hypersync.ArrowResponse:
+        """
+        Merge the consecutive pages of a query into a single response.
+
+        Args:
+            responses (List[hypersync.ArrowResponse]): The pages of the query, in block order.
+
+        Returns:
+            hypersync.ArrowResponse: The merged response.
+        """
+        if len(responses) == 1:
+            return responses[0]
+
+        data = hypersync.ArrowResponseData()
+        for name in ["blocks", "transactions", "logs", "traces", "decoded_logs"]:
+            tables = [getattr(response.data, name) for response in responses]
+            setattr(data, name, pa.concat_tables(tables, promote_options="default"))
+
+        merged = hypersync.ArrowResponse()
+        merged.archive_height = responses[-1].archive_height
+        merged.next_block = responses[-1].next_block
+        merged.total_execution_time = sum(
+            response.total_execution_time for response in responses
+        )
+        merged.data = data
+        merged.rollback_guard = responses[-1].rollback_guard
+        return merged
+
+    async def _get_block_timestamp(self, block_number: int) -> Optional[int]:
+        """
+        Get the timestamp of a single block.
+
+        Args:
+            block_number (int): The block number.
+
+        Returns:
+            Optional[int]: The unix timestamp of the block, or None if the block is not available.
+        """
+        query = self._create_query(
+            from_block=block_number,
+            to_block=block_number + 1,
+            logs=[],
+            blocks=[hypersync.BlockSelection()],
+            field_selection=hypersync.FieldSelection(
+                block=[
+                    hypersync.BlockField.NUMBER.value,
+                    hypersync.BlockField.TIMESTAMP.value,
+                ]
+            ),
+        )
+        config = hypersync.StreamConfig(
+            hex_output=hypersync.HexOutput.PREFIXED,
+            column_mapping=hypersync.ColumnMapping(
+                block={hypersync.BlockField.TIMESTAMP: hypersync.DataType.UINT64}
+            ),
+        )
+
+        data = await self._collect_arrow(query, config)
+        blocks_df = pl.from_arrow(data.data.blocks)
+        if blocks_df.is_empty():
+            return None
+        return blocks_df["timestamp"][0]
+
+    async def _get_block_by_timestamp(self, timestamp: int) -> int:
+        """
+        Find the first block with a timestamp at or after the given timestamp.
+
+        The search interpolates the block from the average block time between the blocks that bound it, which finds
+        the block within a few queries since block times are nearly constant. A step that does not at least halve the
+        bounded range is followed by a bisection step, so the search never takes more than about twice the queries
+        of a binary search.
+
+        Args:
+            timestamp (int): The unix timestamp.
+
+        Returns:
+            int: The first block number at or after the timestamp, or the current height if every block is older.
+        """
+        height = await self._get_height()
+        if height <= 0:
+            return 0
+
+        # the first and the last block bound the search
+        low, high = 0, height - 1
+        low_timestamp, high_timestamp = await asyncio.gather(
+            self._get_block_timestamp(low), self._get_block_timestamp(high)
+        )
+        if low_timestamp is not None and low_timestamp >= timestamp:
+            return 0
+        if high_timestamp is None or high_timestamp < timestamp:
+            return height
+
+        # the timestamp of `low` is before the timestamp and the timestamp of `high` is at or after it
+        interpolate = low_timestamp is not None
+        while high - low > 1:
+            if interpolate:
+                mid = low + (high - low) * (timestamp - low_timestamp) // max(
+                    high_timestamp - low_timestamp, 1
+                )
+                mid = min(max(mid, low + 1), high - 1)
+            else:
+                mid = (low + high) // 2
+            mid_timestamp = await self._get_block_timestamp(mid)
+
+            previous_range = high - low
+            if mid_timestamp is not None and mid_timestamp >= timestamp:
+                high, high_timestamp = mid, mid_timestamp
+            else:
+                low, low_timestamp = mid, mid_timestamp
+            # bisect after an interpolation step that did not halve the range, or when a bound has no timestamp
+            interpolate = (
+                low_timestamp is not None
+                and not (interpolate and high - low > previous_range // 2)
+            )
+
+        return high
+
+    def _index_txs(self, df: Optional[pl.DataFrame]) -> None:
+        """
+        Add the transaction hashes of fetched data to the transaction index, if one is configured.
+
+        Args:
+            df (Optional[pl.DataFrame]): The fetched data, with `hash` and `block_number` columns.
+        """
+        if self.tx_index is not None and isinstance(df, pl.DataFrame):
+            self.tx_index.update(df)
+
+    def _create_query(
+        self,
+        from_block: int,
+        to_block: int,
+        logs: List[hypersync.LogSelection],
+        transactions: Optional[List[hypersync.TransactionSelection]] = None,
+        blocks: Optional[List[hypersync.BlockSelection]] = None,
+        field_selection: Optional[hypersync.FieldSelection] = None,
+    ) -> hypersync.Query:
+        """
+        Create a Hypersync query object for querying blockchain data.
+
+        Args:
+            from_block (int): The starting block number for the query.
+            to_block (int): The ending block number for the query.
+            logs (List[hypersync.LogSelection]): A list of log selections to filter the query.
+            transactions (Optional[List[hypersync.TransactionSelection]]): Optional transaction selections for the query.
+            blocks (Optional[List[hypersync.BlockSelection]]): Optional block selections for the query.
+            field_selection (Optional[hypersync.FieldSelection]): The fields to request from the server. Defaults to
+                every log, transaction and block field.
+
+        Returns:
+            hypersync.Query: The constructed query object.
+        """
+        if field_selection is None:
+            field_selection = hypersync.FieldSelection(
+                log=[e.value for e in hypersync.LogField],
+                transaction=[e.value for e in hypersync.TransactionField],
+                block=[e.value for e in hypersync.BlockField],
+            )
+
+        return hypersync.Query(
+            from_block=from_block,
+            to_block=to_block,
+            logs=logs,
+            transactions=transactions or [],
+            blocks=blocks or [],
+            field_selection=field_selection,
+        )
+
+    def _create_field_selection(
+        self,
+        columns: List[str],
+        log_fields: Optional[List[hypersync.LogField]] = None,
+        column_mapping: Optional[hypersync.ColumnMapping] = None,
+    ) -> hypersync.FieldSelection:
+        """
+        Create a field selection that only requests the fields needed to build the given output columns.
+
+        Column names follow the naming of the result DataFrames: transaction fields keep their name, block fields
+        that share a name with a transaction field are suffixed with `_block` (e.g. `gas_used_block`).
+
+        Args:
+            columns (List[str]): The transaction and block columns to return.
+            log_fields (Optional[List[hypersync.LogField]]): The log fields to request. Defaults to None.
+            column_mapping (Optional[hypersync.ColumnMapping]): The column mapping applied to the data. The
+                transaction and block fields it names are requested as well, if any are requested at all.
+
+        Returns:
+            hypersync.FieldSelection: The field selection for the query.
+
+        Raises:
+            ValueError: If a column is not a transaction or block field.
+        """
+        transaction_field_names = {e.value for e in hypersync.TransactionField}
+        block_field_names = {e.value for e in hypersync.BlockField}
+
+        transaction_fields = set()
+        block_fields = set()
+        for column in columns:
+            if column in transaction_field_names:
+                transaction_fields.add(column)
+            elif column.endswith("_block") and column[: -len("_block")] in block_field_names:
+                block_fields.add(column[: -len("_block")])
+            elif column in block_field_names:
+                block_fields.add(column)
+            else:
+                raise ValueError(f"Unknown transaction or block column: {column}")
+
+        if column_mapping is not None:
+            if transaction_fields and column_mapping.transaction:
+                transaction_fields.update(f.value for f in column_mapping.transaction)
+            if block_fields and column_mapping.block:
+                block_fields.update(f.value for f in column_mapping.block)
+
+        # integer join keys between logs, transactions and blocks
+        if block_fields:
+            block_fields.add(hypersync.BlockField.NUMBER.value)
+        if transaction_fields:
+            transaction_fields.add(hypersync.TransactionField.BLOCK_NUMBER.value)
+            transaction_fields.add(hypersync.TransactionField.TRANSACTION_INDEX.value)
+
+        return hypersync.FieldSelection(
+            log=[f.value for f in log_fields or []],
+            transaction=sorted(transaction_fields),
+            block=sorted(block_fields),
+        )
+
+    @phase("process")
+    def _process_arrow_data(
+        self,
+        data: hypersync.ArrowResponseData,
+        tx_data: bool = False,
+        columns: Optional[List[str]] = None,
+        uint256_columns: Optional[List[str]] = None,
+    ) -> Optional[pl.DataFrame]:
+        """
+        Convert an arrow response from the Hypersync client into a Polars DataFrame, joining the transaction
+        and block data onto the decoded logs if requested.
+
+        Args:
+            data (hypersync.ArrowResponseData): The arrow tables returned by the Hypersync client.
+            tx_data (bool): Whether to include transaction data in the result.
+            columns (Optional[List[str]]): The transaction and block columns to return. Defaults to
+                `EVENT_TRANSACTION_COLUMNS` for event logs and `TRANSACTION_COLUMNS` for transactions.
+            uint256_columns (Optional[List[str]]): The decoded integer columns to convert into 256-bit integers, see
+                `EventConfig.uint256_columns`. Defaults to None.
+
+        Returns:
+            Optional[pl.DataFrame]: The processed data as a Polars DataFrame, or None if no data is returned.
+        """
+        decoded_logs_df = pl.from_arrow(data.decoded_logs)
+        logs_df = pl.from_arrow(data.logs)
+
+        if decoded_logs_df.is_empty() or logs_df.is_empty():
+            # Return the transactions joined with their blocks, or None if there are no transactions either
+            transactions_df = pl.from_arrow(data.transactions)
+            if transactions_df.is_empty():
+                return None
+
+            tx_columns = columns or TRANSACTION_COLUMNS
+            # only join the blocks if a block column is requested
+            if any(column not in transactions_df.columns for column in tx_columns):
+                transactions_df = self._join_blocks(
+                    transactions_df, pl.from_arrow(data.blocks)
+                )
+            return transactions_df.select(tx_columns)
+
+        if uint256_columns:
+            decoded_logs_df = decode_uint256_columns(decoded_logs_df, uint256_columns)
+        if not tx_data:
+            return decoded_logs_df
+
+        # the transaction hash is taken from the logs and is always returned
+        tx_columns = [
+            column
+            for column in columns or EVENT_TRANSACTION_COLUMNS
+            if column != "hash"
+        ]
+        events_df = decoded_logs_df.hstack(
+            logs_df.select(
+                pl.col("transaction_hash").alias("hash"),
+                "block_number",
+                "transaction_index",
+                *[
+                    pl.col(column).alias(
+                        self._tx_column_name(column, decoded_logs_df.columns)
+                    )
+                    for column in EVENT_LOG_EXTRA_COLUMNS
+                    if column in tx_columns
+                ],
+            )
+        )
+        return self._join_tx_columns(events_df, data, tx_columns).select(
+            *decoded_logs_df.columns,
+            "hash",
+            *[
+                self._tx_column_name(column, decoded_logs_df.columns)
+                for column in tx_columns
+            ],
+        )
+
+    @staticmethod
+    def _tx_column_name(column: str, event_columns: List[str]) -> str:
+        """
+        Get the name a transaction, block or log column is returned under next to the decoded parameters of an event.
+
+        Columns that share a name with an event parameter, such as `from` and `to` next to the parameters of
+        `Transfer(address indexed from, address indexed to, uint256 value)`, get a `_right` suffix.
+
+        Args:
+            column (str): The requested column.
+            event_columns (List[str]): The columns of the decoded event logs.
+
+        Returns:
+            str: The name of the column in the result.
+        """
+        return f"{column}_right" if column in event_columns else column
+
+    @phase("join")
+    def _join_tx_columns(
+        self,
+        logs_df: pl.DataFrame,
+        data: hypersync.ArrowResponseData,
+        columns: List[str],
+    ) -> pl.DataFrame:
+        """
+        Join transaction and block columns onto logs using the integer `(block_number, transaction_index)` and
+        `block_number` keys of the logs.
+
+        Only the tables holding requested columns are converted and joined. Log columns the logs already hold, such
+        as `block_number`, are kept, while transaction and block columns that share a name with a column of the logs,
+        e.g. a decoded `to` parameter, are joined with a `_right` suffix. Block columns that share a name with a
+        transaction column are requested with a `_block` suffix, e.g. `gas_used_block`.
+
+        Args:
+            logs_df (pl.DataFrame): The logs, with `block_number` and `transaction_index` columns.
+            data (hypersync.ArrowResponseData): The arrow tables returned by the Hypersync client.
+            columns (List[str]): The transaction and block columns to join.
+
+        Returns:
+            pl.DataFrame: The logs joined with the requested columns.
+        """
+        log_columns = EVENT_LOG_COLUMNS + EVENT_LOG_EXTRA_COLUMNS
+        columns = [
+            column
+            for column in columns
+            if not (column in log_columns and column in logs_df.columns)
+        ]
+        if not columns:
+            return logs_df
+
+        transactions_df = pl.from_arrow(data.transactions)
+        tx_columns = [column for column in columns if column in transactions_df.columns]
+        block_columns = [column for column in columns if column not in tx_columns]
+
+        if tx_columns:
+            logs_df = logs_df.join(
+                transactions_df.select(
+                    "block_number", "transaction_index", *tx_columns
+                ),
+                on=["block_number", "transaction_index"],
+                how="left",
+            )
+
+        blocks_df = pl.from_arrow(data.blocks)
+        if block_columns and not blocks_df.is_empty():
+            block_fields = []
+            for column in block_columns:
+                # columns that collide with a transaction column are suffixed with _block
+                field_name = column
+                if column not in blocks_df.columns and column.endswith("_block"):
+                    field_name = column[: -len("_block")]
+                block_fields.append(pl.col(field_name).alias(column))
+
+            logs_df = logs_df.join(
+                blocks_df.select(pl.col("number").alias("block_number"), *block_fields),
+                on="block_number",
+                how="left",
+            )
+
+        return logs_df
+
+    @phase("join")
+    def _join_blocks(
+        self, transactions_df: pl.DataFrame, blocks_df: pl.DataFrame
+    ) -> pl.DataFrame:
+        """
+        Join the block data onto the transactions by block number.
+
+        Block columns that share a name with a transaction column are suffixed with `_block`.
+
+        Args:
+            transactions_df (pl.DataFrame): The transactions data.
+            blocks_df (pl.DataFrame): The blocks data.
+
+        Returns:
+            pl.DataFrame: The transactions joined with their block data.
+        """
+        if blocks_df.is_empty():
+            return transactions_df
+
+        return transactions_df.join(
+            blocks_df.rename({"number": "block_number"}),
+            on="block_number",
+            how="left",
+            suffix="_block",
+        )
+
+    async def _collect_data(
+        self,
+        query: hypersync.Query,
+        config: hypersync.StreamConfig,
+        save_data: bool,
+        tx_data: bool = False,
+        columns: Optional[List[str]] = None,
+        shards: int = 1,
+        name: str = "transactions",
+        uint256_columns: Optional[List[str]] = None,
+    ) -> Optional[pl.DataFrame]:
+        """
+        Collect logs data using the Hypersync client and return it as a Polars DataFrame or append it to the
+        partitioned parquet dataset of the manager.
+
+        Args:
+            query (hypersync.Query): The query object to execute.
+            config (hypersync.StreamConfig): The configuration for the data stream.
+            save_data (bool): Whether to save the data to the parquet dataset instead of returning it.
+            tx_data (bool): Whether to include transaction data in the result.
+            columns (Optional[List[str]]): The transaction and block columns to return.
+            shards (int): The number of block range shards to fetch concurrently. Ignored when saving data.
+            name (str): The `event` partition the data is saved to. Defaults to "transactions".
+            uint256_columns (Optional[List[str]]): The decoded integer columns to convert into 256-bit integers.
+                Defaults to None.
+
+        Returns:
+            Optional[pl.DataFrame]: The collected data as a Polars DataFrame, or None if no data is returned or the
+                data is saved.
+
+        Raises:
+            NoDataError: If all of the queried tables are empty.
+        """
+        if save_data:
+            await self._save_data(
+                query,
+                config,
+                name,
+                tx_data=tx_data,
+                columns=columns,
+                uint256_columns=uint256_columns,
+            )
+            return None
+
+        async def collect(shard_query: hypersync.Query) -> Optional[pl.DataFrame]:
+            data = await self._collect_arrow(shard_query, config)
+            return self._process_arrow_data(
+                data.data,
+                tx_data=tx_data,
+                columns=columns,
+                uint256_columns=uint256_columns,
+            )
+
+        result = await self._collect_shards(query, collect, shards=shards)
+        if result is None:
+            raise NoDataError("All queries returned empty results.")
+
+        return result
+
+    @property
+    def chain(self) -> str:
+        """
+        The name of the queried chain, used as the `chain` partition of saved data. This is the lowercase name of the
+        matching `HyperSyncClients` member, or the host of the url for other endpoints.
+        """
+        for network in HyperSyncClients:
+            if network.client == self.url:
+                return network.name.lower()
+        return urlparse(self.url).hostname or self.url
+
+    async def _save_data(
+        self,
+        query: hypersync.Query,
+        config: hypersync.StreamConfig,
+        name: str,
+        tx_data: bool = False,
+        columns: Optional[List[str]] = None,
+        uint256_columns: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Stream the data of a query into the partitioned parquet dataset of the manager.
+
+        Streamed batches are buffered until `dataset.max_rows_per_file` rows are collected, so the dataset is not
+        split into many small files, and only the buffered batches are held in memory.
+
+        Args:
+            query (hypersync.Query): The query object to execute.
+            config (hypersync.StreamConfig): The configuration for the data stream.
+            name (str): The `event` partition to save the data to.
+            tx_data (bool): Whether to include transaction data.
+            columns (Optional[List[str]]): The transaction and block columns to save.
+            uint256_columns (Optional[List[str]]): The decoded integer columns to convert into 256-bit integers.
+                Defaults to None.
+        """
+        batch_dfs = []
+        async for batch_df in self._stream_data(
+            query,
+            config,
+            tx_data=tx_data,
+            columns=columns,
+            uint256_columns=uint256_columns,
+        ):
+            batch_dfs.append(batch_df)
+            if sum(df.height for df in batch_dfs) >= self.dataset.max_rows_per_file:
+                self._write_dataset(
+                    pl.concat(batch_dfs, how="vertical_relaxed"), name
+                )
+                batch_dfs = []
+
+        if batch_dfs:
+            self._write_dataset(pl.concat(batch_dfs, how="vertical_relaxed"), name)
+
+    def _write_dataset(
+        self, df: pl.DataFrame, name: str, block_column: str = "block_number"
+    ) -> None:
+        """
+        Append rows to the parquet dataset of the manager, recording them in the metrics of the running query.
+
+        Args:
+            df (pl.DataFrame): The rows to append.
+            name (str): The `event` partition to save the rows to.
+            block_column (str): The block number column of the rows. Defaults to "block_number".
+        """
+        with measure_phase("save"):
+            self.dataset.write(df, self.chain, name, block_column=block_column)
+
+        record = current_query()
+        if record is not None:
+            record.rows += df.height
+
+    def _split_block_range(
+        self, from_block: int, to_block: int, shards: int
+    ) -> List[tuple[int, int]]:
+        """
+        Split a block range into contiguous, non-overlapping shards of roughly equal size.
+
+        Args:
+            from_block (int): The starting block number of the range (inclusive).
+            to_block (int): The ending block number of the range (exclusive).
+            shards (int): The number of shards to split the range into.
+
+        Returns:
+            List[tuple[int, int]]: The `(from_block, to_block)` pairs of each shard, in block order.
+        """
+        if to_block - from_block <= 1:
+            return [(from_block, to_block)]
+
+        shards = max(1, min(shards, to_block - from_block))
+        shard_size = -(-(to_block - from_block) // shards)  # ceiling division
+
+        return [
+            (shard_start, min(shard_start + shard_size, to_block))
+            for shard_start in range(from_block, to_block, shard_size)
+        ]
+
+    async def _collect_shards(
+        self,
+        query: hypersync.Query,
+        collect: Callable[[hypersync.Query], Awaitable[Optional[pl.DataFrame]]],
+        shards: int = 1,
+        block_column: str = "block_number",
+    ) -> Optional[pl.DataFrame]:
+        """
+        Split the block range of a query into shards, collect them concurrently and merge the results in block order.
+
+        Each shard only keeps the rows of its own half-open block range, so rows are never duplicated at the
+        shard boundaries.
+
+        Args:
+            query (hypersync.Query): The query object to execute.
+            collect (Callable[[hypersync.Query], Awaitable[Optional[pl.DataFrame]]]): Collects a single shard query.
+            shards (int): The number of shards to fetch concurrently. Defaults to 1, which runs the query as is.
+            block_column (str): The block number column used to trim each shard. Defaults to "block_number".
+
+        Returns:
+            Optional[pl.DataFrame]: The merged data of every shard, or None if no shard returned data.
+        """
+        if shards <= 1 or query.to_block is None:
+            return await collect(query)
+
+        shard_ranges = self._split_block_range(
+            query.from_block, query.to_block, shards
+        )
+        shard_dfs = await asyncio.gather(
+            *[
+                collect(replace(query, from_block=shard_from, to_block=shard_to))
+                for shard_from, shard_to in shard_ranges
+            ]
+        )
+
+        merged_dfs = []
+        for (shard_from, shard_to), shard_df in zip(shard_ranges, shard_dfs):
+            if shard_df is None:
+                continue
+            if block_column in shard_df.columns:
+                shard_df = shard_df.filter(
+                    pl.col(block_column).is_between(shard_from, shard_to, closed="left")
+                )
+            merged_dfs.append(shard_df)
+
+        if not merged_dfs:
+            return None
+
+        return pl.concat(merged_dfs, how="vertical_relaxed")
+
+    async def _stream_data(
+        self,
+        query: hypersync.Query,
+        config: hypersync.StreamConfig,
+        tx_data: bool = False,
+        columns: Optional[List[str]] = None,
+        uint256_columns: Optional[List[str]] = None,
+    ) -> AsyncIterator[pl.DataFrame]:
+        """
+        Stream data using the Hypersync client, yielding one Polars DataFrame per batch received.
+
+        Only a single batch is held in memory at a time, so memory use stays bounded regardless of the
+        size of the queried block range. Batches that return no data are skipped. If the stream fails, it is
+        reopened after a backoff from the block after the last batch received.
+
+        Args:
+            query (hypersync.Query): The query object to execute.
+            config (hypersync.StreamConfig): The configuration for the data stream.
+            tx_data (bool): Whether to include transaction data in each batch.
+            columns (Optional[List[str]]): The transaction and block columns to return.
+            uint256_columns (Optional[List[str]]): The decoded integer columns to convert into 256-bit integers.
+                Defaults to None.
+
+        Yields:
+            pl.DataFrame: The processed data of a single batch.
+        """
+        resume_query = query
+        attempt = 0
+        while True:
+            try:
+                stream = await self.client.stream_arrow(resume_query, config)
+            except Exception as error:
+                attempt += 1
+                await self.controller.backoff(attempt, error)
+                continue
+
+            try:
+                while True:
+                    start_time = time.perf_counter()
+                    try:
+                        response = await stream.recv()
+                    except Exception as error:
+                        attempt += 1
+                        await self.controller.backoff(attempt, error)
+                        break  # reopen the stream from the last batch received
+                    if response is None:
+                        return
+                    record_response(response, time.perf_counter() - start_time)
+                    attempt = 0
+                    resume_query = replace(query, from_block=response.next_block)
+
+                    batch_df = self._process_arrow_data(
+                        response.data,
+                        tx_data=tx_data,
+                        columns=columns,
+                        uint256_columns=uint256_columns,
+                    )
+                    if batch_df is not None:
+                        yield batch_df
+            finally:
+                # stop the background task from fetching more data if the consumer exits early
+                await stream.close()
+
+    async def _get_block_range(
+        self,
+        from_block: Optional[int] = None,
+        to_block: Optional[int] = None,
+        block_range: Optional[int] = None,
+    ) -> dict[str, int]:
+        """
+        Determine the block range to be used in a query.
+
+        Args:
+            from_block (Optional[int]): The starting block number, optional.
+            to_block (Optional[int]): The ending block number, optional.
+            block_range (Optional[int]): The range of blocks, optional.
+
+        Returns:
+            dict[str, int]: A dictionary containing 'from_block' and 'to_block'.
+        """
+        if to_block is None:
+            to_block = await self._get_height()  # Await only once
+
+        from_block = from_block or (to_block - block_range if block_range else 0)
+
+        return {"from_block": from_block, "to_block": to_block}
+
+    def _create_event_query(
+        self,
+        event_config: EventConfig,
+        from_block: int,
+        to_block: int,
+        address: Optional[Union[str, Iterable[str]]] = None,
+        tx_data: bool = True,
+        columns: Optional[List[str]] = None,
+        topic_filters: Optional[Dict[int, Iterable[str]]] = None,
+        contracts: Optional[Iterable[str]] = None,
+    ) -> hypersync.Query:
+        """
+        Create a query for a specific event based on the event signature.
+
+        If the `contract` in the `EventConfig` class is None, then the query will use wildcard indexing to find the
+        event logs. See docs here - https://docs.envio.dev/docs/HyperIndex/wildcard-indexing
+
+        Address and topic value sets are deduplicated, normalized and split over as many log selections as the
+        selection limits require, see `filters.build_log_selections`. Queries with more selections than a single
+        query holds are split by `fetch_event_range`.
+
+        Args:
+            event_signature (str): The event signature to query.
+            from_block (int): The starting block number for the query.
+            to_block (int): The ending block number for the query.
+            address (Optional[Union[str, Iterable[str]]]): Optional address, or set of addresses, to filter topic1
+                of the event logs.
+            tx_data (bool): Whether to request the transaction and block data of the event logs.
+            columns (Optional[List[str]]): The transaction and block columns to request. Defaults to
+                `EVENT_TRANSACTION_COLUMNS`.
+            topic_filters (Optional[Dict[int, Iterable[str]]]): The allowed values of topic1 to topic3, keyed by
+                topic position. Overrides the `address` filter of the same topic.
+            contracts (Optional[Iterable[str]]): The contracts whose logs to query, overriding the `contract` of the
+                event configuration. Defaults to None.
+
+        Returns:
+            hypersync.Query: The constructed query object.
+
+        Raises:
+            ValueError: If the event signature is not supported.
+        """
+        # only request the fields that end up in the result, the columns held by the logs are taken from the logs
+        field_selection = self._create_field_selection(
+            [
+                column
+                for column in columns or EVENT_TRANSACTION_COLUMNS
+                if column not in EVENT_LOG_COLUMNS + EVENT_LOG_EXTRA_COLUMNS
+            ]
+            if tx_data
+            else [],
+            log_fields=EVENT_LOG_FIELDS,
+            column_mapping=event_config.column_mapping,
+        )
+
+        # an empty address set matches no logs, like an empty contract set
+        topics = {}
+        if address is not None:
+            topics[1] = normalize_topic_values(normalize_addresses(address))
+        for position, values in (topic_filters or {}).items():
+            topics[position] = normalize_topic_values(values)
+
+        # without a contract the query uses wildcard indexing
+        if contracts is None and event_config.contract is not None:
+            contracts = [event_config.contract]
+
+        return self._create_query(
+            from_block=from_block,
+            to_block=to_block,
+            logs=build_log_selections(
+                event_config.get_topic(),
+                normalize_addresses(contracts) if contracts is not None else None,
+                topics,
+            ),
+            field_selection=field_selection,
+        )
+
+    def _merge_column_mappings(
+        self, event_configs: List[EventConfig]
+    ) -> hypersync.ColumnMapping:
+        """
+        Merge the transaction and block column mappings of several events into a single column mapping.
+
+        Args:
+            event_configs (List[EventConfig]): The event configurations to merge.
+
+        Returns:
+            hypersync.ColumnMapping: The merged transaction and block column mapping.
+        """
+        transaction_mapping = {}
+        block_mapping = {}
+        for event_config in event_configs:
+            transaction_mapping.update(event_config.column_mapping.transaction or {})
+            block_mapping.update(event_config.column_mapping.block or {})
+
+        return hypersync.ColumnMapping(
+            transaction=transaction_mapping, block=block_mapping
+        )
+
+    @phase("process")
+    def _process_raw_logs(
+        self,
+        data: hypersync.ArrowResponseData,
+        tx_data: bool = True,
+        columns: Optional[List[str]] = None,
+    ) -> Optional[pl.DataFrame]:
+        """
+        Convert the undecoded logs of an arrow response into a Polars DataFrame, joining the transaction and block
+        data onto every log if requested.
+
+        Args:
+            data (hypersync.ArrowResponseData): The arrow tables returned by the Hypersync client.
+            tx_data (bool): Whether to join the transaction and block data onto the logs.
+            columns (Optional[List[str]]): The transaction and block columns to join. Defaults to
+                `EVENT_TRANSACTION_COLUMNS`.
+
+        Returns:
+            Optional[pl.DataFrame]: The raw logs, or None if no logs are returned.
+        """
+        logs_df = pl.from_arrow(data.logs)
+        if logs_df.is_empty():
+            return None
+        if not tx_data:
+            return logs_df
+
+        # columns shared with the logs, such as the block number, are taken from the logs
+        tx_columns = [
+            column
+            for column in columns or EVENT_TRANSACTION_COLUMNS
+            if column != "hash"
+        ]
+        return self._join_tx_columns(logs_df, data, tx_columns)
+
+    def _decode_event_logs(
+        self,
+        event_logs_df: pl.DataFrame,
+        event_config: EventConfig,
+        tx_data: bool = True,
+        columns: Optional[List[str]] = None,
+    ) -> pl.DataFrame:
+        """
+        Decode the raw logs of a single event with its event signature and column mapping.
+
+        Args:
+            event_logs_df (pl.DataFrame): The raw logs of the event, as returned by `_process_raw_logs`.
+            event_config (EventConfig): The event configuration to decode the logs with.
+            tx_data (bool): Whether the transaction and block columns are included in the result.
+            columns (Optional[List[str]]): The transaction and block columns to include. Defaults to
+                `EVENT_TRANSACTION_COLUMNS`.
+
+        Returns:
+            pl.DataFrame: The decoded logs.
+        """
+        decoded_logs_df = decode_logs(
+            event_logs_df,
+            event_config.signature,
+            event_config.column_mapping.decoded_log,
+        )
+        if event_config.uint256_columns:
+            decoded_logs_df = decode_uint256_columns(
+                decoded_logs_df, event_config.uint256_columns
+            )
+        if not tx_data:
+            return decoded_logs_df
+
+        # columns that share a name with an event parameter get the same `_right` suffix as in `_process_arrow_data`
+        tx_columns = [
+            pl.col("transaction_hash").alias("hash")
+            if column == "hash"
+            else pl.col(column).alias(
+                self._tx_column_name(column, decoded_logs_df.columns)
+            )
+            for column in columns or EVENT_TRANSACTION_COLUMNS
+        ]
+        return decoded_logs_df.hstack(event_logs_df.select(tx_columns))
+
+    @phase("decode")
+    def _decode_raw_logs(
+        self,
+        logs_df: pl.DataFrame,
+        event_configs: List[EventConfig],
+        tx_data: bool = True,
+        columns: Optional[List[str]] = None,
+    ) -> Dict[str, pl.DataFrame]:
+        """
+        Split raw logs by topic0 in a single pass (and by contract, if set) and decode every group with its own event
+        signature and column mapping.
+
+        Args:
+            logs_df (pl.DataFrame): The raw logs, as returned by `_process_raw_logs`.
+            event_configs (List[EventConfig]): The event configurations to decode the logs with.
+            tx_data (bool): Whether the transaction and block columns are included in the result.
+            columns (Optional[List[str]]): The transaction and block columns to include. Defaults to
+                `EVENT_TRANSACTION_COLUMNS`.
+
+        Returns:
+            Dict[str, pl.DataFrame]: The decoded logs of every event, keyed by event name.
+        """
+        topic_dfs = partition_logs(logs_df)
+        event_dfs = {}
+        for event_config in event_configs:
+            event_logs_df = topic_dfs.get(
+                self._encode_hex(event_config.get_topic()), logs_df.clear()
+            )
+            if event_config.contract is not None:
+                event_logs_df = event_logs_df.filter(
+                    pl.col("address") == self._encode_hex(event_config.contract)
+                )
+            event_dfs[event_config.name] = self._decode_event_logs(
+                event_logs_df, event_config, tx_data=tx_data, columns=columns
+            )
+
+        return event_dfs
+
+    @phase("decode")
+    def _route_raw_logs(
+        self,
+        logs_df: pl.DataFrame,
+        registry: EventRegistry,
+        tx_data: bool = True,
+        columns: Optional[List[str]] = None,
+    ) -> Tuple[Dict[str, pl.DataFrame], List[Tuple[EventConfig, List[str]]]]:
+        """
+        Route raw logs of any event to the event configurations of their topic0 and decode every group at once.
+
+        Logs of a topic0 go to the configuration bound to their contract, or else to the first configuration of any
+        contract. Logs without a matching configuration, or whose values do not fit the column mapping, are kept
+        undecoded. Logs of configurations that the vectorized decoder does not support (see `decoder.can_decode`)
+        are not decoded here, their configurations are returned with the contracts that emitted them instead.
+
+        Args:
+            logs_df (pl.DataFrame): The raw logs, as returned by `_process_raw_logs`.
+            registry (EventRegistry): The event configurations to route the logs to.
+            tx_data (bool): Whether the transaction and block columns are included in the result.
+            columns (Optional[List[str]]): The transaction and block columns to include. Defaults to
+                `EVENT_TRANSACTION_COLUMNS`.
+
+        Returns:
+            Tuple[Dict[str, pl.DataFrame], List[Tuple[EventConfig, List[str]]]]: The decoded logs of every event that
+                has logs, keyed by event name, with the raw logs of the unknown topics under `UNKNOWN_TOPICS`, and the
+                unsupported event configurations with the prefixed hex addresses of the contracts that emitted them.
+        """
+        event_dfs: Dict[str, List[pl.DataFrame]] = {}
+        unknown_dfs = []
+        client_decoded = []
+        for topic0, topic_df in partition_logs(logs_df).items():
+            configs = []
+            if topic0 is not None:
+                configs = registry.by_topic.get(normalize_topic(topic0), [])
+            # configurations bound to a contract take precedence over the first one of any contract
+            routes = [config for config in configs if config.contract is not None]
+            routes += [config for config in configs if config.contract is None][:1]
+
+            for event_config in routes:
+                if event_config.contract is None:
+                    event_logs_df, topic_df = topic_df, topic_df.clear()
+                else:
+                    is_contract = pl.col("address") == self._encode_hex(
+                        event_config.contract
+                    )
+                    event_logs_df = topic_df.filter(is_contract)
+                    topic_df = topic_df.filter(~is_contract)
+                if event_logs_df.is_empty():
+                    continue
+                if not can_decode(
+                    event_config.signature, event_config.column_mapping.decoded_log
+                ):
+                    addresses = event_logs_df.select(
+                        pl.col("address").unique(maintain_order=True)
+                    )
+                    if self.binary_output:
+                        addresses = format_hex(addresses)
+                    client_decoded.append(
+                        (event_config, addresses["address"].to_list())
+                    )
+                    continue
+
+                try:
+                    decoded_logs_df = self._decode_event_logs(
+                        event_logs_df, event_config, tx_data=tx_data, columns=columns
+                    )
+                except ValueError:
+                    # values that do not fit the column mapping of the event
+                    unknown_dfs.append(event_logs_df)
+                    continue
+                event_dfs.setdefault(event_config.name, []).append(decoded_logs_df)
+
+            if not topic_df.is_empty():
+                unknown_dfs.append(topic_df)
+
+        result = {
+            name: pl.concat(dfs, how="diagonal_relaxed")
+            for name, dfs in event_dfs.items()
+        }
+        result[UNKNOWN_TOPICS] = (
+            pl.concat(unknown_dfs) if unknown_dfs else logs_df.clear()
+        )
+        return result, client_decoded
+
+    async def fetch_event_range(
+        self,
+        event_config: EventConfig,
+        from_block: int,
+        to_block: int,
+        address: Optional[Union[str, Iterable[str]]] = None,
+        tx_data: bool = True,
+        columns: Optional[List[str]] = None,
+        shards: int = 1,
+        topic_filters: Optional[Dict[int, Iterable[str]]] = None,
+        contracts: Optional[Iterable[str]] = None,
+    ) -> Optional[pl.DataFrame]:
+        """
+        Fetch and decode the logs of an event within an exact block range, bypassing the cache.
+
+        Unlike `execute_event_query`, the range is not resolved against the chain height and an empty range is not an
+        error, which suits jobs that track their own progress such as `SyncJob`. If the address, topic and contract
+        sets need more log selections than a single query holds, the selections are split over queries that run
+        concurrently, and their results are merged in block order.
+
+        Args:
+            event_config (EventConfig): The event configuration to query.
+            from_block (int): The starting block number of the range (inclusive).
+            to_block (int): The ending block number of the range (exclusive).
+            address (Optional[Union[str, Iterable[str]]]): The address, or set of addresses, to filter topic1 of the
+                event logs. Defaults to None.
+            tx_data (bool): Whether to include transaction data. Defaults to True.
+            columns (Optional[List[str]]): The transaction and block columns to return.
+            shards (int): The number of block range shards to fetch concurrently. Defaults to 1.
+            topic_filters (Optional[Dict[int, Iterable[str]]]): The allowed values of topic1 to topic3, keyed by
+                topic position.
+            contracts (Optional[Iterable[str]]): The contracts whose logs to fetch, overriding the `contract` of the
+                event configuration. Defaults to None.
+
+        Returns:
+            Optional[pl.DataFrame]: The decoded event logs, or None if the range holds no logs.
+        """
+        query = self._create_event_query(
+            event_config,
+            from_block,
+            to_block,
+            address,
+            tx_data=tx_data,
+            columns=columns,
+            topic_filters=topic_filters,
+            contracts=contracts,
+        )
+        config = self._create_event_stream_config(event_config)
+
+        async def collect(shard_query: hypersync.Query) -> Optional[pl.DataFrame]:
+            data = await self._collect_arrow(shard_query, config)
+            return self._process_arrow_data(
+                data.data,
+                tx_data=tx_data,
+                columns=columns,
+                uint256_columns=event_config.uint256_columns,
+            )
+
+        return await self._collect_batches(query, collect, shards=shards)
+
+    async def _collect_batches(
+        self,
+        query: hypersync.Query,
+        collect: Callable[[hypersync.Query], Awaitable[Optional[pl.DataFrame]]],
+        shards: int = 1,
+    ) -> Optional[pl.DataFrame]:
+        """
+        Split the log selections of a query over as few queries as the selection limit allows, collect them
+        concurrently and merge the results in block order.
+
+        Args:
+            query (hypersync.Query): The query to split.
+            collect (Callable[[hypersync.Query], Awaitable[Optional[pl.DataFrame]]]): Collects a single shard query.
+            shards (int): The number of block range shards of every query. Defaults to 1.
+
+        Returns:
+            Optional[pl.DataFrame]: The merged data of every query, or None if no query returned data.
+        """
+        batches = batch_selections(query.logs)
+        if not batches:
+            # the address, topic or contract set is empty, so no log can match
+            return None
+        if len(batches) == 1:
+            return await self._collect_shards(query, collect, shards=shards)
+
+        batch_dfs = await asyncio.gather(
+            *[
+                self._collect_shards(replace(query, logs=batch), collect, shards=shards)
+                for batch in batches
+            ]
+        )
+        batch_dfs = [batch_df for batch_df in batch_dfs if batch_df is not None]
+        if not batch_dfs:
+            return None
+
+        # the selections of different batches never match the same log
+        merged_df = pl.concat(batch_dfs, how="vertical_relaxed")
+        if "block_number" in merged_df.columns:
+            merged_df = merged_df.sort("block_number", maintain_order=True)
+        return merged_df
+
+    async def _execute_cached_event_query(
+        self,
+        event_config: EventConfig,
+        from_block: int,
+        to_block: int,
+        address: Optional[Union[str, Iterable[str]]] = None,
+        tx_data: bool = True,
+        columns: Optional[List[str]] = None,
+        shards: int = 1,
+        topic_filters: Optional[Dict[int, Iterable[str]]] = None,
+        contracts: Optional[Iterable[str]] = None,
+    ) -> Optional[pl.DataFrame]:
+        """
+        Execute an event query through the local cache, fetching only the block ranges that are not cached yet.
+
+        The fetched ranges are stored in the cache before the full range is read back. The block number is always
+        fetched, since the cache needs it to slice the stored rows by block range, and dropped again if it was not
+        requested. The last `EventCache.confirmations` blocks of the chain are fetched on every query and never
+        cached, so rows of blocks that are reorganized later are not served from the cache.
+
+        Args:
+            event_config (EventConfig): The event configuration to query.
+            from_block (int): The starting block number of the range (inclusive).
+            to_block (int): The ending block number of the range (exclusive).
+            address (Optional[Union[str, Iterable[str]]]): The address, or set of addresses, to filter topic1 of the
+                event logs. Defaults to None.
+            tx_data (bool): Whether to include transaction data. Defaults to True.
+            columns (Optional[List[str]]): The transaction and block columns to return.
+            shards (int): The number of block range shards to fetch concurrently. Defaults to 1.
+            topic_filters (Optional[Dict[int, Iterable[str]]]): The allowed values of topic1 to topic3, keyed by
+                topic position. Defaults to None.
+            contracts (Optional[Iterable[str]]): The contracts whose logs to fetch, overriding the `contract` of the
+                event configuration. Defaults to None.
+
+        Returns:
+            Optional[pl.DataFrame]: The decoded event logs of the full range, or None if the range holds no logs.
+        """
+        # never cache blocks beyond the chain height, they would be recorded as empty, nor unconfirmed blocks
+        height = await self._get_height()
+        to_block = min(to_block, height)
+        cache_to_block = max(from_block, self.cache.cacheable_to_block(to_block, height))
+
+        # the same set is served from the same cache entry, and an empty set is keyed apart from no filter
+        address_key, filter_key = filter_keys(address, topic_filters, contracts)
+        key = self.cache.get_key(
+            self.url,
+            event_config.get_topic(),
+            event_config.signature,
+            event_config.contract,
+            event_config.column_mapping,
+            address_key,
+            tx_data,
+            columns,
+            # binary results are cached separately, the key of hex results is unchanged
+            *(["binary"] if self.binary_output else []),
+            *filter_key,
+            # the raw integers of uint256 columns are cached as limbs, the key of other events is unchanged
+            *(
+                [("uint256", sorted(event_config.uint256_columns))]
+                if event_config.uint256_columns
+                else []
+            ),
+        )
+        if not tx_data:
+            fetch_columns = ["block_number"]
+        else:
+            fetch_columns = list(columns or EVENT_TRANSACTION_COLUMNS)
+            if "block_number" not in fetch_columns:
+                fetch_columns.append("block_number")
+
+        missing_ranges = self.cache.get_missing_ranges(
+            key, from_block, cache_to_block
+        )
+        unconfirmed_range = (cache_to_block, to_block)
+        fetch_dfs = await asyncio.gather(
+            *[
+                self.fetch_event_range(
+                    event_config,
+                    range_from,
+                    range_to,
+                    address_key,
+                    tx_data=True,
+                    columns=fetch_columns,
+                    shards=shards,
+                    topic_filters=topic_filters,
+                    contracts=contracts,
+                )
+                for range_from, range_to in missing_ranges + [unconfirmed_range]
+                if range_from < range_to
+            ]
+        )
+        unconfirmed_df = fetch_dfs.pop() if cache_to_block < to_block else None
+        for (range_from, range_to), missing_df in zip(missing_ranges, fetch_dfs):
+            self.cache.write(key, range_from, range_to, missing_df)
+
+        dfs = [
+            df
+            for df in [self.cache.read(key, from_block, cache_to_block), unconfirmed_df]
+            if df is not None and not df.is_empty()
+        ]
+        if not dfs:
+            return None
+        result = pl.concat(dfs, how="diagonal_relaxed")
+        if not tx_data:
+            return result.drop("hash", "block_number")
+        if "block_number" not in (columns or EVENT_TRANSACTION_COLUMNS):
+            return result.drop("block_number")
+        return result
+
+    def _create_event_stream_config(
+        self, event_config: EventConfig
+    ) -> hypersync.StreamConfig:
+        """
+        Create the stream configuration used to decode the logs of a specific event.
+
+        Args:
+            event_config (EventConfig): The event configuration to decode the logs with.
+
+        Returns:
+            hypersync.StreamConfig: The stream configuration for the event.
+        """
+        return hypersync.StreamConfig(
+            hex_output=self.hex_output,
+            event_signature=event_config.signature,
+            column_mapping=event_config.column_mapping,
+        )
+
+    @timer
+    async def execute_event_query(
+        self,
+        event_config: EventConfig,
+        from_block: Optional[int] = None,
+        to_block: Optional[int] = None,
+        block_range: Optional[int] = None,
+        save_data: bool = False,
+        print_time: bool = True,
+        address: Optional[Union[str, Iterable[str]]] = None,
+        tx_data: bool = True,
+        columns: Optional[List[str]] = None,
+        shards: int = 1,
+        contracts: Optional[Iterable[str]] = None,
+        topic_filters: Optional[Dict[int, Iterable[str]]] = None,
+    ) -> Optional[pl.DataFrame]:
+        """
+        Execute a query for a specific event by its signature and collect the data.
+
+        If the `contract` in the `EventConfig` class is None, then the query will use wildcard indexing to find the
+        event logs. See docs here - https://docs.envio.dev/docs/HyperIndex/wildcard-indexing
+
+
+        Args:
+            event_name (str): The name of the event to query.
+            from_block (Optional[int]): The starting block number for the query. Defaults to None, which will use the latest block.
+            to_block (Optional[int]): The ending block number for the query. Defaults to None, which will use the latest block.
+            block_range (Optional[int]): Specifies a block range to query if from_block and to_block are not provided. Optional.
+            save_data (bool): Whether to append the data to the partitioned parquet dataset of the manager instead of
+                returning it. Defaults to False.
+            print_time (bool): Whether to log the execution time of the query. Defaults to True.
+            address (Optional[Union[str, Iterable[str]]]): The address, or set of addresses, to filter topic1 of the
+                event logs, e.g. the senders of a transfer. An empty set matches no logs. Defaults to None.
+            tx_data (bool): Whether to include transaction data. Defaults to True.
+            columns (Optional[List[str]]): The transaction and block columns to return. Only the fields needed for
+                these columns are requested from the server. The log columns in `EVENT_LOG_EXTRA_COLUMNS`, such as the
+                emitting contract `address`, can be requested as well. Defaults to `EVENT_TRANSACTION_COLUMNS`.
+            shards (int): The number of block range shards to fetch concurrently. Defaults to 1.
+            contracts (Optional[Iterable[str]]): The contracts whose logs to query, overriding the `contract` of the
+                event configuration, e.g. thousands of pools. An empty set matches no logs. Defaults to None.
+            topic_filters (Optional[Dict[int, Iterable[str]]]): The allowed values of topic1 to topic3, keyed by
+                topic position. Overrides the `address` filter of the same topic. Defaults to None.
+
+        Returns:
+            Optional[pl.DataFrame]: The collected data as a Polars DataFrame, or None if no data is returned.
+
+        Raises:
+            NoDataError: If no data is returned for the specified event name.
+            ValueError: If the query range is invalid.
+        """
+        # Determine the block range for the query
+        block_range_dict = await self._get_block_range(
+            from_block, to_block, block_range
+        )
+
+        if save_data:
+            # the saved data is partitioned by block number, so it is always requested
+            if not tx_data:
+                columns = ["block_number"]
+            elif columns is not None and "block_number" not in columns:
+                columns = [*columns, "block_number"]
+
+            # Create the query object for the specified event and append the data to the parquet dataset
+            query = self._create_event_query(
+                event_config,
+                block_range_dict["from_block"],
+                block_range_dict["to_block"],
+                address,
+                tx_data=True,
+                columns=columns,
+                topic_filters=topic_filters,
+                contracts=contracts,
+            )
+            config = self._create_event_stream_config(event_config)
+            for batch in batch_selections(query.logs):
+                await self._collect_data(
+                    replace(query, logs=batch),
+                    config,
+                    save_data,
+                    tx_data=True,
+                    columns=columns,
+                    name=event_config.name,
+                    uint256_columns=event_config.uint256_columns,
+                )
+            return None
+
+        if self.cache is not None:
+            # Serve the query from the local cache, only fetching the missing block ranges
+            result = await self._execute_cached_event_query(
+                event_config,
+                block_range_dict["from_block"],
+                block_range_dict["to_block"],
+                address=address,
+                tx_data=tx_data,
+                columns=columns,
+                shards=shards,
+                topic_filters=topic_filters,
+                contracts=contracts,
+            )
+        else:
+            result = await self.fetch_event_range(
+                event_config,
+                block_range_dict["from_block"],
+                block_range_dict["to_block"],
+                address=address,
+                tx_data=tx_data,
+                columns=columns,
+                shards=shards,
+                topic_filters=topic_filters,
+                contracts=contracts,
+            )
+
+        # Handle the case where no data is returned
+        if result is None:
+            raise NoDataError(f"No data returned for event name: {event_config.name} from blocks {
+                             block_range_dict['from_block']} to {block_range_dict['to_block']}")
+
+        self._index_txs(result)
+        return result
+
+    async def stream_event_query(
+        self,
+        event_config: EventConfig,
+        from_block: Optional[int] = None,
+        to_block: Optional[int] = None,
+        block_range: Optional[int] = None,
+        address: Optional[Union[str, Iterable[str]]] = None,
+        tx_data: bool = True,
+        columns: Optional[List[str]] = None,
+        contracts: Optional[Iterable[str]] = None,
+    ) -> AsyncIterator[pl.DataFrame]:
+        """
+        Stream the logs of a specific event, yielding one Polars DataFrame per batch as it arrives from the
+        Hypersync stream.
+
+        This is the streaming counterpart of `execute_event_query`. Each batch receives the same transaction and
+        block enrichment, but only one batch is held in memory at a time, which makes it suitable for backfilling
+        busy events over very large block ranges. Address and contract sets that need more log selections than a
+        single query holds are streamed one query after the other, so batches are only in block order per query.
+
+        Args:
+            event_config (EventConfig): The event configuration to query.
+            from_block (Optional[int]): The starting block number for the query. Defaults to None.
+            to_block (Optional[int]): The ending block number for the query. Defaults to None, which will use the latest block.
+            block_range (Optional[int]): Specifies a block range to query if from_block and to_block are not provided. Optional.
+            address (Optional[Union[str, Iterable[str]]]): The address, or set of addresses, to filter topic1 of the
+                event logs. Defaults to None.
+            tx_data (bool): Whether to include transaction data. Defaults to True.
+            columns (Optional[List[str]]): The transaction and block columns to return. Only the fields needed for
+                these columns are requested from the server. Defaults to `EVENT_TRANSACTION_COLUMNS`.
+            contracts (Optional[Iterable[str]]): The contracts whose logs to stream, overriding the `contract` of the
+                event configuration. Defaults to None.
+
+        Yields:
+            pl.DataFrame: The decoded event logs of a single batch.
+        """
+        block_range_dict = await self._get_block_range(
+            from_block, to_block, block_range
+        )
+
+        query = self._create_event_query(
+            event_config,
+            block_range_dict["from_block"],
+            block_range_dict["to_block"],
+            address,
+            tx_data=tx_data,
+            columns=columns,
+            contracts=contracts,
+        )
+        config = self._create_event_stream_config(event_config)
+
+        for batch in batch_selections(query.logs):
+            async for batch_df in self._stream_data(
+                replace(query, logs=batch),
+                config,
+                tx_data=tx_data,
+                columns=columns,
+                uint256_columns=event_config.uint256_columns,
+            ):
+                yield batch_df
+
+    async def follow_event_query(
+        self,
+        event_config: EventConfig,
+        from_block: Optional[int] = None,
+        confirmations: int = 0,
+        poll_interval: float = 1.0,
+        address: Optional[Union[str, Iterable[str]]] = None,
+        tx_data: bool = True,
+        columns: Optional[List[str]] = None,
+        contracts: Optional[Iterable[str]] = None,
+    ) -> AsyncIterator[pl.DataFrame]:
+        """
+        Follow the chain head and yield the logs of a specific event as new blocks are produced.
+
+        Every block is fetched exactly once: the generator keeps track of the next block to fetch and only queries
+        the blocks produced since the previous poll. Like `SyncJob` and the `EventCache`, the generator treats the
+        height as the exclusive end of the available blocks and holds back the last `confirmations` blocks below it.
+        Failed height requests are retried with the backoff of the concurrency controller, so a transient error does
+        not stop the generator.
+
+        Args:
+            event_config (EventConfig): The event configuration to query.
+            from_block (Optional[int]): The block to start following from. Defaults to None, which starts at the
+                first block that is not confirmed yet.
+            confirmations (int): The number of most recent blocks whose logs are not yielded yet, to avoid yielding
+                blocks that could still be reorganized. Defaults to 0.
+            poll_interval (float): The number of seconds to wait before polling the chain height again when no new
+                blocks are confirmed. Defaults to 1.0.
+            address (Optional[Union[str, Iterable[str]]]): The address, or set of addresses, to filter topic1 of the
+                event logs. Defaults to None.
+            tx_data (bool): Whether to include transaction data. Defaults to True.
+            columns (Optional[List[str]]): The transaction and block columns to return.
+            contracts (Optional[Iterable[str]]): The contracts whose logs to follow, overriding the `contract` of the
+                event configuration. Defaults to None.
+
+        Yields:
+            pl.DataFrame: The decoded logs of the newly confirmed blocks.
+
+        Raises:
+            Exception: The error of the height request, once its retries are exhausted or if it is not retryable.
+        """
+        next_block = from_block
+        attempt = 0
+        while True:
+            try:
+                height = await self._get_height(force_refresh=True)
+            except Exception as error:
+                attempt += 1
+                await self.controller.backoff(attempt, error)
+                continue
+            attempt = 0
+
+            # the height is the exclusive end of the available blocks
+            confirmed_to_block = height - confirmations
+            if next_block is None:
+                next_block = confirmed_to_block
+
+            if confirmed_to_block <= next_block:
+                await asyncio.sleep(poll_interval)
+                continue
+
+            new_df = await self.fetch_event_range(
+                event_config,
+                next_block,
+                confirmed_to_block,
+                address=address,
+                tx_data=tx_data,
+                columns=columns,
+                contracts=contracts,
+            )
+            next_block = confirmed_to_block
+
+            if new_df is not None and not new_df.is_empty():
+                yield new_df
+
+    @timer
+    async def execute_events_query(
+        self,
+        event_configs: List[EventConfig],
+        from_block: Optional[int] = None,
+        to_block: Optional[int] = None,
+        block_range: Optional[int] = None,
+        print_time: bool = True,
+        address: Optional[Union[str, Iterable[str]]] = None,
+        tx_data: bool = True,
+        columns: Optional[List[str]] = None,
+        shards: int = 1,
+    ) -> Dict[str, pl.DataFrame]:
+        """
+        Execute a single query for several events at once and decode the logs of each event separately.
+
+        The query holds one log selection per event, so the chain is scanned and the transaction and block data is
+        downloaded only once. The returned logs are split by topic0 and decoded with the signature and column
+        mapping of their own event. Events that the vectorized decoder can not decode exactly like the Hypersync
+        client, such as events with tuple or array parameters (see `decoder.can_decode`), are left out of the scan
+        and queried like in `execute_event_query` instead, so every event is returned exactly as
+        `execute_event_query` returns it.
+
+        Args:
+            event_configs (List[EventConfig]): The event configurations to query.
+            from_block (Optional[int]): The starting block number for the query. Defaults to None.
+            to_block (Optional[int]): The ending block number for the query. Defaults to None, which will use the latest block.
+            block_range (Optional[int]): Specifies a block range to query if from_block and to_block are not provided. Optional.
+            print_time (bool): Whether to log the execution time of the query. Defaults to True.
+            address (Optional[Union[str, Iterable[str]]]): The address, or set of addresses, to filter topic1 of the
+                event logs of every event. Defaults to None.
+            tx_data (bool): Whether to include transaction data. Defaults to True.
+            columns (Optional[List[str]]): The transaction and block columns to return. Only the fields needed for
+                these columns are requested from the server. Defaults to `EVENT_TRANSACTION_COLUMNS`.
+            shards (int): The number of block range shards to fetch concurrently. Defaults to 1.
 
-    def __hash__(self):
-        return hash(self.url)  # Make the object hashable based on URL
+        Returns:
+            Dict[str, pl.DataFrame]: The decoded logs of every event, keyed by event name. Events without any logs
+                are returned as empty DataFrames.
 
-    async def _get_height(self) -> int:
+        Raises:
+            NoDataError: If no data is returned for any of the events.
         """
-        Get the current block height from the blockchain.
+        block_range_dict = await self._get_block_range(
+            from_block, to_block, block_range
+        )
+        decoded_configs, client_decoded_configs = [], []
+        for event_config in event_configs:
+            decoded_log = event_config.column_mapping.decoded_log
+            if can_decode(event_config.signature, decoded_log):
+                decoded_configs.append(event_config)
+            else:
+                client_decoded_configs.append(event_config)
 
-        Returns:
-            int: The current block height.
-        """
-        return await self.client.get_height()
+        event_dfs = {}
+        if decoded_configs:
+            event_dfs = await self._scan_events(
+                decoded_configs,
+                block_range_dict["from_block"],
+                block_range_dict["to_block"],
+                address=address,
+                tx_data=tx_data,
+                columns=columns,
+                shards=shards,
+            )
 
-    def _create_query(
+        for event_config in client_decoded_configs:
+            event_df = await self.fetch_event_range(
+                event_config,
+                block_range_dict["from_block"],
+                block_range_dict["to_block"],
+                address=address,
+                tx_data=tx_data,
+                columns=columns,
+                shards=shards,
+            )
+            if event_df is not None:
+                event_dfs[event_config.name] = event_df
+
+        if not event_dfs:
+            raise NoDataError(
+                f"No data returned for events: {[event_config.name for event_config in event_configs]} from blocks {
+                    block_range_dict['from_block']} to {block_range_dict['to_block']}"
+            )
+
+        event_dfs = {
+            event_config.name: event_dfs.get(event_config.name, pl.DataFrame())
+            for event_config in event_configs
+        }
+        for event_df in event_dfs.values():
+            self._index_txs(event_df)
+
+        return event_dfs
+
+    async def _scan_events(
         self,
+        event_configs: List[EventConfig],
         from_block: int,
         to_block: int,
-        logs: List[hypersync.LogSelection],
-        transactions: Optional[List[hypersync.TransactionSelection]] = None,
-        blocks: Optional[List[hypersync.BlockSelection]] = None,
-    ) -> hypersync.Query:
+        address: Optional[Union[str, Iterable[str]]] = None,
+        tx_data: bool = True,
+        columns: Optional[List[str]] = None,
+        shards: int = 1,
+    ) -> Dict[str, pl.DataFrame]:
         """
-        Create a Hypersync query object for querying blockchain data.
+        Fetch the logs of several events in a single scan and decode the logs of every event with `decode_logs`.
 
         Args:
-            from_block (int): The starting block number for the query.
-            to_block (int): The ending block number for the query.
-            logs (List[hypersync.LogSelection]): A list of log selections to filter the query.
-            transactions (Optional[List[hypersync.TransactionSelection]]): Optional transaction selections for the query.
+            event_configs (List[EventConfig]): The event configurations to query, which must be supported by
+                `decoder.can_decode`.
+            from_block (int): The starting block number of the range (inclusive).
+            to_block (int): The ending block number of the range (exclusive).
+            address (Optional[Union[str, Iterable[str]]]): The address, or set of addresses, to filter topic1 of the
+                event logs of every event. Defaults to None.
+            tx_data (bool): Whether to include transaction data. Defaults to True.
+            columns (Optional[List[str]]): The transaction and block columns to return.
+            shards (int): The number of block range shards to fetch concurrently. Defaults to 1.
 
         Returns:
-            hypersync.Query: The constructed query object.
+            Dict[str, pl.DataFrame]: The decoded logs of every event, keyed by event name, or an empty dict if the
+                range holds no logs.
         """
-        return hypersync.Query(
+        # an empty address set matches no logs, like an empty contract set
+        topics = {}
+        if address is not None:
+            topics[1] = normalize_topic_values(normalize_addresses(address))
+        log_selections = [
+            selection
+            for event_config in event_configs
+            for selection in build_log_selections(
+                event_config.get_topic(),
+                [event_config.contract] if event_config.contract is not None else None,
+                topics,
+            )
+        ]
+
+        column_mapping = self._merge_column_mappings(event_configs)
+        query = self._create_query(
             from_block=from_block,
             to_block=to_block,
-            logs=logs,
-            transactions=transactions or [],
-            blocks=blocks or [],
-            field_selection=hypersync.FieldSelection(
-                log=[e.value for e in hypersync.LogField],
-                transaction=[e.value for e in hypersync.TransactionField],
-                block=[e.value for e in hypersync.BlockField],
+            logs=log_selections,
+            field_selection=self._create_field_selection(
+                [
+                    column
+                    for column in columns or EVENT_TRANSACTION_COLUMNS
+                    if column not in EVENT_LOG_COLUMNS + EVENT_LOG_EXTRA_COLUMNS
+                ]
+                if tx_data
+                else [],
+                log_fields=EVENT_LOG_FIELDS,
+                column_mapping=column_mapping,
             ),
         )
 
-    async def _collect_data(
-        self,
-        query: hypersync.Query,
-        config: hypersync.StreamConfig,
-        save_data: bool,
-        tx_data: bool = False,
-    ) -> Optional[pl.DataFrame]:
-        """
-        Collect logs data using the Hypersync client and return it as a Polars DataFrame or save it as a parquet file in a "data" folder.
-
-        Args:
-            query (hypersync.Query): The query object to execute.
-            config (hypersync.StreamConfig): The configuration for the data stream.
-            save_data (bool): Whether to save the data as a parquet file.
-            tx_data (bool): Whether to include transaction data in the result.
+        # the logs are decoded per event after collection, so no event signature is set
+        config = hypersync.StreamConfig(
+            hex_output=self.hex_output,
+            column_mapping=column_mapping,
+        )
 
-        Returns:
-            Optional[pl.DataFrame]: The collected data as a Polars DataFrame, or None if no data is returned.
-        """
-        if save_data:
-            return await self.client.collect_parquet("data", query, config)
-        else:
-            data = await self.client.collect_arrow(query, config)
-            decoded_logs_df = pl.from_arrow(data.data.decoded_logs)
-            logs_df = pl.from_arrow(data.data.logs)
-            transactions_df = pl.from_arrow(data.data.transactions)
-            blocks_df = pl.from_arrow(data.data.blocks)
-
-            # Check for empty data and handle the case gracefully
-            if (
-                decoded_logs_df.is_empty()
-                and logs_df.is_empty()
-                and transactions_df.is_empty()
-                and blocks_df.is_empty()
-            ):
-                raise ValueError("All queries returned empty results.")
-
-            txs_blocks_df = transactions_df.join(
-                blocks_df.select(
-                    "number",
-                    "extra_data",
-                    "timestamp",
-                    "base_fee_per_gas",
-                    "gas_used",
-                    "parent_beacon_block_root",
-                ).rename({"number": "block_number"}),
-                on="block_number",
-                how="left",
-                suffix="_block",
-            )
+        async def collect(shard_query: hypersync.Query) -> Optional[pl.DataFrame]:
+            data = await self._collect_arrow(shard_query, config)
+            return self._process_raw_logs(data.data, tx_data=tx_data, columns=columns)
 
-        if decoded_logs_df.is_empty() or logs_df.is_empty():
-            # If both decoded_logs_df and logs_df are empty
-            if txs_blocks_df.is_empty():
-                return None  # All three DataFrames are empty
-            else:
-                # Return txs_blocks_df if it's not empty
-                return txs_blocks_df.select(
-                    "hash",
-                    "block_number",
-                    "extra_data",
-                    "to",
-                    "from",
-                    "nonce",
-                    "type",
-                    "block_hash",
-                    "timestamp",
-                    "base_fee_per_gas",
-                    "gas_used_block",
-                    "parent_beacon_block_root",
-                    "max_priority_fee_per_gas",
-                    "max_fee_per_gas",
-                    "effective_gas_price",
-                    "gas_used",
-                    "blob_versioned_hashes",
-                )
+        logs_df = await self._collect_batches(query, collect, shards=shards)
+        if logs_df is None:
+            return {}
 
-        if tx_data:
-            result_df = (
-                decoded_logs_df.hstack(logs_df.select("transaction_hash"))
-                .rename({"transaction_hash": "hash"})
-                .join(
-                    txs_blocks_df.select(
-                        "hash",
-                        "block_number",
-                        "extra_data",
-                        "to",
-                        "from",
-                        "nonce",
-                        "type",
-                        "block_hash",
-                        "timestamp",
-                        "base_fee_per_gas",
-                        "gas_used_block",
-                        "max_priority_fee_per_gas",
-                        "max_fee_per_gas",
-                        "effective_gas_price",
-                        "gas_used",
-                        "chain_id",
-                    ),
-                    on="hash",
-                    how="left",
-                )
-            )
-            return result_df
-        else:
-            return decoded_logs_df
+        return self._decode_raw_logs(
+            logs_df, event_configs, tx_data=tx_data, columns=columns
+        )
 
-    async def _get_block_range(
+    @timer
+    async def execute_contract_query(
         self,
+        contract: Optional[str] = None,
         from_block: Optional[int] = None,
         to_block: Optional[int] = None,
         block_range: Optional[int] = None,
-    ) -> dict[str, int]:
+        print_time: bool = True,
+        event_configs: Optional[List[EventConfig]] = None,
+        tx_data: bool = True,
+        columns: Optional[List[str]] = None,
+        shards: int = 1,
+    ) -> Dict[str, pl.DataFrame]:
         """
-        Determine the block range to be used in a query.
+        Fetch every log of a contract, or of the whole chain, in a single scan and decode the logs of every known event.
+
+        Instead of one query per event, the logs of all events are downloaded at once and routed by topic0 to the
+        matching event configuration, so syncing the full activity of a contract costs one scan instead of one per
+        event. Events that the vectorized decoder can not decode exactly like the Hypersync client, such as events
+        with tuple or array parameters (see `decoder.can_decode`), are queried again for the contracts that emitted
+        them, like in `execute_event_query`.
 
         Args:
-            from_block (Optional[int]): The starting block number, optional.
-            to_block (Optional[int]): The ending block number, optional.
-            block_range (Optional[int]): The range of blocks, optional.
+            contract (Optional[str]): The contract whose logs to fetch. Defaults to None, which fetches the logs of
+                every contract.
+            from_block (Optional[int]): The starting block number for the query. Defaults to None.
+            to_block (Optional[int]): The ending block number for the query. Defaults to None, which will use the latest block.
+            block_range (Optional[int]): Specifies a block range to query if from_block and to_block are not provided. Optional.
+            print_time (bool): Whether to log the execution time of the query. Defaults to True.
+            event_configs (Optional[List[EventConfig]]): The events to decode. Defaults to every event of the bundled
+                protocols, see `registry.get_event_registry`.
+            tx_data (bool): Whether to include transaction data. Defaults to True.
+            columns (Optional[List[str]]): The transaction and block columns to return. Only the fields needed for
+                these columns are requested from the server. Defaults to `EVENT_TRANSACTION_COLUMNS`.
+            shards (int): The number of block range shards to fetch concurrently. Defaults to 1.
 
         Returns:
-            dict[str, int]: A dictionary containing 'from_block' and 'to_block'.
+            Dict[str, pl.DataFrame]: The decoded logs of every event that emitted logs, keyed by event name, and the
+                raw logs that could not be decoded under `registry.UNKNOWN_TOPICS`.
+
+        Raises:
+            NoDataError: If no logs are returned.
         """
-        if to_block is None:
-            to_block = await self._get_height()  # Await only once
+        if event_configs is None:
+            registry = get_event_registry()
+        else:
+            registry = EventRegistry()
+            for event_config in event_configs:
+                registry.register(event_config)
 
-        from_block = from_block or (to_block - block_range if block_range else 0)
+        block_range_dict = await self._get_block_range(
+            from_block, to_block, block_range
+        )
 
-        return {"from_block": from_block, "to_block": to_block}
+        column_mapping = self._merge_column_mappings(list(registry))
+        query = self._create_query(
+            from_block=block_range_dict["from_block"],
+            to_block=block_range_dict["to_block"],
+            logs=[
+                hypersync.LogSelection(
+                    address=[contract.lower()] if contract is not None else None
+                )
+            ],
+            field_selection=self._create_field_selection(
+                [
+                    column
+                    for column in columns or EVENT_TRANSACTION_COLUMNS
+                    if column not in EVENT_LOG_COLUMNS + EVENT_LOG_EXTRA_COLUMNS
+                ]
+                if tx_data
+                else [],
+                log_fields=EVENT_LOG_FIELDS,
+                column_mapping=column_mapping,
+            ),
+        )
 
-    def _create_event_query(
+        # the logs are decoded per event after collection, so no event signature is set
+        config = hypersync.StreamConfig(
+            hex_output=self.hex_output,
+            column_mapping=column_mapping,
+        )
+
+        async def collect(shard_query: hypersync.Query) -> Optional[pl.DataFrame]:
+            data = await self._collect_arrow(shard_query, config)
+            return self._process_raw_logs(data.data, tx_data=tx_data, columns=columns)
+
+        logs_df = await self._collect_shards(query, collect, shards=shards)
+        if logs_df is None:
+            raise NoDataError(
+                f"No logs returned for contract {contract or 'any'} from blocks {
+                    block_range_dict['from_block']} to {block_range_dict['to_block']}"
+            )
+
+        event_dfs, client_decoded = self._route_raw_logs(
+            logs_df, registry, tx_data=tx_data, columns=columns
+        )
+        for event_config, contracts in client_decoded:
+            event_df = await self.fetch_event_range(
+                event_config,
+                block_range_dict["from_block"],
+                block_range_dict["to_block"],
+                tx_data=tx_data,
+                columns=columns,
+                shards=shards,
+                contracts=contracts,
+            )
+            if event_df is None:
+                continue
+            if event_config.name in event_dfs:
+                event_df = pl.concat(
+                    [event_dfs[event_config.name], event_df], how="diagonal_relaxed"
+                )
+            event_dfs[event_config.name] = event_df
+
+        for event_df in event_dfs.values():
+            self._index_txs(event_df)
+
+        return event_dfs
+
+    def _create_txs_query(
         self,
-        event_config: EventConfig,
         from_block: int,
         to_block: int,
-        address: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        transaction_filters: Optional[Dict[str, List[str]]] = None,
     ) -> hypersync.Query:
         """
-        Create a query for a specific event based on the event signature.
-
-        If the `contract` in the `EventConfig` class is None, then the query will use wildcard indexing to find the
-        event logs. See docs here - https://docs.envio.dev/docs/HyperIndex/wildcard-indexing
-
+        Create a query for the transactions and blocks within a block range.
 
         Args:
-            event_signature (str): The event signature to query.
             from_block (int): The starting block number for the query.
             to_block (int): The ending block number for the query.
-            address (Optional[str]): Optional address to filter the event logs.
+            columns (Optional[List[str]]): The transaction and block columns to request. Defaults to
+                `TRANSACTION_COLUMNS`.
+            transaction_filters (Optional[Dict[str, List[str]]]): The `hypersync.TransactionSelection` fields to
+                filter the transactions on, e.g. `{"from_": [address]}`. Defaults to every transaction.
 
         Returns:
             hypersync.Query: The constructed query object.
-
-        Raises:
-            ValueError: If the event signature is not supported.
         """
-
-        topic0 = event_config.get_topic()
-        topics = [[topic0]]
-        if address:
-            topics.append([address_to_topic(address.lower())])
-
-        # handle the case where contract is not provided
-        if event_config.contract is None:
-            return self._create_query(
-                from_block=from_block,
-                to_block=to_block,
-                logs=[hypersync.LogSelection(topics=topics)],
-            )
-
+        field_selection = self._create_field_selection(
+            columns or TRANSACTION_COLUMNS,
+            column_mapping=self._create_txs_stream_config().column_mapping,
+        )
         return self._create_query(
             from_block=from_block,
             to_block=to_block,
-            logs=[
-                hypersync.LogSelection(address=[event_config.contract], topics=topics)
+            logs=[],
+            # only select the blocks if a block column is requested
+            blocks=[hypersync.BlockSelection()] if field_selection.block else [],
+            transactions=[
+                hypersync.TransactionSelection(**(transaction_filters or {}))
             ],
+            field_selection=field_selection,
         )
 
-    @timer
-    async def execute_event_query(
+    def _create_txs_stream_config(self) -> hypersync.StreamConfig:
+        """
+        Create the stream configuration of transaction queries.
+
+        Returns:
+            hypersync.StreamConfig: The stream configuration.
+        """
+        return hypersync.StreamConfig(
+            hex_output=self.hex_output,
+            column_mapping=hypersync.ColumnMapping(
+                transaction=COMMON_TRANSACTION_MAPPING, block=COMMON_BLOCK_MAPPING
+            ),
+        )
+
+    async def _fetch_txs_range(
+        self,
+        from_block: int,
+        to_block: int,
+        columns: Optional[List[str]] = None,
+        shards: int = 1,
+        transaction_filters: Optional[Dict[str, List[str]]] = None,
+    ) -> Optional[pl.DataFrame]:
+        """
+        Fetch the transactions joined with their blocks within a block range.
+
+        Args:
+            from_block (int): The starting block number of the range (inclusive).
+            to_block (int): The ending block number of the range (exclusive).
+            columns (Optional[List[str]]): The transaction and block columns to return.
+            shards (int): The number of block range shards to fetch concurrently. Defaults to 1.
+            transaction_filters (Optional[Dict[str, List[str]]]): The `hypersync.TransactionSelection` fields to
+                filter the transactions on.
+
+        Returns:
+            Optional[pl.DataFrame]: The transactions, or None if the range holds no transactions.
+        """
+        query = self._create_txs_query(
+            from_block, to_block, columns, transaction_filters=transaction_filters
+        )
+        config = self._create_txs_stream_config()
+
+        async def collect(shard_query: hypersync.Query) -> Optional[pl.DataFrame]:
+            data = await self._collect_arrow(shard_query, config)
+            return self._process_arrow_data(data.data, columns=columns)
+
+        return await self._collect_shards(query, collect, shards=shards)
+
+    def lazy_event_query(
         self,
         event_config: EventConfig,
         from_block: Optional[int] = None,
         to_block: Optional[int] = None,
         block_range: Optional[int] = None,
-        save_data: bool = False,
-        print_time: bool = True,
-        address: Optional[str] = None,
         tx_data: bool = True,
-    ) -> Optional[pl.DataFrame]:
+        shards: int = 1,
+    ) -> LazyQuery:
         """
-        Execute a query for a specific event by its signature and collect the data.
-
-        If the `contract` in the `EventConfig` class is None, then the query will use wildcard indexing to find the
-        event logs. See docs here - https://docs.envio.dev/docs/HyperIndex/wildcard-indexing
-
+        Create a lazy event query. Filters and selections on the returned handle are pushed into the query where
+        possible, and the query is only executed when the handle is collected.
 
         Args:
-            event_name (str): The name of the event to query.
-            from_block (Optional[int]): The starting block number for the query. Defaults to None, which will use the latest block.
-            to_block (Optional[int]): The ending block number for the query. Defaults to None, which will use the latest block.
-            block_range (Optional[int]): Specifies a block range to query if from_block and to_block are not provided. Optional.
-            save_data (bool): Whether to save the data as a parquet file. Defaults to False.
-            print_time (bool): Whether to print the execution time of the query. Defaults to True.
-            address (Optional[str]): The contract address to filter the event logs. Defaults to None.
+            event_config (EventConfig): The event configuration to query.
+            from_block (Optional[int]): The starting block number for the query.
+            to_block (Optional[int]): The ending block number for the query. Defaults to the latest block.
+            block_range (Optional[int]): Specifies a block range to query if from_block is not provided.
             tx_data (bool): Whether to include transaction data. Defaults to True.
+            shards (int): The number of block range shards to fetch concurrently. Defaults to 1.
 
         Returns:
-            Optional[pl.DataFrame]: The collected data as a Polars DataFrame, or None if no data is returned.
-
-        Raises:
-            ValueError: If no data is returned for the specified event name or if the query range is invalid.
+            LazyQuery: The lazy query handle.
         """
-        # Determine the block range for the query
-        block_range_dict = await self._get_block_range(
-            from_block, to_block, block_range
+        return LazyQuery(
+            manager=self,
+            event_config=event_config,
+            from_block=from_block,
+            to_block=to_block,
+            block_range=block_range,
+            tx_data=tx_data,
+            shards=shards,
         )
 
-        # Create the query object for the specified event
-        query = self._create_event_query(
-            event_config,
-            block_range_dict["from_block"],
-            block_range_dict["to_block"],
-            address,
-        )
+    def lazy_txs(
+        self,
+        from_block: Optional[int] = None,
+        to_block: Optional[int] = None,
+        block_range: Optional[int] = None,
+        shards: int = 1,
+    ) -> LazyQuery:
+        """
+        Create a lazy transaction query. Filters and selections on the returned handle are pushed into the query
+        where possible, and the query is only executed when the handle is collected.
 
-        # Retrieve the column mapping for the event, if available
-        column_mapping = event_config.column_mapping
+        Args:
+            from_block (Optional[int]): The starting block number for the query.
+            to_block (Optional[int]): The ending block number for the query. Defaults to the latest block.
+            block_range (Optional[int]): Specifies a block range to query if from_block is not provided.
+            shards (int): The number of block range shards to fetch concurrently. Defaults to 1.
 
-        # Configure the stream settings for the data collection
-        config = hypersync.StreamConfig(
-            hex_output=hypersync.HexOutput.PREFIXED,
-            event_signature=event_config.signature,
-            column_mapping=column_mapping,
+        Returns:
+            LazyQuery: The lazy query handle.
+        """
+        return LazyQuery(
+            manager=self,
+            from_block=from_block,
+            to_block=to_block,
+            block_range=block_range,
+            shards=shards,
         )
 
-        # Collect the data based on the query and configuration
-        result = await self._collect_data(query, config, save_data, tx_data=tx_data)
-
-        # Handle the case where no data is returned
-        if result is None:
-            raise ValueError(f"No data returned for event name: {event_config.name} from blocks {
-                             block_range_dict['from_block']} to {block_range_dict['to_block']}")
-
-        return result
-
     @timer
     async def get_txs(
         self,
@@ -320,6 +2121,8 @@ class HyperManager:
         save_data: bool = False,
         print_time: bool = True,
         blocks_only=False,
+        columns: Optional[List[str]] = None,
+        shards: int = 1,
     ) -> Optional[pl.DataFrame]:
         """
         Query for blocks and transactions within a specified block range and optionally save results.
@@ -328,8 +2131,11 @@ class HyperManager:
             from_block (Optional[int]): The starting block number, optional.
             to_block (Optional[int]): The ending block number, optional.
             block_range (Optional[int]): The range of blocks to query, optional.
-            save_data (bool): Whether to save the data as a parquet file.
-            print_time (bool): Whether to print the execution time of the query.
+            save_data (bool): Whether to append the data to the partitioned parquet dataset of the manager.
+            print_time (bool): Whether to log the execution time of the query.
+            columns (Optional[List[str]]): The transaction and block columns to return. Only the fields needed for
+                these columns are requested from the server. Defaults to `TRANSACTION_COLUMNS`.
+            shards (int): The number of block range shards to fetch concurrently. Defaults to 1.
 
         Returns:
             Optional[pl.DataFrame]: The collected blocks and transactions data as a Polars DataFrame, or None if no data is returned.
@@ -338,56 +2144,116 @@ class HyperManager:
             from_block, to_block, block_range
         )
 
-        query = self._create_query(
-            from_block=block_range_dict["from_block"],
-            to_block=block_range_dict["to_block"],
-            logs=[],
-            blocks=[hypersync.BlockSelection()],
-            transactions=[hypersync.TransactionSelection()],
+        query = self._create_txs_query(
+            block_range_dict["from_block"], block_range_dict["to_block"], columns
         )
-
-        config = hypersync.StreamConfig(
-            hex_output=hypersync.HexOutput.PREFIXED,
-            column_mapping=hypersync.ColumnMapping(
-                transaction=COMMON_TRANSACTION_MAPPING, block=COMMON_BLOCK_MAPPING
-            ),
+        txs_df = await self._collect_data(
+            query,
+            self._create_txs_stream_config(),
+            save_data,
+            columns=columns,
+            shards=shards,
         )
-        return await self._collect_data(query, config, save_data)
+        self._index_txs(txs_df)
+
+        return txs_df
 
     @timer
     async def search_txs(
-        self, txs: str | list[str], save_data: bool = False, print_time: bool = True
+        self,
+        txs: str | list[str],
+        save_data: bool = False,
+        print_time: bool = True,
+        columns: Optional[List[str]] = None,
+        from_block: Optional[int] = None,
+        to_block: Optional[int] = None,
+        from_timestamp: Optional[int] = None,
+        to_timestamp: Optional[int] = None,
+        max_block_gap: int = 10_000,
     ) -> Optional[pl.DataFrame]:
         """
         Query for specific transactions or a list of transactions
 
+        Transactions found in the transaction index are looked up in narrow block ranges around their known block
+        numbers, grouping hashes that are at most `max_block_gap` blocks apart into a single query. The remaining
+        transactions are searched within the given block or time bounds, which default to the whole chain.
+
         Args:
-            save_data (bool): Whether to save the data as a parquet file.
-            print_time (bool): Whether to print the execution time of the query.
+            txs (str | list[str]): The transaction hash or hashes to search for.
+            save_data (bool): Whether to save the data to the parquet dataset instead of returning it.
+            print_time (bool): Whether to log the execution time of the query.
+            columns (Optional[List[str]]): The transaction and block columns to return. Only the fields needed for
+                these columns are requested from the server. Defaults to `TRANSACTION_COLUMNS`.
+            from_block (Optional[int]): The first block to search for transactions that are not indexed. Defaults to 0.
+            to_block (Optional[int]): The block to stop searching at (exclusive). Defaults to the current height.
+            from_timestamp (Optional[int]): The unix timestamp to start searching at. Overrides `from_block`.
+            to_timestamp (Optional[int]): The unix timestamp to stop searching at (inclusive). Overrides `to_block`.
+            max_block_gap (int): The maximum block distance between indexed transactions that are fetched with the
+                same query. Defaults to 10,000.
 
         Returns:
             Optional[pl.DataFrame]: The collected blocks and transactions data as a Polars DataFrame, or None if no data is returned.
+
+        Raises:
+            NoDataError: If none of the transactions are found.
         """
         # Ensure txs is a list
         if isinstance(txs, str):
             txs = [txs]  # Convert single string to a list
 
-        block_range_dict = await self._get_block_range(from_block=None)
-
-        query = self._create_query(
-            from_block=0,
-            to_block=block_range_dict["to_block"],
-            logs=[],
-            transactions=[hypersync.TransactionSelection(hash=txs)],
+        config = self._create_txs_stream_config()
+        field_selection = self._create_field_selection(
+            columns or TRANSACTION_COLUMNS, column_mapping=config.column_mapping
         )
 
-        config = hypersync.StreamConfig(
-            hex_output=hypersync.HexOutput.PREFIXED,
-            column_mapping=hypersync.ColumnMapping(
-                transaction=COMMON_TRANSACTION_MAPPING, block=COMMON_BLOCK_MAPPING
-            ),
-        )
-        return await self._collect_data(query, config, save_data)
+        # Group the indexed transactions by block neighborhood, the rest are searched within the bounds
+        if self.tx_index is not None:
+            search_ranges, unindexed = self.tx_index.group(txs, max_block_gap)
+        else:
+            search_ranges, unindexed = [], txs
+        # the bounds are only resolved if a transaction is not indexed, saving the height and timestamp lookups
+        if unindexed:
+            if from_timestamp is not None:
+                from_block = await self._get_block_by_timestamp(from_timestamp)
+            if to_timestamp is not None:
+                to_block = await self._get_block_by_timestamp(to_timestamp + 1)
+            block_range_dict = await self._get_block_range(from_block, to_block)
+            search_ranges.append(
+                (block_range_dict["from_block"], block_range_dict["to_block"], unindexed)
+            )
+
+        queries = [
+            self._create_query(
+                from_block=range_from,
+                to_block=range_to,
+                logs=[],
+                transactions=[hypersync.TransactionSelection(hash=range_txs)],
+                field_selection=field_selection,
+            )
+            for range_from, range_to, range_txs in search_ranges
+        ]
+
+        if save_data:
+            for query in queries:
+                await self._save_data(query, config, "transactions", columns=columns)
+            return None
+
+        async def collect(query: hypersync.Query) -> Optional[pl.DataFrame]:
+            data = await self._collect_arrow(query, config)
+            return self._process_arrow_data(data.data, columns=columns)
+
+        txs_dfs = [
+            txs_df
+            for txs_df in await asyncio.gather(*[collect(query) for query in queries])
+            if txs_df is not None
+        ]
+        if not txs_dfs:
+            raise NoDataError("All queries returned empty results.")
+
+        txs_df = pl.concat(txs_dfs, how="vertical_relaxed")
+        self._index_txs(txs_df)
+
+        return txs_df
 
     @timer
     async def get_blocks(
@@ -397,6 +2263,8 @@ class HyperManager:
         block_range: Optional[int] = None,
         save_data: bool = False,
         print_time: bool = True,
+        columns: Optional[List[str]] = None,
+        shards: int = 1,
     ) -> Optional[pl.DataFrame]:
         """
         Query for blocks within a specified block range and optionally save results.
@@ -405,12 +2273,20 @@ class HyperManager:
             from_block (Optional[int]): The starting block number, optional.
             to_block (Optional[int]): The ending block number, optional.
             block_range (Optional[int]): The range of blocks to query, optional.
-            save_data (bool): Whether to save the data as a parquet file.
-            print_time (bool): Whether to print the execution time of the query.
+            save_data (bool): Whether to append the data to the partitioned parquet dataset of the manager.
+            print_time (bool): Whether to log the execution time of the query.
+            columns (Optional[List[str]]): The block fields to return. Only these fields are requested from the
+                server, along with the block `number`, which partitions the saved data and trims the shards and is
+                dropped again if it was not requested. Defaults to every block field.
+            shards (int): The number of block range shards to fetch concurrently. Defaults to 1.
 
         Returns:
             Optional[pl.DataFrame]: The collected block data as a Polars DataFrame, or None if no data is returned.
         """
+        fetch_columns = columns or [e.value for e in hypersync.BlockField]
+        if hypersync.BlockField.NUMBER.value not in fetch_columns:
+            fetch_columns = [*fetch_columns, hypersync.BlockField.NUMBER.value]
+
         # Get the block range to query
         block_range_dict = await self._get_block_range(
             from_block, to_block, block_range
@@ -423,20 +2299,29 @@ class HyperManager:
             logs=[],
             transactions=[],
             blocks=[hypersync.BlockSelection()],
+            field_selection=hypersync.FieldSelection(block=fetch_columns),
         )
 
         # Configure the stream settings for blocks
         config = hypersync.StreamConfig(
-            hex_output=hypersync.HexOutput.PREFIXED,
+            hex_output=self.hex_output,
             column_mapping=hypersync.ColumnMapping(block=COMMON_BLOCK_MAPPING),
         )
 
+        async def collect(shard_query: hypersync.Query) -> Optional[pl.DataFrame]:
+            data = await self._collect_arrow(shard_query, config)
+            shard_df = pl.from_arrow(data.data.blocks)
+            return shard_df if not shard_df.is_empty() else None
+
         # Collect block data
-        data = await self.client.collect_arrow(query, config)
-        blocks_df = pl.from_arrow(data.data.blocks)
+        blocks_df = await self._collect_shards(
+            query, collect, shards=shards, block_column="number"
+        )
 
-        # Save data as parquet file if required
-        if save_data and not blocks_df.is_empty():
-            blocks_df.write_parquet("blocks_data.parquet")
+        # Append the data to the parquet dataset if required
+        if save_data and blocks_df is not None:
+            self._write_dataset(blocks_df, "blocks", block_column="number")
 
-        return blocks_df if not blocks_df.is_empty() else None
+        if blocks_df is not None and columns and "number" not in columns:
+            return blocks_df.drop("number")
+        return blocks_df
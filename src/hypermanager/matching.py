@@ -0,0 +1,379 @@
+import asyncio
+import json
+import os
+import polars as pl
+from enum import Enum
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from dataclasses import dataclass, field
+from hypermanager.clients import ClientRegistry
+from hypermanager.events import EventConfig
+from hypermanager.multichain import MultiChainManager
+from hypermanager.networks import HyperSyncClients
+from hypermanager.protocols.across import across_config, client_config
+
+# The transaction and block columns streamed with every deposit and fill
+MATCHING_COLUMNS = ["hash", "block_number", "timestamp"]
+
+# The key of a deposit, shared by its fill: deposit ids are only unique per origin chain
+MATCH_KEY = ["origin_chain_id", "depositId"]
+
+
+@dataclass
+class AcrossMatcher:
+    """
+    Matches the `V3FundsDeposited` logs of the Across spoke pools with the `FilledV3Relay` logs that fill them on
+    their destination chain, incrementally and in bounded memory.
+
+    The deposits and fills of every chain are streamed batch by batch and merged in block timestamp order, so every
+    chain advances through time together. Deposits that are not filled yet are kept in an index of open deposits,
+    fills whose deposit was not seen yet in an index of open fills, and every batch is matched against the opposite
+    index with a hash join. A matched pair is emitted as soon as its second half arrives.
+
+    Since the batches are merged in timestamp order, every log that is still to come is at least as recent as the
+    batch being processed. Open deposits are dropped once that watermark passes their `fillDeadline`, after which they
+    can no longer be filled, and open fills once it passes their own timestamp, since their deposit must have come
+    first. Both expire `expiry_grace` seconds late to allow for clock drift between chains. The indexes are therefore
+    bounded by the deposits of a single fill deadline window, however much history is matched.
+
+    The open indexes and the next block of every stream are persisted under `path` every `save_interval` batches and
+    at the end of every run, so the next run resumes where the last one stopped. Pairs emitted after the last save
+    are emitted again if a run is interrupted.
+
+    Attributes:
+        path (str): The directory holding the persisted state.
+        clients (Dict[HyperSyncClients, Union[str, Enum, List[Union[str, Enum]]]]): The spoke pool of every chain.
+            Defaults to `protocols.across.client_config`.
+        start_block (int): The block to start streaming every chain from when there is no persisted state yet.
+            Defaults to 0.
+        confirmations (int): The number of most recent blocks of every chain that are not streamed yet, to avoid
+            matching logs that could still be reorganized. Defaults to 0.
+        expiry_grace (int): The number of seconds past their deadline that open deposits and fills are kept.
+            Defaults to 3600.
+        save_interval (int): The number of batches between two saves of the state. Defaults to 100.
+        registry (Optional[ClientRegistry]): The registry the managers of each chain are taken from. Defaults to
+            the process-wide client registry.
+        open_deposits (Optional[pl.DataFrame]): The deposits that are not filled yet.
+        open_fills (Optional[pl.DataFrame]): The fills whose deposit was not seen yet.
+        checkpoints (Dict[str, int]): The next block of every stream, keyed by chain and event name.
+        expired (int): The number of open deposits dropped since the state was created.
+    """
+
+    path: str
+    clients: Dict[
+        HyperSyncClients, Union[str, Enum, List[Union[str, Enum]]]
+    ] = field(default_factory=lambda: dict(client_config))
+    start_block: int = 0
+    confirmations: int = 0
+    expiry_grace: int = 3600
+    save_interval: int = 100
+    registry: Optional[ClientRegistry] = None
+    chains: MultiChainManager = field(init=False)
+    open_deposits: Optional[pl.DataFrame] = field(init=False, default=None)
+    open_fills: Optional[pl.DataFrame] = field(init=False, default=None)
+    checkpoints: Dict[str, int] = field(init=False, default_factory=dict)
+    expired: int = field(init=False, default=0)
+    _generation: int = field(init=False, default=0, repr=False)
+
+    def __post_init__(self):
+        self.chains = MultiChainManager(self.clients, registry=self.registry)
+        self.load()
+
+    @property
+    def state_path(self) -> str:
+        """
+        The path of the file recording the checkpoints and the current generation of the index files.
+        """
+        return os.path.join(self.path, "state.json")
+
+    def _index_path(self, name: str, generation: int) -> str:
+        return os.path.join(self.path, f"{name}-{generation}.parquet")
+
+    def load(self) -> None:
+        """
+        Load the persisted state, or start from `start_block` with empty indexes if there is none.
+        """
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+
+        self.checkpoints = state["checkpoints"]
+        self.expired = state["expired"]
+        self._generation = state["generation"]
+        for name in state["indexes"]:
+            setattr(
+                self, name, pl.read_parquet(self._index_path(name, self._generation))
+            )
+
+    def save(self) -> None:
+        """
+        Persist the open indexes and the checkpoints.
+
+        The indexes are written as a new generation of files, which only takes effect once the state file pointing
+        at it is atomically replaced, so an interrupted save leaves the previous state intact.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        generation = self._generation + 1
+
+        indexes = []
+        for name in ["open_deposits", "open_fills"]:
+            index_df = getattr(self, name)
+            if index_df is not None:
+                index_df.write_parquet(self._index_path(name, generation))
+                indexes.append(name)
+
+        state = {
+            "checkpoints": self.checkpoints,
+            "expired": self.expired,
+            "generation": generation,
+            "indexes": indexes,
+        }
+        with open(f"{self.state_path}.tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(f"{self.state_path}.tmp", self.state_path)
+
+        for name in ["open_deposits", "open_fills"]:
+            try:
+                os.remove(self._index_path(name, self._generation))
+            except FileNotFoundError:
+                pass
+        self._generation = generation
+
+    @staticmethod
+    def _deposits(chain: HyperSyncClients, deposits_df: pl.DataFrame) -> pl.DataFrame:
+        """
+        Select the deposit columns kept until the deposit is filled.
+        """
+        return deposits_df.select(
+            pl.lit(chain.network_id, dtype=pl.UInt64).alias("origin_chain_id"),
+            pl.col("depositId").cast(pl.UInt64),
+            pl.col("destinationChainId")
+            .cast(pl.UInt64)
+            .alias("destination_chain_id"),
+            "depositor",
+            "recipient",
+            "inputToken",
+            "outputToken",
+            "inputAmount",
+            "outputAmount",
+            pl.col("fillDeadline").cast(pl.UInt64),
+            pl.col("hash").alias("deposit_hash"),
+            pl.col("block_number").alias("deposit_block_number"),
+            pl.col("timestamp").cast(pl.UInt64).alias("deposit_timestamp"),
+        ).unique(MATCH_KEY, keep="first", maintain_order=True)
+
+    @staticmethod
+    def _fills(chain: HyperSyncClients, fills_df: pl.DataFrame) -> pl.DataFrame:
+        """
+        Select the fill columns kept until the deposit of the fill is seen.
+        """
+        return fills_df.select(
+            pl.col("originChainId").cast(pl.UInt64).alias("origin_chain_id"),
+            pl.col("depositId").cast(pl.UInt64),
+            pl.lit(chain.network_id, dtype=pl.UInt64).alias("fill_chain_id"),
+            "relayer",
+            pl.col("hash").alias("fill_hash"),
+            pl.col("block_number").alias("fill_block_number"),
+            pl.col("timestamp").cast(pl.UInt64).alias("fill_timestamp"),
+        ).unique(MATCH_KEY, keep="first", maintain_order=True)
+
+    @staticmethod
+    def _pairs(deposits_df: pl.DataFrame, fills_df: pl.DataFrame) -> pl.DataFrame:
+        """
+        Join deposits with their fills, adding the fill latency in seconds.
+        """
+        return deposits_df.join(fills_df, on=MATCH_KEY, how="inner").with_columns(
+            (
+                pl.col("fill_timestamp").cast(pl.Int64)
+                - pl.col("deposit_timestamp").cast(pl.Int64)
+            ).alias("fill_latency")
+        )
+
+    @staticmethod
+    def _add(index_df: Optional[pl.DataFrame], new_df: pl.DataFrame) -> pl.DataFrame:
+        if index_df is None:
+            return new_df
+        return pl.concat([index_df, new_df], how="vertical_relaxed")
+
+    def match_deposits(
+        self, chain: HyperSyncClients, deposits_df: pl.DataFrame
+    ) -> Optional[pl.DataFrame]:
+        """
+        Match the deposits of a chain against the open fills, adding the unmatched deposits to the open deposits.
+
+        Args:
+            chain (HyperSyncClients): The origin chain of the deposits.
+            deposits_df (pl.DataFrame): The decoded `V3FundsDeposited` logs, with the `MATCHING_COLUMNS`.
+
+        Returns:
+            Optional[pl.DataFrame]: The matched pairs, or None if no deposit matches.
+        """
+        deposits_df = self._deposits(chain, deposits_df)
+        pairs_df = None
+        if self.open_fills is not None:
+            pairs_df = self._pairs(deposits_df, self.open_fills)
+            self.open_fills = self.open_fills.join(pairs_df, on=MATCH_KEY, how="anti")
+            deposits_df = deposits_df.join(pairs_df, on=MATCH_KEY, how="anti")
+        self.open_deposits = self._add(self.open_deposits, deposits_df)
+        return pairs_df if pairs_df is not None and not pairs_df.is_empty() else None
+
+    def match_fills(
+        self, chain: HyperSyncClients, fills_df: pl.DataFrame
+    ) -> Optional[pl.DataFrame]:
+        """
+        Match the fills of a chain against the open deposits, adding the unmatched fills to the open fills.
+
+        Args:
+            chain (HyperSyncClients): The destination chain of the fills.
+            fills_df (pl.DataFrame): The decoded `FilledV3Relay` logs, with the `MATCHING_COLUMNS`.
+
+        Returns:
+            Optional[pl.DataFrame]: The matched pairs, or None if no fill matches.
+        """
+        fills_df = self._fills(chain, fills_df)
+        pairs_df = None
+        if self.open_deposits is not None:
+            pairs_df = self._pairs(self.open_deposits, fills_df)
+            self.open_deposits = self.open_deposits.join(
+                pairs_df, on=MATCH_KEY, how="anti"
+            )
+            fills_df = fills_df.join(pairs_df, on=MATCH_KEY, how="anti")
+        self.open_fills = self._add(self.open_fills, fills_df)
+        return pairs_df if pairs_df is not None and not pairs_df.is_empty() else None
+
+    def expire(self, watermark: int) -> None:
+        """
+        Drop the open deposits and fills that can no longer be matched.
+
+        Args:
+            watermark (int): The block timestamp that every log still to come is at least as recent as.
+        """
+        cutoff = watermark - self.expiry_grace
+        if self.open_deposits is not None:
+            expired = self.open_deposits["fillDeadline"].cast(pl.Int64) < cutoff
+            self.expired += expired.sum()
+            self.open_deposits = self.open_deposits.filter(~expired)
+        if self.open_fills is not None:
+            self.open_fills = self.open_fills.filter(
+                pl.col("fill_timestamp").cast(pl.Int64) >= cutoff
+            )
+
+    async def _open_streams(
+        self,
+    ) -> Dict[Tuple[HyperSyncClients, str], Tuple[AsyncIterator[pl.DataFrame], int]]:
+        """
+        Open the deposit and fill stream of every chain, from its checkpoint up to the confirmed height of the chain.
+        """
+        streams = {}
+        for chain, manager in self.chains.managers.items():
+            to_block = (
+                await manager._get_height(force_refresh=True) - self.confirmations
+            )
+            for name in ["V3FundsDeposited", "FilledV3Relay"]:
+                from_block = self.checkpoints.get(
+                    f"{chain.name}/{name}", self.start_block
+                )
+                if to_block <= from_block:
+                    continue
+
+                event_config: EventConfig = self.chains._chain_event_config(
+                    chain, across_config[name]
+                )
+                stream = manager.stream_event_query(
+                    event_config,
+                    **self.chains._chain_query_kwargs(
+                        chain,
+                        {
+                            "from_block": from_block,
+                            "to_block": to_block,
+                            "columns": MATCHING_COLUMNS,
+                        },
+                    ),
+                )
+                streams[(chain, name)] = (stream, to_block)
+        return streams
+
+    async def stream_matches(self) -> AsyncIterator[pl.DataFrame]:
+        """
+        Match the deposits and fills produced since the last run, yielding the matched pairs batch by batch.
+
+        The next batch of every stream is fetched while the current batch is matched. The state is saved every
+        `save_interval` batches and once every stream is exhausted.
+
+        Yields:
+            pl.DataFrame: The deposits matched with their fills, with the `fill_latency` in seconds.
+        """
+        streams = await self._open_streams()
+
+        async def next_batch(stream: AsyncIterator[pl.DataFrame]):
+            try:
+                return await stream.__anext__()
+            except StopAsyncIteration:
+                return None
+
+        pending = {
+            key: asyncio.ensure_future(next_batch(stream))
+            for key, (stream, _) in streams.items()
+        }
+        heads: Dict[Tuple[HyperSyncClients, str], pl.DataFrame] = {}
+        batches = 0
+        try:
+            while pending or heads:
+                # the head of every stream is needed to know which batch comes next in time
+                for key, task in list(pending.items()):
+                    batch_df = await task
+                    del pending[key]
+                    if batch_df is None:
+                        self.checkpoints[f"{key[0].name}/{key[1]}"] = streams[key][1]
+                    elif not batch_df.is_empty():
+                        heads[key] = batch_df
+                    else:
+                        pending[key] = asyncio.ensure_future(
+                            next_batch(streams[key][0])
+                        )
+                if pending or not heads:
+                    continue
+
+                key = min(heads, key=lambda key: heads[key]["timestamp"].min())
+                batch_df = heads.pop(key)
+                pending[key] = asyncio.ensure_future(next_batch(streams[key][0]))
+
+                chain, name = key
+                self.expire(batch_df["timestamp"].min())
+                if name == "V3FundsDeposited":
+                    pairs_df = self.match_deposits(chain, batch_df)
+                else:
+                    pairs_df = self.match_fills(chain, batch_df)
+                # the batches of a stream end on block boundaries
+                self.checkpoints[f"{chain.name}/{name}"] = (
+                    batch_df["block_number"].max() + 1
+                )
+
+                batches += 1
+                if batches % self.save_interval == 0:
+                    self.save()
+                if pairs_df is not None:
+                    yield pairs_df
+        finally:
+            # a stream can only be closed once its pending fetch is done
+            for task in pending.values():
+                task.cancel()
+            await asyncio.gather(*pending.values(), return_exceptions=True)
+            for stream, _ in streams.values():
+                await stream.aclose()
+
+        self.save()
+
+    async def run(self) -> Optional[pl.DataFrame]:
+        """
+        Match the deposits and fills produced since the last run.
+
+        Returns:
+            Optional[pl.DataFrame]: The matched pairs, or None if nothing was matched.
+        """
+        pairs = [pairs_df async for pairs_df in self.stream_matches()]
+        if not pairs:
+            return None
+        return pl.concat(pairs, how="vertical_relaxed")
@@ -0,0 +1,470 @@
+import atexit
+import contextvars
+import functools
+import logging
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from dataclasses import asdict, dataclass, field
+
+# The latency buckets of the duration histograms, in seconds
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.01,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+Result = TypeVar("Result")
+
+
+@dataclass
+class QueryMetrics:
+    """
+    The measurements of a single query, collected while the query runs.
+
+    Attributes:
+        method (str): The name of the `HyperManager` method that ran the query.
+        chain (str): The name of the queried chain.
+        event (str): The queried event, the comma separated events of a multi-event query, or "" for transaction and
+            block queries.
+        rows (int): The number of rows returned or saved.
+        bytes (int): The size of the arrow tables received from the server.
+        pages (int): The number of responses received from the server.
+        retries (int): The number of retried requests.
+        server_time (float): The time the server spent executing the query, in seconds.
+        phases (Dict[str, float]): The time spent per phase in seconds: `network` waiting for the server, `process`
+            converting the arrow tables into DataFrames (including `join`), `join` joining transactions and blocks,
+            `decode` decoding raw logs and `save` writing parquet files.
+        duration (float): The wall time of the query in seconds.
+        error (Optional[str]): The name of the exception the query raised, if any.
+    """
+
+    method: str
+    chain: str
+    event: str = ""
+    rows: int = 0
+    bytes: int = 0
+    pages: int = 0
+    retries: int = 0
+    server_time: float = 0.0
+    phases: Dict[str, float] = field(default_factory=dict)
+    duration: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def labels(self) -> Labels:
+        """
+        The labels the metrics of the query are aggregated by.
+        """
+        return (("method", self.method), ("chain", self.chain), ("event", self.event))
+
+    def add_phase(self, phase: str, seconds: float) -> None:
+        """
+        Add time spent in a phase of the query.
+
+        Args:
+            phase (str): The name of the phase.
+            seconds (float): The time spent in seconds.
+        """
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+_current_query: contextvars.ContextVar[Optional[QueryMetrics]] = (
+    contextvars.ContextVar("hypermanager_query_metrics", default=None)
+)
+
+
+def current_query() -> Optional[QueryMetrics]:
+    """
+    Get the measurements of the query running in the current context.
+
+    Concurrent shard tasks inherit the context of the query that spawned them, so they add to the same
+    measurements.
+
+    Returns:
+        Optional[QueryMetrics]: The measurements of the running query, or None if metrics are disabled.
+    """
+    return _current_query.get()
+
+
+@contextmanager
+def measure_query(record: QueryMetrics) -> Iterator[QueryMetrics]:
+    """
+    Collect the measurements of the code running inside the block into a query record.
+
+    Args:
+        record (QueryMetrics): The record to collect the measurements into.
+
+    Yields:
+        QueryMetrics: The record.
+    """
+    token = _current_query.set(record)
+    start_time = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record.error = type(e).__name__
+        raise
+    finally:
+        record.duration = time.perf_counter() - start_time
+        _current_query.reset(token)
+
+
+@contextmanager
+def measure_phase(phase: str) -> Iterator[None]:
+    """
+    Add the time spent inside the block to a phase of the running query. Does nothing if metrics are disabled.
+
+    Args:
+        phase (str): The name of the phase.
+    """
+    record = _current_query.get()
+    if record is None:
+        yield
+        return
+
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        record.add_phase(phase, time.perf_counter() - start_time)
+
+
+def phase(name: str) -> Callable[[Callable[..., Result]], Callable[..., Result]]:
+    """
+    A decorator adding the time spent in a synchronous function to a phase of the running query.
+
+    Args:
+        name (str): The name of the phase.
+
+    Returns:
+        Callable[[Callable[..., Result]], Callable[..., Result]]: The decorator.
+    """
+
+    def decorator(func: Callable[..., Result]) -> Callable[..., Result]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_query.get() is None:
+                return func(*args, **kwargs)
+            with measure_phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record_response(response, seconds: float) -> None:
+    """
+    Add a response received from the server to the running query. Does nothing if metrics are disabled.
+
+    Args:
+        response (hypersync.ArrowResponse): The response.
+        seconds (float): The time spent waiting for the response.
+    """
+    record = _current_query.get()
+    if record is None:
+        return
+
+    record.add_phase("network", seconds)
+    record.pages += 1
+    record.server_time += (getattr(response, "total_execution_time", None) or 0) / 1000
+    for table_name in ("logs", "decoded_logs", "transactions", "blocks", "traces"):
+        table = getattr(response.data, table_name, None)
+        record.bytes += getattr(table, "nbytes", 0) or 0
+
+
+@dataclass
+class Histogram:
+    """
+    A cumulative latency histogram.
+
+    Attributes:
+        buckets (Tuple[float, ...]): The upper bounds of the buckets, in ascending order.
+        counts (List[int]): The number of observations per bucket, with a final `+Inf` bucket.
+        sum (float): The sum of the observations.
+        count (int): The number of observations.
+    """
+
+    buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS
+    counts: List[int] = field(init=False)
+    sum: float = 0.0
+    count: int = 0
+
+    def __post_init__(self):
+        self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        """
+        Add an observation.
+
+        Args:
+            value (float): The observed value.
+        """
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+
+class MetricsSink:
+    """
+    Receives the measurements of every finished query. Subclasses override `emit`, and `flush` if they buffer.
+    """
+
+    def emit(self, record: QueryMetrics, metrics: "Metrics") -> None:
+        """
+        Handle the measurements of a finished query.
+
+        Args:
+            record (QueryMetrics): The measurements of the query.
+            metrics (Metrics): The aggregated metrics, already updated with the query.
+        """
+
+    def flush(self) -> None:
+        """
+        Write out any buffered measurements.
+        """
+
+
+@dataclass
+class MemorySink(MetricsSink):
+    """
+    Keeps the measurements of the most recent queries in memory.
+
+    Attributes:
+        max_records (int): The number of records to keep. Defaults to 10,000.
+    """
+
+    max_records: int = 10_000
+    records: Deque[QueryMetrics] = field(init=False)
+
+    def __post_init__(self):
+        self.records = deque(maxlen=self.max_records)
+
+    def emit(self, record: QueryMetrics, metrics: "Metrics") -> None:
+        self.records.append(record)
+
+
+@dataclass
+class LoggingSink(MetricsSink):
+    """
+    Logs the measurements of every query as a single structured log line.
+
+    Attributes:
+        logger_name (str): The name of the logger. Defaults to "hypermanager.metrics".
+        level (int): The log level. Defaults to `logging.INFO`.
+    """
+
+    logger_name: str = "hypermanager.metrics"
+    level: int = logging.INFO
+
+    def emit(self, record: QueryMetrics, metrics: "Metrics") -> None:
+        logging.getLogger(self.logger_name).log(
+            self.level,
+            "%s query on %s finished in %.3fs",
+            record.method,
+            record.chain,
+            record.duration,
+            extra={"query_metrics": asdict(record)},
+        )
+
+
+@dataclass
+class PrometheusTextfileSink(MetricsSink):
+    """
+    Writes the aggregated metrics in the Prometheus text format, e.g. for the textfile collector of the node exporter.
+    The file is replaced atomically, so scrapers never read a partially written file.
+
+    The file is written at most once every `flush_interval` seconds instead of after every query, so the event loop is
+    not blocked on file IO per query, and once more at interpreter shutdown. Call `flush` (or `Metrics.flush`) to
+    write the latest metrics immediately.
+
+    Attributes:
+        path (str): The path of the metrics file, usually ending in `.prom`.
+        flush_interval (float): The minimum number of seconds between two writes of the file. Defaults to 15, the
+            usual scrape interval of Prometheus.
+    """
+
+    path: str
+    flush_interval: float = 15.0
+    _metrics: Optional["Metrics"] = field(init=False, default=None, repr=False)
+    _dirty: bool = field(init=False, default=False, repr=False)
+    _flushed_at: Optional[float] = field(init=False, default=None, repr=False)
+
+    def __post_init__(self):
+        atexit.register(self.flush)
+
+    def emit(self, record: QueryMetrics, metrics: "Metrics") -> None:
+        self._metrics = metrics
+        self._dirty = True
+        if (
+            self._flushed_at is None
+            or time.monotonic() - self._flushed_at >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._dirty or self._metrics is None:
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(f"{self.path}.tmp", "w") as f:
+            f.write(self._metrics.to_prometheus())
+        os.replace(f"{self.path}.tmp", self.path)
+        self._dirty = False
+        self._flushed_at = time.monotonic()
+
+
+def _format_labels(labels: Labels) -> str:
+    """
+    Format labels as a Prometheus label set.
+    """
+    escaped = [
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    ]
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+@dataclass
+class Metrics:
+    """
+    Counters and latency histograms of the queries of one or more managers, labelled by method, chain and event.
+
+    Metrics are disabled unless a `Metrics` instance is passed to a `HyperManager`, in which case no measurements
+    are taken at all.
+
+    Attributes:
+        sinks (List[MetricsSink]): The sinks receiving the measurements of every finished query.
+        prefix (str): The prefix of the metric names. Defaults to "hypermanager".
+        buckets (Tuple[float, ...]): The upper bounds of the latency histogram buckets in seconds.
+        counters (Dict[Tuple[str, Labels], float]): The counters, keyed by name and labels.
+        histograms (Dict[Tuple[str, Labels], Histogram]): The latency histograms, keyed by name and labels.
+    """
+
+    sinks: List[MetricsSink] = field(default_factory=list)
+    prefix: str = "hypermanager"
+    buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS
+    counters: Dict[Tuple[str, Labels], float] = field(init=False, default_factory=dict)
+    histograms: Dict[Tuple[str, Labels], Histogram] = field(
+        init=False, default_factory=dict
+    )
+
+    def inc(self, name: str, labels: Labels, value: float = 1) -> None:
+        """
+        Increment a counter.
+
+        Args:
+            name (str): The name of the counter, without the prefix.
+            labels (Labels): The labels of the counter.
+            value (float): The increment. Defaults to 1.
+        """
+        self.counters[(name, labels)] = self.counters.get((name, labels), 0) + value
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        """
+        Add an observation to a histogram.
+
+        Args:
+            name (str): The name of the histogram, without the prefix.
+            labels (Labels): The labels of the histogram.
+            value (float): The observed value.
+        """
+        if (name, labels) not in self.histograms:
+            self.histograms[(name, labels)] = Histogram(self.buckets)
+        self.histograms[(name, labels)].observe(value)
+
+    def record(self, record: QueryMetrics) -> None:
+        """
+        Aggregate the measurements of a finished query and pass them to the sinks.
+
+        Args:
+            record (QueryMetrics): The measurements of the query.
+        """
+        labels = record.labels
+        self.inc("queries_total", labels)
+        if record.error is not None:
+            self.inc("query_errors_total", labels + (("error", record.error),))
+        self.inc("rows_total", labels, record.rows)
+        self.inc("bytes_total", labels, record.bytes)
+        self.inc("pages_total", labels, record.pages)
+        self.inc("retries_total", labels, record.retries)
+        self.inc("server_time_seconds_total", labels, record.server_time)
+        self.observe("query_duration_seconds", labels, record.duration)
+        for phase_name, seconds in record.phases.items():
+            self.observe(
+                "phase_duration_seconds", labels + (("phase", phase_name),), seconds
+            )
+
+        for sink in self.sinks:
+            sink.emit(record, self)
+
+    def flush(self) -> None:
+        """
+        Write out the measurements buffered by the sinks, e.g. before shutting down.
+        """
+        for sink in self.sinks:
+            sink.flush()
+
+    def to_prometheus(self) -> str:
+        """
+        Format the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics.
+        """
+        lines = []
+        counter_names = sorted({name for name, _ in self.counters})
+        for name in counter_names:
+            lines.append(f"# TYPE {self.prefix}_{name} counter")
+            for (counter_name, labels), value in self.counters.items():
+                if counter_name == name:
+                    lines.append(f"{self.prefix}_{name}{_format_labels(labels)} {value}")
+
+        histogram_names = sorted({name for name, _ in self.histograms})
+        for name in histogram_names:
+            lines.append(f"# TYPE {self.prefix}_{name} histogram")
+            for (histogram_name, labels), histogram in self.histograms.items():
+                if histogram_name != name:
+                    continue
+                cumulative = 0
+                bounds = [str(bound) for bound in histogram.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, histogram.counts):
+                    cumulative += count
+                    lines.append(
+                        f"{self.prefix}_{name}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}"
+                    )
+                lines.append(
+                    f"{self.prefix}_{name}_sum{_format_labels(labels)} {histogram.sum}"
+                )
+                lines.append(
+                    f"{self.prefix}_{name}_count{_format_labels(labels)} {histogram.count}"
+                )
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """
+        Clear every counter and histogram.
+        """
+        self.counters.clear()
+        self.histograms.clear()
@@ -0,0 +1,237 @@
+import asyncio
+import polars as pl
+from enum import Enum
+from typing import AsyncIterator, Dict, List, Optional, Union
+
+from dataclasses import dataclass, field, replace
+from hypermanager.clients import ClientRegistry, get_registry
+from hypermanager.errors import NoDataError
+from hypermanager.events import EventConfig
+from hypermanager.filters import normalize_addresses
+from hypermanager.manager import HyperManager
+from hypermanager.networks import HyperSyncClients
+
+
+@dataclass
+class ChainResult:
+    """
+    The result of a single event query on a single chain.
+
+    Attributes:
+        chain (HyperSyncClients): The chain the query was executed on.
+        event_config (EventConfig): The event configuration that was queried.
+        data (Optional[pl.DataFrame]): The collected data tagged with `chain_id`, or None if the query failed or
+            saved its data instead of returning it.
+        error (Optional[Exception]): The exception raised by the query, if any.
+    """
+
+    chain: HyperSyncClients
+    event_config: EventConfig
+    data: Optional[pl.DataFrame] = None
+    error: Optional[Exception] = None
+
+
+@dataclass
+class MultiChainManager:
+    """
+    Executes event queries across multiple chains concurrently.
+
+    Each chain uses the shared `HyperManager` of its url from the client registry, and the queries of all chains and
+    events run concurrently, bounded by `max_concurrency`. The wall-clock time of a cross-chain scan is therefore
+    close to the slowest chain rather than the sum of all chains.
+
+    Attributes:
+        clients (Union[Dict[HyperSyncClients, Optional[Union[str, Enum, List[Union[str, Enum]]]]],
+            List[HyperSyncClients]]): The chains to query. When a mapping is given, its values are the contract
+            addresses that override `EventConfig.contract` on each chain, e.g. `protocols.across.client_config`, or
+            lists of contract addresses queried together on each chain. A value of None keeps the contract of the
+            event.
+        max_concurrency (int): The maximum number of queries that run at the same time. Defaults to 8.
+        registry (Optional[ClientRegistry]): The registry the managers of each chain are taken from. Defaults to
+            the process-wide client registry.
+    """
+
+    clients: Union[
+        Dict[HyperSyncClients, Optional[Union[str, Enum, List[Union[str, Enum]]]]],
+        List[HyperSyncClients],
+    ]
+    max_concurrency: int = 8
+    registry: Optional[ClientRegistry] = None
+    managers: Dict[HyperSyncClients, HyperManager] = field(init=False)
+
+    def __post_init__(self):
+        # normalize the clients into a mapping of chain -> contract address
+        if isinstance(self.clients, dict):
+            self.clients = {
+                chain: (
+                    normalize_addresses(contract)
+                    if isinstance(contract, (list, tuple, set, frozenset))
+                    else contract.value if isinstance(contract, Enum) else contract
+                )
+                for chain, contract in self.clients.items()
+            }
+        else:
+            self.clients = {chain: None for chain in self.clients}
+
+        if self.registry is None:
+            self.registry = get_registry()
+
+        self.managers = {
+            chain: self.registry.get_manager(chain) for chain in self.clients
+        }
+
+    def _chain_event_config(
+        self, chain: HyperSyncClients, event_config: EventConfig
+    ) -> EventConfig:
+        """
+        Get the event configuration for a chain, with the contract address overridden if one is configured.
+
+        Args:
+            chain (HyperSyncClients): The chain to get the event configuration for.
+            event_config (EventConfig): The base event configuration.
+
+        Returns:
+            EventConfig: The event configuration for the chain.
+        """
+        contract = self.clients[chain]
+        # sets of contracts are passed to the query instead, see `_chain_query_kwargs`
+        if contract is None or isinstance(contract, list):
+            return event_config
+
+        return replace(event_config, contract=contract)
+
+    def _chain_query_kwargs(
+        self, chain: HyperSyncClients, query_kwargs: Dict
+    ) -> Dict:
+        """
+        Get the query arguments for a chain, with its set of contracts if one is configured.
+
+        Args:
+            chain (HyperSyncClients): The chain to get the query arguments for.
+            query_kwargs (Dict): The query arguments shared by every chain.
+
+        Returns:
+            Dict: The query arguments for the chain.
+        """
+        contracts = self.clients[chain]
+        if isinstance(contracts, list):
+            return {"contracts": contracts, **query_kwargs}
+        return query_kwargs
+
+    async def stream_event_queries(
+        self,
+        event_configs: Union[EventConfig, List[EventConfig]],
+        **query_kwargs,
+    ) -> AsyncIterator[ChainResult]:
+        """
+        Execute event queries on every chain concurrently, yielding the result of each chain and event as soon as it
+        finishes.
+
+        Failed queries do not stop the other queries; their exception is returned in `ChainResult.error`.
+
+        Args:
+            event_configs (Union[EventConfig, List[EventConfig]]): The event configurations to query on every chain.
+            **query_kwargs: Additional arguments passed to `HyperManager.execute_event_query`, e.g. `block_range`.
+
+        Yields:
+            ChainResult: The result of a single chain and event query.
+        """
+        if isinstance(event_configs, EventConfig):
+            event_configs = [event_configs]
+
+        query_kwargs.setdefault("print_time", False)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_query(
+            chain: HyperSyncClients, event_config: EventConfig
+        ) -> ChainResult:
+            async with semaphore:
+                try:
+                    df = await self.managers[chain].execute_event_query(
+                        self._chain_event_config(chain, event_config),
+                        **self._chain_query_kwargs(chain, query_kwargs),
+                    )
+                    # queries that save their data return None
+                    if df is not None:
+                        df = df.with_columns(
+                            pl.lit(chain.network_id, dtype=pl.UInt64).alias(
+                                "chain_id"
+                            )
+                        )
+                except Exception as e:
+                    return ChainResult(chain=chain, event_config=event_config, error=e)
+
+            return ChainResult(chain=chain, event_config=event_config, data=df)
+
+        tasks = [
+            asyncio.create_task(run_query(chain, event_config))
+            for chain in self.clients
+            for event_config in event_configs
+        ]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            # cancel the remaining queries if the consumer exits early
+            for task in tasks:
+                task.cancel()
+
+    async def execute_event_queries(
+        self,
+        event_configs: Union[EventConfig, List[EventConfig]],
+        **query_kwargs,
+    ) -> Dict[str, pl.DataFrame]:
+        """
+        Execute event queries on every chain concurrently and combine the results of each event into one DataFrame
+        tagged with `chain_id`.
+
+        Chains that return no data for an event, i.e. raise a `NoDataError`, are skipped, as are queries that save
+        their data.
+
+        Args:
+            event_configs (Union[EventConfig, List[EventConfig]]): The event configurations to query on every chain.
+            **query_kwargs: Additional arguments passed to `HyperManager.execute_event_query`, e.g. `block_range`.
+
+        Returns:
+            Dict[str, pl.DataFrame]: The combined data of every chain, keyed by event name. Events without any data
+                are omitted.
+
+        Raises:
+            Exception: The first error raised by a query, other than a `NoDataError`.
+        """
+        event_dfs: Dict[str, List[pl.DataFrame]] = {}
+        errors = []
+        async for result in self.stream_event_queries(event_configs, **query_kwargs):
+            if result.error is not None:
+                if not isinstance(result.error, NoDataError):
+                    errors.append(result.error)
+                continue
+            if result.data is None:
+                continue
+
+            event_dfs.setdefault(result.event_config.name, []).append(result.data)
+
+        if errors:
+            raise errors[0]
+
+        return {
+            name: pl.concat(dfs, how="diagonal_relaxed")
+            for name, dfs in event_dfs.items()
+        }
+
+    async def execute_event_query(
+        self, event_config: EventConfig, **query_kwargs
+    ) -> Optional[pl.DataFrame]:
+        """
+        Execute a single event query on every chain concurrently and combine the results into one DataFrame tagged
+        with `chain_id`.
+
+        Args:
+            event_config (EventConfig): The event configuration to query on every chain.
+            **query_kwargs: Additional arguments passed to `HyperManager.execute_event_query`, e.g. `block_range`.
+
+        Returns:
+            Optional[pl.DataFrame]: The combined data of every chain, or None if no chain returned data.
+        """
+        results = await self.execute_event_queries(event_config, **query_kwargs)
+        return results.get(event_config.name)
@@ -0,0 +1,172 @@
+from enum import Enum
+from typing import Iterable, List, Optional, Union
+import polars as pl
+
+from dataclasses import dataclass, field, replace
+from hypermanager.filters import normalize_address, normalize_addresses
+from hypermanager.manager import HyperManager
+from hypermanager.protocols.uniswap_v3 import uniswap_config
+from hypermanager.schema import EVENT_TRANSACTION_COLUMNS
+from hypermanager.sync import SyncJob
+
+
+@dataclass
+class UniswapV3Pools:
+    """
+    A two-stage pipeline that discovers the pools of a Uniswap V3 factory and queries the swaps of those pools only.
+
+    The first stage incrementally syncs the `PoolCreated` logs of the factory into a local parquet dataset with a
+    `SyncJob`, so every run only fetches the pools created since the previous run. The second stage queries the `Swap`
+    logs with the discovered pools as the address filter, instead of a chain-wide wildcard that also returns the swaps
+    of every fork of the pool contract. Large pool sets are split over log selections and concurrent queries by
+    `HyperManager.execute_event_query`.
+
+    Attributes:
+        manager (HyperManager): The manager used to query the chain.
+        factory (Union[str, Enum]): The factory that creates the pools, e.g. a value of
+            `protocols.uniswap_v3.factory_config`.
+        path (str): The destination directory of the synced pools.
+        start_block (int): The block to start discovering pools from when nothing is synced yet. Defaults to 0.
+        confirmations (int): The number of most recent blocks whose pools are not synced yet, to avoid syncing blocks
+            that could still be reorganized. Defaults to 0.
+        shards (int): The number of block range shards to fetch concurrently. Defaults to 1.
+    """
+
+    manager: HyperManager
+    factory: Union[str, Enum]
+    path: str
+    start_block: int = 0
+    confirmations: int = 0
+    shards: int = 1
+    job: SyncJob = field(init=False)
+
+    def __post_init__(self):
+        self.factory = normalize_address(self.factory)
+        self.job = SyncJob(
+            manager=self.manager,
+            event_config=replace(
+                uniswap_config["PoolCreated"], contract=self.factory
+            ),
+            path=self.path,
+            start_block=self.start_block,
+            tx_data=False,
+            confirmations=self.confirmations,
+            shards=self.shards,
+        )
+
+    async def sync(self) -> Optional[pl.DataFrame]:
+        """
+        Discover the pools created since the last sync.
+
+        Returns:
+            Optional[pl.DataFrame]: The decoded `PoolCreated` logs of the new pools, or None if there are no new pools.
+        """
+        return await self.job.run()
+
+    def pools(
+        self,
+        tokens: Optional[Iterable[Union[str, Enum]]] = None,
+        fees: Optional[Iterable[int]] = None,
+    ) -> pl.DataFrame:
+        """
+        Get the pools discovered so far, optionally filtered by token and fee tier.
+
+        Args:
+            tokens (Optional[Iterable[Union[str, Enum]]]): Only keep the pools that hold at least one of these tokens,
+                as `token0` or `token1`. Defaults to None.
+            fees (Optional[Iterable[int]]): Only keep the pools of these fee tiers, in hundredths of a basis point,
+                e.g. 500 for 0.05%. Defaults to None.
+
+        Returns:
+            pl.DataFrame: The decoded `PoolCreated` logs of the matching pools, empty if nothing is synced yet.
+        """
+        pools_df = self.job.read()
+        if pools_df is None:
+            return pl.DataFrame()
+
+        if tokens is not None:
+            tokens = [
+                self.manager._encode_hex(token) for token in normalize_addresses(tokens)
+            ]
+            token_columns = [pl.col("token0"), pl.col("token1")]
+            if not self.manager.binary_output:
+                # decoded addresses may be checksummed
+                token_columns = [column.str.to_lowercase() for column in token_columns]
+            pools_df = pools_df.filter(
+                token_columns[0].is_in(tokens) | token_columns[1].is_in(tokens)
+            )
+        if fees is not None:
+            pools_df = pools_df.filter(
+                pl.col("fee").is_in([float(fee) for fee in fees])
+            )
+        return pools_df
+
+    def pool_addresses(
+        self,
+        tokens: Optional[Iterable[Union[str, Enum]]] = None,
+        fees: Optional[Iterable[int]] = None,
+    ) -> List[str]:
+        """
+        Get the addresses of the pools discovered so far, optionally filtered by token and fee tier.
+
+        Args:
+            tokens (Optional[Iterable[Union[str, Enum]]]): Only keep the pools that hold at least one of these tokens.
+                Defaults to None.
+            fees (Optional[Iterable[int]]): Only keep the pools of these fee tiers. Defaults to None.
+
+        Returns:
+            List[str]: The lowercase prefixed hex pool addresses, in creation order.
+        """
+        pools_df = self.pools(tokens=tokens, fees=fees)
+        if pools_df.is_empty():
+            return []
+        return normalize_addresses(pools_df["pool"].to_list())
+
+    async def get_swaps(
+        self,
+        from_block: Optional[int] = None,
+        to_block: Optional[int] = None,
+        block_range: Optional[int] = None,
+        tokens: Optional[Iterable[Union[str, Enum]]] = None,
+        fees: Optional[Iterable[int]] = None,
+        columns: Optional[List[str]] = None,
+        print_time: bool = True,
+    ) -> Optional[pl.DataFrame]:
+        """
+        Sync the pools, then query the swaps of the matching pools.
+
+        The emitting pool of every swap is returned in the `address` column. Pools created within the last
+        `confirmations` blocks are not synced yet, so their swaps are only returned once they are.
+
+        Args:
+            from_block (Optional[int]): The starting block number for the query. Defaults to None.
+            to_block (Optional[int]): The ending block number for the query. Defaults to None.
+            block_range (Optional[int]): Specifies a block range to query if from_block and to_block are not provided.
+            tokens (Optional[Iterable[Union[str, Enum]]]): Only query the pools that hold at least one of these tokens.
+                Defaults to None.
+            fees (Optional[Iterable[int]]): Only query the pools of these fee tiers. Defaults to None.
+            columns (Optional[List[str]]): The transaction and block columns to return, next to the `address` column.
+                Defaults to `EVENT_TRANSACTION_COLUMNS`.
+            print_time (bool): Whether to log the execution time of the query. Defaults to True.
+
+        Returns:
+            Optional[pl.DataFrame]: The decoded swaps, or None if no pool matches or there are no swaps.
+        """
+        await self.sync()
+        pools = self.pool_addresses(tokens=tokens, fees=fees)
+        if not pools:
+            return None
+
+        columns = list(columns or EVENT_TRANSACTION_COLUMNS)
+        if "address" not in columns:
+            columns.append("address")
+        return await self.manager.execute_event_query(
+            uniswap_config["Swap"],
+            from_block=from_block,
+            to_block=to_block,
+            block_range=block_range,
+            print_time=print_time,
+            columns=columns,
+            shards=self.shards,
+            contracts=pools,
+        )
@@ -41,8 +41,6 @@ across_config = {
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
             decoded_log={
-                "inputAmount": DataType.FLOAT64,
-                "outputAmount": DataType.FLOAT64,
                 "quoteTimestamp": DataType.INT64,
                 "fillDeadline": DataType.UINT64,
                 "exclusivityDeadline": DataType.INT64,
@@ -50,6 +48,7 @@ across_config = {
                 "depositId": DataType.UINT64,
             },
         ),
+        uint256_columns=["inputAmount", "outputAmount"],
     ),
     "RequestedSpeedUpV3Deposit": EventConfig(
         name="RequestedSpeedUpV3Deposit",
@@ -62,10 +61,10 @@ across_config = {
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
             decoded_log={
-                "updatedOutputAmount": DataType.INT64,
                 "depositId": DataType.UINT64,
             },
         ),
+        uint256_columns=["updatedOutputAmount"],
     ),
     "FilledV3Relay": EventConfig(
         name="FilledV3Relay",
@@ -80,8 +79,6 @@ across_config = {
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
             decoded_log={
-                "inputAmount": DataType.FLOAT64,
-                "outputAmount": DataType.FLOAT64,
                 "quoteTimestamp": DataType.INT64,
                 "fillDeadline": DataType.UINT64,
                 "exclusivityDeadline": DataType.INT64,
@@ -90,6 +87,7 @@ across_config = {
                 "depositId": DataType.UINT64,
             },
         ),
+        uint256_columns=["inputAmount", "outputAmount"],
     ),
     "RequestedV3SlowFill": EventConfig(
         name="RequestedV3SlowFill",
@@ -103,12 +101,11 @@ across_config = {
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
             decoded_log={
-                "inputAmount": DataType.FLOAT64,
-                "outputAmount": DataType.FLOAT64,
                 "quoteTimestamp": DataType.INT32,
                 "fillDeadline": DataType.UINT64,
                 "originChainId": DataType.UINT64,
             },
         ),
+        uint256_columns=["inputAmount", "outputAmount"],
     ),
 }
@@ -28,25 +28,21 @@ mev_commit_config = {
         name="BidderRegistered",
         signature="BidderRegistered(address indexed bidder, uint256 indexed depositedAmount, uint256 indexed windowNumber)",
         column_mapping=ColumnMapping(
-            decoded_log={
-                "depositedAmount": DataType.FLOAT64,
-                "windowNumber": DataType.FLOAT64,
-            },
+            decoded_log={"windowNumber": DataType.FLOAT64},
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["depositedAmount"],
     ),
     "BidderWithdrawal": EventConfig(
         name="BidderWithdrawal",
         signature="BidderWithdrawal(address indexed bidder, uint256 indexed window, uint256 indexed amount)",
         column_mapping=ColumnMapping(
-            decoded_log={
-                "amount": DataType.INT64,
-                "window": DataType.INT64,
-            },
+            decoded_log={"window": DataType.INT64},
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["amount"],
     ),
     "OpenedCommitmentStored": EventConfig(
         name="OpenedCommitmentStored",
@@ -60,7 +56,6 @@ mev_commit_config = {
         contract='0xCAC68D97a56b19204Dd3dbDC103CB24D47A825A3',
         column_mapping=ColumnMapping(
             decoded_log={
-                "bid": DataType.UINT64,
                 "blockNumber": DataType.UINT64,
                 "decayStartTimeStamp": DataType.UINT64,
                 "decayEndTimeStamp": DataType.UINT64,
@@ -69,66 +64,63 @@ mev_commit_config = {
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["bid"],
     ),
     "FundsRetrieved": EventConfig(
         name="FundsRetrieved",
         signature="FundsRetrieved(bytes32 indexed commitmentDigest,address indexed bidder,uint256 indexed window,uint256 amount)",
         column_mapping=ColumnMapping(
-            decoded_log={
-                "window": DataType.UINT64,
-                "amount": DataType.UINT64,
-            },
+            decoded_log={"window": DataType.UINT64},
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["amount"],
     ),
     "FundsRewarded": EventConfig(
         name="FundsRewarded",
         signature="FundsRewarded(bytes32 indexed commitmentDigest, address indexed bidder, address indexed provider, uint256 window, uint256 amount)",
         column_mapping=ColumnMapping(
-            decoded_log={
-                "window": DataType.UINT64,
-                "amount": DataType.UINT64,
-            },
+            decoded_log={"window": DataType.UINT64},
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["amount"],
     ),
     "FundsSlashed": EventConfig(
         name="FundsSlashed",
         signature="FundsSlashed(address indexed provider, uint256 amount)",
         column_mapping=ColumnMapping(
-            decoded_log={"amount": DataType.UINT64},
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["amount"],
     ),
     "FundsDeposited": EventConfig(
         name="FundsDeposited",
         signature="FundsDeposited(address indexed provider, uint256 amount)",
         column_mapping=ColumnMapping(
-            decoded_log={"amount": DataType.UINT64},
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["amount"],
     ),
     "Withdraw": EventConfig(
         name="Withdraw",
         signature="Withdraw(address indexed provider, uint256 amount)",
         column_mapping=ColumnMapping(
-            decoded_log={"amount": DataType.UINT64},
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["amount"],
     ),
     "ProviderRegistered": EventConfig(
         name="ProviderRegistered",
         signature="ProviderRegistered(address indexed provider, uint256 stakedAmount, bytes blsPublicKey)",
         column_mapping=ColumnMapping(
-            decoded_log={"stakedAmount": DataType.UINT64},
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["stakedAmount"],
     ),
     "UnopenedCommitmentStored": EventConfig(
         name="UnopenedCommitmentStored",
@@ -152,7 +144,6 @@ mev_commit_config = {
         contract='0x9433bCD9e89F923ce587f7FA7E39e120E93eb84D',
         column_mapping=ColumnMapping(
             decoded_log={
-                "bidAmt": DataType.UINT64,
                 "blockNumber": DataType.UINT64,
                 "decayStartTimeStamp": DataType.UINT64,
                 "decayEndTimeStamp": DataType.UINT64,
@@ -161,6 +152,7 @@ mev_commit_config = {
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["bidAmt"],
     ),
 
     # OracleContractUpdated with indexed newOracleContract
@@ -178,12 +170,10 @@ mev_commit_config = {
         name="TransferToBidderFailed",
         signature="TransferToBidderFailed(address indexed bidder, uint256 amount)",
         column_mapping=ColumnMapping(
-            decoded_log={
-                "amount": DataType.UINT64,
-            },
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["amount"],
     ),
 
     # New event from iProviderRegistry.sol
@@ -191,12 +181,10 @@ mev_commit_config = {
         name="BidderWithdrawSlashedAmount",
         signature="BidderWithdrawSlashedAmount(address indexed bidder, uint256 amount)",
         column_mapping=ColumnMapping(
-            decoded_log={
-                "amount": DataType.UINT64,
-            },
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["amount"],
     ),
 
     # New event from blockTracker.sol
@@ -218,10 +206,10 @@ mev_commit_validator_config = {
         name="Staked_old",
         signature="Staked(address indexed txOriginator, bytes valBLSPubKey, uint256 amount)",
         column_mapping=ColumnMapping(
-            decoded_log={"amount": DataType.UINT64},
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["amount"],
     ),
     "Staked": EventConfig(
         name="Staked",
@@ -229,67 +217,64 @@ mev_commit_validator_config = {
         # version v.7.0 https://holesky.etherscan.io/address/0x87d5f694fad0b6c8aabca96277de09451e277bcf
         # contract="0x87D5F694fAD0b6C8aaBCa96277DE09451E277Bcf",
         column_mapping=ColumnMapping(
-            decoded_log={"amount": DataType.FLOAT64},
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["amount"],
     ),
     "StakeAdded": EventConfig(
         name="StakeAdded",
         signature="StakeAdded(address indexed msgSender, address indexed withdrawalAddress, bytes valBLSPubKey, uint256 amount, uint256 newBalance)",
         column_mapping=ColumnMapping(
-            decoded_log={
-                "amount": DataType.UINT64,
-                "newBalance": DataType.UINT64,
-            },
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["amount", "newBalance"],
     ),
     "Unstaked": EventConfig(
         name="Unstaked",
         signature="Unstaked(address indexed msgSender, address indexed withdrawalAddress, bytes valBLSPubKey, uint256 amount)",
         column_mapping=ColumnMapping(
-            decoded_log={"amount": DataType.UINT64},
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["amount"],
     ),
     "StakeWithdrawn": EventConfig(
         name="StakeWithdrawn",
         signature="StakeWithdrawn(address indexed msgSender, address indexed withdrawalAddress, bytes valBLSPubKey, uint256 amount)",
         column_mapping=ColumnMapping(
-            decoded_log={"amount": DataType.UINT64},
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["amount"],
     ),
     "Slashed": EventConfig(
         name="Slashed",
         signature="Slashed(address indexed msgSender, address indexed slashReceiver, address indexed withdrawalAddress, bytes valBLSPubKey, uint256 amount)",
         column_mapping=ColumnMapping(
-            decoded_log={"amount": DataType.UINT64},
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["amount"],
     ),
     "MinStakeSet": EventConfig(
         name="MinStakeSet",
         signature="MinStakeSet(address indexed msgSender, uint256 newMinStake)",
         column_mapping=ColumnMapping(
-            decoded_log={"newMinStake": DataType.UINT64},
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["newMinStake"],
     ),
     "SlashAmountSet": EventConfig(
         name="SlashAmountSet",
         signature="SlashAmountSet(address indexed msgSender, uint256 newSlashAmount)",
         column_mapping=ColumnMapping(
-            decoded_log={"newSlashAmount": DataType.UINT64},
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["newSlashAmount"],
     ),
     "SlashOracleSet": EventConfig(
         name="SlashOracleSet",
@@ -475,10 +460,10 @@ mev_commit_validator_config = {
         name="UnfreezeFeeSet",
         signature="UnfreezeFeeSet(uint256 unfreezeFee)",
         column_mapping=ColumnMapping(
-            decoded_log={"unfreezeFee": DataType.UINT64},
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
         ),
+        uint256_columns=["unfreezeFee"],
     ),
     "UnfreezeReceiverSet": EventConfig(
         name="UnfreezeReceiverSet",
@@ -1,8 +1,23 @@
+from enum import Enum
 from hypermanager.events import EventConfig
 from hypersync import ColumnMapping, DataType
+from hypermanager.networks import HyperSyncClients
 from hypermanager.schema import COMMON_TRANSACTION_MAPPING, COMMON_BLOCK_MAPPING
 
 
+# Enum for UniswapV3Factory addresses, which emit the PoolCreated events
+class UniswapV3FactoryAddresses(Enum):
+    BASE = "0x33128a8fC17869897dcE68Ed026d694621f6FDfD"
+    ETHEREUM = "0x1F98431c8aD98523631AE4a59f267346ea31F984"
+
+
+# Mapping relevant HyperSyncClients to UniswapV3FactoryAddresses
+factory_config = {
+    HyperSyncClients.BASE: UniswapV3FactoryAddresses.BASE,
+    HyperSyncClients.ETHEREUM_MAINNET: UniswapV3FactoryAddresses.ETHEREUM,
+}
+
+
 # Base event configurations as a dictionary with event names as keys
 uniswap_config = {
     "Swap": EventConfig(
@@ -11,14 +26,10 @@ uniswap_config = {
         column_mapping=ColumnMapping(
             transaction=COMMON_TRANSACTION_MAPPING,
             block=COMMON_BLOCK_MAPPING,
-            decoded_log={
-                "amount0": DataType.FLOAT64,
-                "amount1": DataType.FLOAT64,
-                "liquidity": DataType.FLOAT64,
-                "tick": DataType.FLOAT64,
-                "sqrtPriceX96": DataType.FLOAT64,
-            },
+            decoded_log={"tick": DataType.FLOAT64},
         ),
+        # exact 256-bit integers, aggregate them with `hypermanager.uint256` without precision loss
+        uint256_columns=["amount0", "amount1", "sqrtPriceX96", "liquidity"],
     ),
     "PoolCreated": EventConfig(
         name="PoolCreated",
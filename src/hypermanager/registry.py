@@ -0,0 +1,243 @@
+from typing import Dict, Iterator, List, Optional, Union
+
+import polars as pl
+
+from dataclasses import dataclass, field
+from hypermanager.events import EventConfig
+
+# The key of the raw logs that no event configuration decodes, in the results of wildcard queries
+UNKNOWN_TOPICS = "unknown_topics"
+
+
+def normalize_topic(topic: Union[str, bytes]) -> str:
+    """
+    Normalize a topic, as a prefixed hex string in any case or as raw bytes, to a lowercase prefixed hex string.
+
+    Args:
+        topic (Union[str, bytes]): The topic.
+
+    Returns:
+        str: The lowercase prefixed hex topic.
+    """
+    if isinstance(topic, bytes):
+        return "0x" + topic.hex()
+    return topic.lower()
+
+
+def partition_logs(
+    logs_df: pl.DataFrame, topic_column: str = "topic0"
+) -> Dict[Union[str, bytes, None], pl.DataFrame]:
+    """
+    Split raw logs by topic0 in a single pass, so that every event can be decoded without filtering all logs again.
+
+    Args:
+        logs_df (pl.DataFrame): The raw logs.
+        topic_column (str): The topic0 column. Defaults to "topic0".
+
+    Returns:
+        Dict[Union[str, bytes, None], pl.DataFrame]: The logs of every topic0, keyed by the topic0 as it appears in
+            the logs.
+    """
+    return {
+        topic: topic_df
+        for (topic,), topic_df in logs_df.partition_by(
+            topic_column, as_dict=True, maintain_order=True
+        ).items()
+    }
+
+
+@dataclass
+class EventRegistry:
+    """
+    An index of event configurations by topic0, name, contract and protocol.
+
+    Every topic0 is computed once, when its configuration is registered, so looking up the configurations of a log
+    never hashes a signature. Several configurations can share a topic0, e.g. the same event emitted by different
+    contracts, or the same signature under different names.
+
+    Attributes:
+        by_topic (Dict[str, List[EventConfig]]): The configurations of every lowercase topic0.
+        by_name (Dict[str, List[EventConfig]]): The configurations of every event name.
+        by_contract (Dict[Optional[str], List[EventConfig]]): The configurations of every lowercase contract address,
+            with the configurations of any contract under None.
+        by_protocol (Dict[str, Dict[str, EventConfig]]): The configurations of every protocol, keyed by their key in
+            the protocol configuration.
+    """
+
+    by_topic: Dict[str, List[EventConfig]] = field(default_factory=dict)
+    by_name: Dict[str, List[EventConfig]] = field(default_factory=dict)
+    by_contract: Dict[Optional[str], List[EventConfig]] = field(
+        default_factory=dict
+    )
+    by_protocol: Dict[str, Dict[str, EventConfig]] = field(default_factory=dict)
+
+    def register(self, event_config: EventConfig) -> str:
+        """
+        Add an event configuration to the registry.
+
+        Args:
+            event_config (EventConfig): The event configuration.
+
+        Returns:
+            str: The topic0 of the event.
+        """
+        topic0 = event_config.get_topic()
+        for index, key in [
+            (self.by_topic, topic0),
+            (self.by_name, event_config.name),
+            (self.by_contract, event_config.contract),
+        ]:
+            configs = index.setdefault(key, [])
+            if event_config not in configs:
+                configs.append(event_config)
+        return topic0
+
+    def register_protocol(
+        self, protocol: str, event_configs: Dict[str, EventConfig]
+    ) -> None:
+        """
+        Add the event configurations of a protocol to the registry.
+
+        Args:
+            protocol (str): The name of the protocol, e.g. "uniswap_v3".
+            event_configs (Dict[str, EventConfig]): The event configurations of the protocol.
+        """
+        self.by_protocol.setdefault(protocol, {}).update(event_configs)
+        for event_config in event_configs.values():
+            self.register(event_config)
+
+    def lookup(
+        self, topic0: Union[str, bytes], contract: Optional[Union[str, bytes]] = None
+    ) -> Optional[EventConfig]:
+        """
+        Get the event configuration of a log.
+
+        Configurations of the log's contract take precedence over configurations of any contract, and configurations
+        of other contracts only match if the log's contract is not known.
+
+        Args:
+            topic0 (Union[str, bytes]): The topic0 of the log.
+            contract (Optional[Union[str, bytes]]): The contract that emitted the log, if known.
+
+        Returns:
+            Optional[EventConfig]: The first matching configuration, or None if the topic0 is unknown.
+        """
+        configs = self.by_topic.get(normalize_topic(topic0), [])
+        if contract is not None:
+            contract = normalize_topic(contract)
+            for event_config in configs:
+                if event_config.contract == contract:
+                    return event_config
+        for event_config in configs:
+            if event_config.contract is None:
+                return event_config
+        if contract is None and configs:
+            return configs[0]
+        return None
+
+    def get(self, name: str) -> List[EventConfig]:
+        """
+        Get the event configurations of an event name.
+
+        Args:
+            name (str): The name of the event.
+
+        Returns:
+            List[EventConfig]: The configurations with this name, in registration order.
+        """
+        return self.by_name.get(name, [])
+
+    def for_contract(self, contract: str) -> List[EventConfig]:
+        """
+        Get the event configurations bound to a contract.
+
+        Args:
+            contract (str): The contract address.
+
+        Returns:
+            List[EventConfig]: The configurations of the contract, in registration order.
+        """
+        return self.by_contract.get(contract.lower(), [])
+
+    def topics(self) -> List[str]:
+        """
+        Get every registered topic0.
+
+        Returns:
+            List[str]: The lowercase prefixed hex topics, in registration order.
+        """
+        return list(self.by_topic)
+
+    def topic_table(self, binary: bool = False) -> pl.DataFrame:
+        """
+        Get a table of every registered configuration, to label or join raw logs by topic0 in bulk.
+
+        Args:
+            binary (bool): Whether the topic0 and contract columns hold raw bytes, to match logs queried with
+                `binary_output`. Defaults to False.
+
+        Returns:
+            pl.DataFrame: The `topic0`, `contract`, `name` and `signature` of every configuration.
+        """
+        rows = [
+            (topic0, event_config.contract, event_config.name, event_config.signature)
+            for topic0, configs in self.by_topic.items()
+            for event_config in configs
+        ]
+        table = pl.DataFrame(
+            rows,
+            schema={
+                "topic0": pl.String,
+                "contract": pl.String,
+                "name": pl.String,
+                "signature": pl.String,
+            },
+            orient="row",
+        )
+        if binary:
+            table = table.with_columns(
+                pl.col("topic0", "contract").str.strip_prefix("0x").str.decode("hex")
+            )
+        return table
+
+    def __contains__(self, topic0: Union[str, bytes]) -> bool:
+        return normalize_topic(topic0) in self.by_topic
+
+    def __len__(self) -> int:
+        return sum(len(configs) for configs in self.by_topic.values())
+
+    def __iter__(self) -> Iterator[EventConfig]:
+        for configs in self.by_topic.values():
+            yield from configs
+
+
+_event_registry: Optional[EventRegistry] = None
+
+
+def get_event_registry() -> EventRegistry:
+    """
+    Get the registry of every event configuration of the bundled protocols.
+
+    The protocol configurations are imported and hashed on first use, so importing `hypermanager` stays cheap.
+
+    Returns:
+        EventRegistry: The shared event registry.
+    """
+    global _event_registry
+    if _event_registry is None:
+        from hypermanager.protocols.across import across_config
+        from hypermanager.protocols.mev_commit import (
+            mev_commit_config,
+            mev_commit_validator_config,
+        )
+        from hypermanager.protocols.uniswap_v3 import uniswap_config
+
+        registry = EventRegistry()
+        registry.register_protocol("across", across_config)
+        registry.register_protocol("mev_commit", mev_commit_config)
+        registry.register_protocol(
+            "mev_commit_validator", mev_commit_validator_config
+        )
+        registry.register_protocol("uniswap_v3", uniswap_config)
+        _event_registry = registry
+    return _event_registry
@@ -1,4 +1,4 @@
-from hypersync import TransactionField, DataType, BlockField
+from hypersync import TransactionField, DataType, BlockField, LogField
 
 # Common transaction column mappings reused across events
 COMMON_TRANSACTION_MAPPING = {
@@ -25,3 +25,65 @@ COMMON_BLOCK_MAPPING = {
     BlockField.BLOB_GAS_USED: DataType.UINT64,
     BlockField.EXCESS_BLOB_GAS: DataType.UINT64,
 }
+
+# Transaction and block columns returned by the transaction queries. Block columns that share a name with a
+# transaction column are suffixed with `_block`, e.g. `gas_used_block`.
+TRANSACTION_COLUMNS = [
+    "hash",
+    "block_number",
+    "extra_data",
+    "to",
+    "from",
+    "nonce",
+    "type",
+    "block_hash",
+    "timestamp",
+    "base_fee_per_gas",
+    "gas_used_block",
+    "parent_beacon_block_root",
+    "max_priority_fee_per_gas",
+    "max_fee_per_gas",
+    "effective_gas_price",
+    "gas_used",
+    "blob_versioned_hashes",
+]
+
+# Transaction and block columns joined onto the decoded event logs when `tx_data=True`
+EVENT_TRANSACTION_COLUMNS = [
+    "hash",
+    "block_number",
+    "extra_data",
+    "to",
+    "from",
+    "nonce",
+    "type",
+    "block_hash",
+    "timestamp",
+    "base_fee_per_gas",
+    "gas_used_block",
+    "max_priority_fee_per_gas",
+    "max_fee_per_gas",
+    "effective_gas_price",
+    "gas_used",
+    "chain_id",
+]
+
+# Log fields required to decode event logs and join them with their transactions
+EVENT_LOG_FIELDS = [
+    LogField.BLOCK_NUMBER,
+    LogField.TRANSACTION_INDEX,
+    LogField.LOG_INDEX,
+    LogField.TRANSACTION_HASH,
+    LogField.ADDRESS,
+    LogField.DATA,
+    LogField.TOPIC0,
+    LogField.TOPIC1,
+    LogField.TOPIC2,
+    LogField.TOPIC3,
+]
+
+# Transaction columns that are taken from the event logs instead of the transactions
+EVENT_LOG_COLUMNS = ["hash", "block_number", "transaction_index"]
+
+# Log columns that can be requested next to the transaction columns, e.g. the emitting contract of every event
+EVENT_LOG_EXTRA_COLUMNS = ["log_index", "address"]
@@ -0,0 +1,189 @@
+import json
+import os
+import polars as pl
+from typing import Dict, Iterable, List, Optional, Union
+
+from dataclasses import dataclass, field
+from hypermanager.cache import EventCache
+from hypermanager.events import EventConfig
+from hypermanager.filters import filter_keys
+from hypermanager.manager import HyperManager
+
+
+@dataclass
+class SyncJob:
+    """
+    Incrementally syncs the logs of an event into a local parquet dataset, resuming from a checkpoint.
+
+    The checkpoint stores the last fully synced block per (chain, event, filters) and every run only fetches the
+    blocks produced since then. New rows are appended as a separate part file named after its block range, and the
+    checkpoint is only advanced once the part file is written. Part files beyond the checkpoint, left behind by a
+    run that crashed before it could advance the checkpoint, are removed before syncing, so rows are never
+    duplicated.
+
+    Attributes:
+        manager (HyperManager): The manager used to query the chain.
+        event_config (EventConfig): The event configuration to sync.
+        path (str): The destination directory of the synced part files and the checkpoint.
+        start_block (int): The block to start syncing from when there is no checkpoint yet. Defaults to 0.
+        address (Optional[Union[str, Iterable[str]]]): The address, or set of addresses, to filter topic1 of the
+            event logs. Defaults to None.
+        topic_filters (Optional[Dict[int, Iterable[str]]]): The allowed values of topic1 to topic3, keyed by topic
+            position. Defaults to None.
+        contracts (Optional[Iterable[str]]): The contracts whose logs to sync, overriding the `contract` of the event
+            configuration. Defaults to None.
+        tx_data (bool): Whether to include transaction data. Defaults to True.
+        columns (Optional[List[str]]): The transaction and block columns to sync.
+        confirmations (int): The number of most recent blocks that are not synced yet, to avoid syncing blocks that
+            could still be reorganized. Defaults to 0.
+        shards (int): The number of block range shards to fetch concurrently, useful for the initial backfill.
+            Defaults to 1.
+    """
+
+    manager: HyperManager
+    event_config: EventConfig
+    path: str
+    start_block: int = 0
+    address: Optional[Union[str, Iterable[str]]] = None
+    topic_filters: Optional[Dict[int, Iterable[str]]] = None
+    contracts: Optional[Iterable[str]] = None
+    tx_data: bool = True
+    columns: Optional[List[str]] = None
+    confirmations: int = 0
+    shards: int = 1
+    key: str = field(init=False)
+
+    def __post_init__(self):
+        # jobs with other filters keep checkpoints of their own, the key of a single address job is unchanged
+        address_key, filter_key = filter_keys(
+            self.address, self.topic_filters, self.contracts
+        )
+        self.key = EventCache.get_key(
+            self.manager.url,
+            self.event_config.get_topic(),
+            self.event_config.signature,
+            self.event_config.contract,
+            self.event_config.column_mapping,
+            address_key,
+            self.tx_data,
+            self.columns,
+            *(["binary"] if self.manager.binary_output else []),
+            *filter_key,
+        )
+
+    @property
+    def job_path(self) -> str:
+        """
+        The directory holding the part files and the checkpoint of this job.
+        """
+        return os.path.join(self.path, self.event_config.name, self.key)
+
+    @property
+    def checkpoint_path(self) -> str:
+        """
+        The path of the checkpoint file of this job.
+        """
+        return os.path.join(self.job_path, "checkpoint.json")
+
+    def get_checkpoint(self) -> int:
+        """
+        Get the block to resume syncing from, i.e. the block after the last fully synced block.
+
+        Returns:
+            int: The next block to sync.
+        """
+        try:
+            with open(self.checkpoint_path) as f:
+                return json.load(f)["next_block"]
+        except FileNotFoundError:
+            return self.start_block
+
+    def _write_checkpoint(self, next_block: int) -> None:
+        """
+        Atomically advance the checkpoint.
+        """
+        with open(f"{self.checkpoint_path}.tmp", "w") as f:
+            json.dump({"next_block": next_block}, f)
+        os.replace(f"{self.checkpoint_path}.tmp", self.checkpoint_path)
+
+    def _part_files(self) -> List[str]:
+        """
+        Get the part files of this job, sorted by block number.
+        """
+        part_files = [
+            name
+            for name in os.listdir(self.job_path)
+            if name.startswith("part-") and name.endswith(".parquet")
+        ]
+        return sorted(part_files, key=lambda name: int(name.split("-")[1]))
+
+    def _remove_uncommitted_parts(self, next_block: int) -> None:
+        """
+        Remove the part files written beyond the checkpoint by a run that did not complete.
+        """
+        for name in self._part_files():
+            if int(name.split("-")[1]) >= next_block:
+                os.remove(os.path.join(self.job_path, name))
+
+    async def run(self) -> Optional[pl.DataFrame]:
+        """
+        Sync all blocks produced since the last run.
+
+        Returns:
+            Optional[pl.DataFrame]: The newly synced rows, or None if there were no new rows.
+        """
+        os.makedirs(self.job_path, exist_ok=True)
+
+        from_block = self.get_checkpoint()
+        self._remove_uncommitted_parts(from_block)
+
+        to_block = (
+            await self.manager._get_height(force_refresh=True) - self.confirmations
+        )
+        if to_block <= from_block:
+            return None
+
+        new_df = await self.manager.fetch_event_range(
+            self.event_config,
+            from_block,
+            to_block,
+            address=self.address,
+            tx_data=self.tx_data,
+            columns=self.columns,
+            shards=self.shards,
+            topic_filters=self.topic_filters,
+            contracts=self.contracts,
+        )
+
+        if new_df is not None and not new_df.is_empty():
+            part_path = os.path.join(
+                self.job_path, f"part-{from_block}-{to_block}.parquet"
+            )
+            new_df.write_parquet(f"{part_path}.tmp")
+            os.replace(f"{part_path}.tmp", part_path)
+
+        self._write_checkpoint(to_block)
+        return new_df
+
+    def read(self) -> Optional[pl.DataFrame]:
+        """
+        Read all rows synced so far.
+
+        Returns:
+            Optional[pl.DataFrame]: The synced rows in block order, or None if nothing has been synced yet.
+        """
+        if not os.path.exists(self.job_path):
+            return None
+
+        # only read the part files that are committed by the checkpoint
+        next_block = self.get_checkpoint()
+        part_files = [
+            name for name in self._part_files() if int(name.split("-")[1]) < next_block
+        ]
+        if not part_files:
+            return None
+
+        return pl.concat(
+            [pl.read_parquet(os.path.join(self.job_path, name)) for name in part_files],
+            how="diagonal_relaxed",
+        )
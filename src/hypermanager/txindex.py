@@ -0,0 +1,132 @@
+import os
+import polars as pl
+from typing import Dict, List, Optional, Tuple
+
+from dataclasses import dataclass, field
+
+
+@dataclass
+class TxIndex:
+    """
+    A local index of transaction hashes to the block number they were included in.
+
+    The index is populated from data that was already fetched, e.g. the results of `get_txs` or
+    `execute_event_query`, and lets `search_txs` look transactions up in narrow block ranges instead of scanning the
+    chain from genesis.
+
+    Attributes:
+        path (Optional[str]): The parquet file the index is loaded from and saved to. Defaults to None, which keeps
+            the index in memory only.
+    """
+
+    path: Optional[str] = None
+    blocks: Dict[str, int] = field(init=False, default_factory=dict)
+
+    def __post_init__(self):
+        if self.path is not None and os.path.exists(self.path):
+            self.update(pl.read_parquet(self.path))
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def update(
+        self,
+        df: pl.DataFrame,
+        hash_column: str = "hash",
+        block_column: str = "block_number",
+    ) -> None:
+        """
+        Add the transaction hashes and block numbers of a DataFrame to the index.
+
+        DataFrames without the hash or block number column are ignored.
+
+        Args:
+            df (pl.DataFrame): The data to index, e.g. the result of `get_txs` or `execute_event_query`.
+            hash_column (str): The transaction hash column. Defaults to "hash".
+            block_column (str): The block number column. Defaults to "block_number".
+        """
+        if hash_column not in df.columns or block_column not in df.columns:
+            return
+
+        # binary hashes are indexed by their prefixed hex representation
+        if df.schema[hash_column] == pl.Binary:
+            tx_hash = pl.lit("0x") + pl.col(hash_column).bin.encode("hex")
+        else:
+            tx_hash = pl.col(hash_column).str.to_lowercase()
+
+        index_df = (
+            df.select(
+                tx_hash.alias(hash_column),
+                pl.col(block_column).cast(pl.Int64),
+            )
+            .drop_nulls()
+            .unique(hash_column)
+        )
+        self.blocks.update(
+            zip(index_df[hash_column].to_list(), index_df[block_column].to_list())
+        )
+
+    def get(self, tx_hash: str) -> Optional[int]:
+        """
+        Get the block number of a transaction.
+
+        Args:
+            tx_hash (str): The transaction hash.
+
+        Returns:
+            Optional[int]: The block number, or None if the transaction is not indexed.
+        """
+        return self.blocks.get(tx_hash.lower())
+
+    def group(
+        self, tx_hashes: List[str], max_block_gap: int = 10_000
+    ) -> Tuple[List[Tuple[int, int, List[str]]], List[str]]:
+        """
+        Group transaction hashes by their block neighborhood.
+
+        Indexed hashes are sorted by block number and split into groups wherever two consecutive blocks are more
+        than `max_block_gap` blocks apart, so each group can be fetched with one narrow query.
+
+        Args:
+            tx_hashes (List[str]): The transaction hashes to group.
+            max_block_gap (int): The maximum block distance between two hashes of the same group. Defaults to 10,000.
+
+        Returns:
+            Tuple[List[Tuple[int, int, List[str]]], List[str]]: The `(from_block, to_block, hashes)` groups with an
+                exclusive `to_block`, and the hashes that are not indexed.
+        """
+        indexed = sorted(
+            (block, tx_hash)
+            for tx_hash in tx_hashes
+            if (block := self.get(tx_hash)) is not None
+        )
+        unindexed = [tx_hash for tx_hash in tx_hashes if self.get(tx_hash) is None]
+
+        groups = []
+        for block, tx_hash in indexed:
+            if groups and block - groups[-1][1] < max_block_gap:
+                groups[-1][1] = block + 1
+                groups[-1][2].append(tx_hash)
+            else:
+                groups.append([block, block + 1, [tx_hash]])
+
+        return [tuple(group) for group in groups], unindexed
+
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Save the index as a parquet file.
+
+        Args:
+            path (Optional[str]): The file to save the index to. Defaults to the path of the index.
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path given to save the transaction index to.")
+
+        pl.DataFrame(
+            {
+                "hash": list(self.blocks.keys()),
+                "block_number": list(self.blocks.values()),
+            },
+            schema={"hash": pl.String, "block_number": pl.Int64},
+        ).write_parquet(path)
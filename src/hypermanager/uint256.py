@@ -0,0 +1,400 @@
+import polars as pl
+from typing import List, Tuple, TypeVar
+
+Limbs = TypeVar("Limbs", pl.Expr, pl.Series)
+
+# A 256-bit integer is stored as a struct of eight 32-bit limbs, least significant first. Signed integers use the
+# two's complement, so the same limbs and arithmetic serve both uint256 and int256 values.
+LIMB_COUNT = 8
+LIMB_BITS = 32
+LIMB_BASE = 2**LIMB_BITS
+LIMB_MASK = LIMB_BASE - 1
+LIMB_NAMES = [f"l{i}" for i in range(LIMB_COUNT)]
+
+UINT256 = pl.Struct({name: pl.UInt32 for name in LIMB_NAMES})
+
+# Decimal strings are converted in chunks of 9 digits, the largest power of ten that fits in a limb
+DECIMAL_CHUNK_DIGITS = 9
+DECIMAL_CHUNK = 10**DECIMAL_CHUNK_DIGITS
+DECIMAL_CHUNK_COUNT = 9  # 81 digits, enough for the 78 digits of 2**256
+
+
+def _limbs(value: pl.Expr) -> List[pl.Expr]:
+    """
+    Get the limbs of a 256-bit integer column as UInt64 expressions, least significant first.
+    """
+    return [value.struct.field(name).cast(pl.UInt64) for name in LIMB_NAMES]
+
+
+def _split(value: Limbs) -> Tuple[Limbs, Limbs]:
+    """
+    Split UInt64 values into their low 32-bit limb and the carry into the next limb.
+    """
+    base = pl.lit(LIMB_BASE, dtype=pl.UInt64)
+    if isinstance(value, pl.Series):
+        return value % LIMB_BASE, value // LIMB_BASE
+    return value % base, value // base
+
+
+def _invert(limb: Limbs) -> Limbs:
+    """
+    Invert the bits of a 32-bit limb stored as a UInt64.
+    """
+    if isinstance(limb, pl.Series):
+        return LIMB_MASK - limb
+    return pl.lit(LIMB_MASK, dtype=pl.UInt64) - limb
+
+
+def _pack(limbs: List[pl.Expr], value: pl.Expr) -> pl.Expr:
+    """
+    Pack normalized limbs into a 256-bit integer column, named after the input column.
+    """
+    packed = pl.struct(
+        limb.cast(pl.UInt32).alias(name) for name, limb in zip(LIMB_NAMES, limbs)
+    )
+    return _keep_name(packed, value)
+
+
+def _keep_name(result: pl.Expr, value: pl.Expr) -> pl.Expr:
+    """
+    Name the result of a computation after the input column, if it has a name.
+    """
+    name = value.meta.output_name(raise_if_undetermined=False)
+    return result.alias(name) if name is not None else result
+
+
+def _carry(limbs: List[pl.Expr]) -> List[pl.Expr]:
+    """
+    Propagate the carries of limbs that overflowed 32 bits, wrapping around at 2**256.
+
+    Every limb must stay below 2**64 - 2**32, which holds for the sum of less than 2**32 values.
+    """
+    carry = pl.lit(0, dtype=pl.UInt64)
+    normalized = []
+    for limb in limbs:
+        normalized_limb, carry = _split(limb + carry)
+        normalized.append(normalized_limb)
+    return normalized
+
+
+def hex_to_uint256(value: pl.Expr) -> pl.Expr:
+    """
+    Convert a column of hex strings, with or without a "0x" prefix and of at most 64 digits, into 256-bit integers.
+
+    Args:
+        value (pl.Expr): The hex strings, such as the unmapped integers of decoded logs.
+
+    Returns:
+        pl.Expr: The 256-bit integers.
+    """
+    digits = (
+        pl.when(value.str.starts_with("0x"))
+        .then(value.str.slice(2))
+        .otherwise(value)
+        .str.pad_start(LIMB_COUNT * 8, "0")
+    )
+    return _pack(
+        [
+            digits.str.slice((LIMB_COUNT - 1 - i) * 8, 8).str.to_integer(
+                base=16, strict=False
+            )
+            for i in range(LIMB_COUNT)
+        ],
+        value,
+    )
+
+
+def binary_to_uint256(value: pl.Expr) -> pl.Expr:
+    """
+    Convert a column of big-endian binary values of at most 32 bytes into 256-bit integers.
+
+    Args:
+        value (pl.Expr): The binary values, such as the unmapped integers of logs decoded in binary output mode.
+
+    Returns:
+        pl.Expr: The 256-bit integers.
+    """
+    return hex_to_uint256(value.bin.encode("hex"))
+
+
+def decode_uint256_columns(df: pl.DataFrame, columns: List[str]) -> pl.DataFrame:
+    """
+    Convert the unmapped integer columns of decoded logs, as prefixed hex strings or binary values, into 256-bit
+    integers.
+
+    Args:
+        df (pl.DataFrame): The decoded logs.
+        columns (List[str]): The integer columns to convert. Columns missing from the logs are ignored.
+
+    Returns:
+        pl.DataFrame: The decoded logs with the converted columns.
+    """
+    return df.with_columns(
+        binary_to_uint256(pl.col(name))
+        if df.schema[name] == pl.Binary
+        else hex_to_uint256(pl.col(name))
+        for name in columns
+        if name in df.columns
+    )
+
+
+def _negate_where(limbs: List[pl.Series], mask: pl.Series) -> List[pl.Series]:
+    """
+    Replace the limbs of the masked rows with the two's complement of their value.
+    """
+    carry = mask.cast(pl.UInt64)
+    negated = []
+    for limb in limbs:
+        inverted = pl.select(
+            pl.when(mask).then(_invert(limb)).otherwise(limb)
+        ).to_series()
+        limb, carry = _split(inverted + carry)
+        negated.append(limb)
+    return negated
+
+
+def _series_from_int_string(value: pl.Series) -> pl.Series:
+    """
+    Convert a Series of decimal strings into 256-bit integers.
+
+    The limbs of every step are materialized, as a single expression would repeat the whole computation for every
+    limb that depends on it.
+    """
+    is_negative = value.str.starts_with("-")
+    digits = value.str.strip_prefix("-").str.pad_start(
+        DECIMAL_CHUNK_COUNT * DECIMAL_CHUNK_DIGITS, "0"
+    )
+
+    limbs = [pl.zeros(len(value), dtype=pl.UInt64, eager=True)] * LIMB_COUNT
+    # multiply the limbs by 10**9 and add the next chunk of digits, most significant chunk first
+    for chunk in range(DECIMAL_CHUNK_COUNT):
+        carry = digits.str.slice(
+            chunk * DECIMAL_CHUNK_DIGITS, DECIMAL_CHUNK_DIGITS
+        ).cast(pl.UInt64)
+        for i in range(LIMB_COUNT):
+            limbs[i], carry = _split(limbs[i] * DECIMAL_CHUNK + carry)
+
+    # negative values are stored as the two's complement
+    limbs = _negate_where(limbs, is_negative)
+
+    return pl.DataFrame(
+        {name: limb.cast(pl.UInt32) for name, limb in zip(LIMB_NAMES, limbs)}
+    ).to_struct(value.name)
+
+
+def int_string_to_uint256(value: pl.Expr) -> pl.Expr:
+    """
+    Convert a column of decimal strings into 256-bit integers, storing negative values as their two's complement.
+
+    This accepts the output of the `DataType.INTSTR` column mapping.
+
+    Args:
+        value (pl.Expr): The decimal strings.
+
+    Returns:
+        pl.Expr: The 256-bit integers.
+    """
+    return value.map_batches(_series_from_int_string, return_dtype=UINT256)
+
+
+def uint256_is_negative(value: pl.Expr) -> pl.Expr:
+    """
+    Check whether 256-bit integers are negative when interpreted as int256.
+
+    Args:
+        value (pl.Expr): The 256-bit integers.
+
+    Returns:
+        pl.Expr: Whether each integer is negative.
+    """
+    return value.struct.field(LIMB_NAMES[-1]) >= 2 ** (LIMB_BITS - 1)
+
+
+def uint256_add(left: pl.Expr, right: pl.Expr) -> pl.Expr:
+    """
+    Add two columns of 256-bit integers, wrapping around at 2**256 like the EVM.
+
+    Args:
+        left (pl.Expr): The first 256-bit integers.
+        right (pl.Expr): The second 256-bit integers.
+
+    Returns:
+        pl.Expr: The sums.
+    """
+    return _pack(
+        _carry([a + b for a, b in zip(_limbs(left), _limbs(right))]), left
+    )
+
+
+def uint256_neg(value: pl.Expr) -> pl.Expr:
+    """
+    Negate a column of 256-bit integers using the two's complement.
+
+    Args:
+        value (pl.Expr): The 256-bit integers.
+
+    Returns:
+        pl.Expr: The negated integers.
+    """
+    limbs = [_invert(limb) for limb in _limbs(value)]
+    limbs[0] = limbs[0] + 1
+    return _pack(_carry(limbs), value)
+
+
+def uint256_sub(left: pl.Expr, right: pl.Expr) -> pl.Expr:
+    """
+    Subtract two columns of 256-bit integers, wrapping around at 2**256 like the EVM.
+
+    Args:
+        left (pl.Expr): The 256-bit integers to subtract from.
+        right (pl.Expr): The 256-bit integers to subtract.
+
+    Returns:
+        pl.Expr: The differences.
+    """
+    return uint256_add(left, uint256_neg(right))
+
+
+def uint256_sum(value: pl.Expr) -> pl.Expr:
+    """
+    Exactly sum a column of 256-bit integers, in a `select` or in the aggregations of a `group_by`.
+
+    Every limb is summed natively as a UInt64, which can not overflow for less than 2**32 rows, and the carries are
+    propagated afterwards. Sums of int256 values are exact as long as the result fits in an int256.
+
+    Args:
+        value (pl.Expr): The 256-bit integers.
+
+    Returns:
+        pl.Expr: The sum.
+    """
+    return _pack(_carry([limb.sum() for limb in _limbs(value)]), value)
+
+
+def uint256_to_float(
+    value: pl.Expr, decimals: int = 0, signed: bool = False
+) -> pl.Expr:
+    """
+    Convert 256-bit integers into Float64 values, for plotting and other uses that tolerate rounding.
+
+    Args:
+        value (pl.Expr): The 256-bit integers.
+        decimals (int): The number of decimals of the token, the integers are divided by 10**decimals. Defaults to 0.
+        signed (bool): Whether to interpret the integers as int256. Defaults to False.
+
+    Returns:
+        pl.Expr: The Float64 values.
+    """
+    limbs = _limbs(value)
+    magnitude = pl.lit(0.0, dtype=pl.Float64)
+    # magnitude of the two's complement, computed from the inverted limbs to avoid cancellation errors
+    negated_magnitude = pl.lit(1.0, dtype=pl.Float64)
+    for i, limb in enumerate(limbs):
+        scale = float(2 ** (LIMB_BITS * i))
+        magnitude = magnitude + limb.cast(pl.Float64) * scale
+        negated_magnitude = (
+            negated_magnitude + _invert(limb).cast(pl.Float64) * scale
+        )
+
+    if signed:
+        magnitude = (
+            pl.when(uint256_is_negative(value))
+            .then(-negated_magnitude)
+            .otherwise(magnitude)
+        )
+    return _keep_name(magnitude / float(10**decimals), value)
+
+
+def _series_to_int_string(value: pl.Series, signed: bool) -> pl.Series:
+    """
+    Convert a Series of 256-bit integers into decimal strings, by repeatedly dividing the limbs by 10**9.
+    """
+    limbs = [value.struct.field(name).cast(pl.UInt64) for name in LIMB_NAMES]
+
+    is_negative = None
+    if signed:
+        is_negative = limbs[-1] >= 2 ** (LIMB_BITS - 1)
+        limbs = _negate_where(limbs, is_negative)
+
+    chunks = []
+    for _ in range(DECIMAL_CHUNK_COUNT):
+        remainder = pl.zeros(len(value), dtype=pl.UInt64, eager=True)
+        for i in reversed(range(LIMB_COUNT)):
+            dividend = remainder * LIMB_BASE + limbs[i]
+            limbs[i] = dividend // DECIMAL_CHUNK
+            remainder = dividend % DECIMAL_CHUNK
+        chunks.append(
+            remainder.cast(pl.String).str.pad_start(DECIMAL_CHUNK_DIGITS, "0")
+        )
+
+    frame = pl.DataFrame(
+        {f"c{i}": chunk for i, chunk in enumerate(reversed(chunks))}
+    )
+    digits = frame.select(
+        pl.concat_str(frame.columns)
+        .str.strip_chars_start("0")
+        .replace("", "0")
+        .alias(value.name)
+    ).to_series()
+    if signed:
+        digits = pl.select(
+            pl.when(is_negative).then("-" + digits).otherwise(digits)
+        ).to_series()
+    # keep the nulls of the input
+    return pl.select(
+        pl.when(value.is_not_null()).then(digits).alias(value.name)
+    ).to_series()
+
+
+def uint256_to_int_string(value: pl.Expr, signed: bool = False) -> pl.Expr:
+    """
+    Convert 256-bit integers into their exact decimal strings.
+
+    Args:
+        value (pl.Expr): The 256-bit integers.
+        signed (bool): Whether to interpret the integers as int256. Defaults to False.
+
+    Returns:
+        pl.Expr: The decimal strings.
+    """
+    return value.map_batches(
+        lambda series: _series_to_int_string(series, signed),
+        return_dtype=pl.String,
+    )
+
+
+def uint256_to_decimal(
+    value: pl.Expr, decimals: int = 0, signed: bool = False
+) -> pl.Expr:
+    """
+    Convert 256-bit integers into Decimal values scaled by the decimals of the token, such as 18 for ETH.
+
+    Polars decimals hold at most 38 digits, values that do not fit are returned as null.
+
+    Args:
+        value (pl.Expr): The 256-bit integers.
+        decimals (int): The number of decimals of the token. Defaults to 0.
+        signed (bool): Whether to interpret the integers as int256. Defaults to False.
+
+    Returns:
+        pl.Expr: The Decimal values, with a scale of `decimals`.
+    """
+
+    def to_decimal(series: pl.Series) -> pl.Series:
+        digits = _series_to_int_string(series, signed)
+        if decimals:
+            sign = pl.when(digits.str.starts_with("-")).then(pl.lit("-")).otherwise(
+                pl.lit("")
+            )
+            magnitude = digits.str.strip_prefix("-").str.pad_start(decimals + 1, "0")
+            digits = pl.select(
+                pl.concat_str(
+                    sign,
+                    magnitude.str.slice(0, magnitude.str.len_chars() - decimals),
+                    pl.lit("."),
+                    magnitude.str.slice(-decimals),
+                ).alias(series.name)
+            ).to_series()
+        return digits.cast(pl.Decimal(38, decimals), strict=False)
+
+    return value.map_batches(to_decimal, return_dtype=pl.Decimal(38, decimals))
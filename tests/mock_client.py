@@ -0,0 +1,550 @@
+import asyncio
+import os
+import zlib
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import hypersync
+
+from dataclasses import dataclass, field
+from hypermanager.decoder import parse_event_signature
+
+TABLE_NAMES = ["blocks", "transactions", "logs", "traces", "decoded_logs"]
+
+# Fields that the server returns as integers instead of hex strings
+INTEGER_FIELDS = {"number", "block_number", "transaction_index", "log_index"}
+SMALL_INTEGER_FIELDS = {"type", "status", "kind", "removed"}
+ADDRESS_FIELDS = {"address", "from", "to", "contract_address", "miner"}
+
+# Polars types of the column mapping data types, the other data types are returned as hex strings
+POLARS_TYPES = {
+    hypersync.DataType.FLOAT64: pl.Float64,
+    hypersync.DataType.FLOAT32: pl.Float32,
+    hypersync.DataType.UINT64: pl.UInt64,
+    hypersync.DataType.UINT32: pl.UInt32,
+    hypersync.DataType.INT64: pl.Int64,
+    hypersync.DataType.INT32: pl.Int32,
+}
+
+EXTRA_DATA = [b"beaverbuild.org", b"Titan (titanbuilder.xyz)", b"rsync-builder.xyz"]
+
+# Blocks are produced every `BLOCK_TIME` seconds from `GENESIS_TIMESTAMP` on
+GENESIS_TIMESTAMP = 1_600_000_000
+BLOCK_TIME = 12
+
+# The columns identifying the transaction of a row
+_ROW_KEY = ["block_number", "transaction_index"]
+
+# Synthetic transaction hashes hold the block number and the transaction index in two 16 byte halves
+HASH_HALF_SIZE = 16
+
+
+def tx_hash(block_number: int, transaction_index: int) -> str:
+    """
+    Get the synthetic hash of a transaction, which encodes its block number and index.
+
+    Args:
+        block_number (int): The block number of the transaction.
+        transaction_index (int): The index of the transaction in its block.
+
+    Returns:
+        str: The prefixed hex hash of the transaction.
+    """
+    return f"0x{block_number:032x}{transaction_index:032x}"
+
+
+def _names(fields) -> List[str]:
+    """
+    Get the names of a list of field enum members or field names.
+    """
+    return list(dict.fromkeys(getattr(name, "value", name) for name in fields or []))
+
+
+def _mapping(mapping) -> Dict[str, hypersync.DataType]:
+    """
+    Get a column mapping keyed by field name.
+    """
+    return {
+        getattr(name, "value", name): data_type
+        for name, data_type in (mapping or {}).items()
+    }
+
+
+HEX_DIGITS = [f"{digit:x}" for digit in range(16)]
+
+
+def _hex(values: pl.Expr, size: int) -> pl.Expr:
+    """
+    Format unsigned integers as big-endian hex strings of `size` bytes, without a prefix.
+    """
+    values = values.cast(pl.UInt64)
+    digits = [
+        ((values // 16**shift) % 16).replace_strict(
+            list(range(16)), HEX_DIGITS, return_dtype=pl.String
+        )
+        for shift in reversed(range(16))
+    ]
+    return pl.concat_str([pl.lit("0" * (size * 2 - 16)), *digits])
+
+
+def _encode(hex_values: pl.Expr, hex_output: hypersync.HexOutput) -> pl.Expr:
+    """
+    Encode unprefixed hex strings the way the server does for the hex output of the stream configuration.
+    """
+    if hex_output == hypersync.HexOutput.NO_ENCODE:
+        return hex_values.str.decode("hex")
+    return pl.lit("0x") + hex_values
+
+
+def _selection_id(selection: hypersync.LogSelection) -> int:
+    """
+    Get a stable identifier of a log selection, derived from its filters.
+    """
+    return zlib.crc32(repr((selection.address, selection.topics)).encode())
+
+
+def _rows(from_block: int, to_block: int, rows_per_block: int) -> pl.DataFrame:
+    """
+    Build the block numbers and indexes of `rows_per_block` rows per block of a block range.
+    """
+    row = pl.int_range(0, (to_block - from_block) * rows_per_block, dtype=pl.UInt64)
+    return pl.select(
+        (row // rows_per_block + from_block).alias("block_number"),
+        (row % rows_per_block).alias("transaction_index"),
+    )
+
+
+@dataclass
+class MockHypersyncClient:
+    """
+    A stand-in for `hypersync.HypersyncClient` serving synthetic Arrow responses, so `HyperManager` methods can be
+    benchmarked and tested offline.
+
+    Every log selection matches `logs_per_block` logs per block, emitted by the first contract of the selection and
+    each by its own transaction, and every block holds `logs_per_block` transactions. Only the requested fields are
+    returned, typed by the column mapping and encoded by the hex output of the stream configuration, and transaction
+    hash selections only return the matching transactions. Blocks are `BLOCK_TIME` seconds apart. Every `page_blocks`
+    blocks are served as a separate page that takes `latency` seconds.
+
+    Generated responses are cached by query, so repeated runs only measure the manager and not the data generation,
+    at the cost of keeping every served response in memory.
+
+    Attributes:
+        height (int): The chain height, the exclusive end of the served blocks. Defaults to 20,000,000.
+        logs_per_block (int): The number of logs and transactions per block. Defaults to 10.
+        latency (float): The latency of a single page in seconds. Defaults to 0.
+        page_blocks (int): The number of blocks per page. Defaults to 10,000.
+        cache (bool): Whether to cache the generated responses. Defaults to True.
+    """
+
+    height: int = 20_000_000
+    logs_per_block: int = 10
+    latency: float = 0.0
+    page_blocks: int = 10_000
+    cache: bool = True
+    _responses: Dict[Tuple, SimpleNamespace] = field(default_factory=dict, repr=False)
+
+    def _column(
+        self,
+        name: str,
+        mapping: Dict[str, hypersync.DataType],
+        hex_output: hypersync.HexOutput,
+    ) -> pl.Expr:
+        """
+        Build a column derived from the row index, typed like the server would return it.
+        """
+        seed = pl.int_range(0, pl.len(), dtype=pl.UInt64)
+        if name in INTEGER_FIELDS:
+            return seed
+        if name in SMALL_INTEGER_FIELDS:
+            return pl.repeat(2, pl.len(), dtype=pl.UInt8)
+        if name in mapping and mapping[name] in POLARS_TYPES:
+            return seed.cast(POLARS_TYPES[mapping[name]])
+        if name == "extra_data":
+            text = (seed % len(EXTRA_DATA)).replace_strict(
+                list(range(len(EXTRA_DATA))),
+                [value.hex() for value in EXTRA_DATA],
+                return_dtype=pl.String,
+            )
+            return _encode(text, hex_output)
+        return _encode(_hex(seed, 20 if name in ADDRESS_FIELDS else 32), hex_output)
+
+    def _table(
+        self,
+        rows: pl.DataFrame,
+        names: List[str],
+        columns: Dict[str, pl.Expr],
+        mapping: Dict[str, hypersync.DataType],
+        hex_output: hypersync.HexOutput,
+    ) -> pa.Table:
+        """
+        Build a table of the requested fields from the block numbers and indexes of its rows, using the given
+        column expressions and deriving the others.
+        """
+        if not names or rows.is_empty():
+            return pa.table({})
+        return rows.select(
+            (
+                columns[name]
+                if name in columns
+                else pl.col(name)
+                if name in rows.columns
+                else self._column(name, mapping, hex_output)
+            ).alias(name)
+            for name in names
+        ).to_arrow()
+
+    def _tx_hash(self, hex_output: hypersync.HexOutput) -> pl.Expr:
+        """
+        Build the synthetic transaction hashes of rows with block numbers and transaction indexes.
+        """
+        return _encode(
+            _hex(pl.col("block_number"), HASH_HALF_SIZE)
+            + _hex(pl.col("transaction_index"), HASH_HALF_SIZE),
+            hex_output,
+        )
+
+    def _logs(
+        self,
+        query: hypersync.Query,
+        config: hypersync.StreamConfig,
+        from_block: int,
+        to_block: int,
+    ) -> Tuple[pa.Table, pa.Table, pl.DataFrame]:
+        """
+        Build the logs and decoded logs of a block range, with the block numbers and transaction indexes of the
+        transactions that emitted them.
+        """
+        # every log selection matches `logs_per_block` logs per block of its own, so the logs of disjoint selections
+        # are distinct even if they are queried separately
+        selections = [
+            (_selection_id(selection), selection) for selection in query.logs or []
+        ]
+        rows = pl.concat(
+            [
+                _rows(from_block, to_block, self.logs_per_block).with_columns(
+                    pl.lit(selection_id, dtype=pl.UInt64).alias("selection_id")
+                )
+                for selection_id, _ in selections
+            ]
+            or [_rows(from_block, from_block, 1)]
+        )
+        if rows.is_empty():
+            return pa.table({}), pa.table({}), rows.select(_ROW_KEY)
+        rows = rows.with_columns(
+            (
+                pl.col("selection_id") * self.logs_per_block
+                + pl.col("transaction_index")
+            ).alias("log_index")
+        ).sort("block_number", "log_index")
+
+        # the logs of a selection have its topic0 and are emitted by its first contract
+        selection_ids = [selection_id for selection_id, _ in selections]
+        topic0 = pl.col("selection_id").replace_strict(
+            selection_ids,
+            [
+                selection.topics[0][0][2:]
+                if selection.topics and selection.topics[0]
+                else "00" * 32
+                for _, selection in selections
+            ],
+            return_dtype=pl.String,
+        )
+        address = pl.col("selection_id").replace_strict(
+            selection_ids,
+            [
+                selection.address[0][2:] if selection.address else None
+                for _, selection in selections
+            ],
+            return_dtype=pl.String,
+        )
+        word = _hex(pl.col("block_number") * 1000 + pl.col("transaction_index"), 32)
+
+        hex_output = config.hex_output
+        column_mapping = config.column_mapping or hypersync.ColumnMapping()
+        logs = self._table(
+            rows,
+            _names(query.field_selection.log),
+            {
+                "log_index": pl.col("log_index"),
+                "address": _encode(
+                    address.fill_null(_hex(pl.col("log_index"), 20)), hex_output
+                ),
+                "transaction_hash": self._tx_hash(hex_output),
+                "topic0": _encode(topic0, hex_output),
+                "topic1": _encode(_hex(pl.col("transaction_index") + 1, 32), hex_output),
+                "topic2": _encode(_hex(pl.col("block_number"), 32), hex_output),
+                "topic3": pl.lit(None, dtype=pl.String),
+                "data": _encode(pl.concat_str([word] * 4), hex_output),
+            },
+            _mapping(column_mapping.log),
+            hex_output,
+        )
+
+        decoded_logs = pa.table({})
+        if config.event_signature:
+            _, params = parse_event_signature(config.event_signature)
+            # every address parameter gets its own distinct address per log
+            addresses = {
+                param.name: _encode(
+                    _hex(
+                        pl.col("block_number") * 1000
+                        + pl.col("transaction_index")
+                        + position * 10**11,
+                        20,
+                    ),
+                    hex_output,
+                )
+                for position, param in enumerate(params)
+                if param.type == "address"
+            }
+            decoded_logs = self._table(
+                rows,
+                [param.name for param in params],
+                addresses,
+                column_mapping.decoded_log or {},
+                hex_output,
+            )
+
+        return logs, decoded_logs, rows.select(_ROW_KEY)
+
+    def _response(
+        self,
+        query: hypersync.Query,
+        config: hypersync.StreamConfig,
+        from_block: int,
+        to_block: int,
+    ) -> SimpleNamespace:
+        """
+        Build the response of a block range of a query.
+        """
+        logs, decoded_logs, log_rows = self._logs(query, config, from_block, to_block)
+
+        # add the transactions selected by hash or selected as a whole
+        tx_rows = [log_rows]
+        for selection in query.transactions:
+            if selection.hash:
+                hashes = [
+                    value[2:] if isinstance(value, str) else value.hex()
+                    for value in selection.hash
+                ]
+                tx_rows.append(
+                    pl.DataFrame(
+                        {
+                            "block_number": [int(value[:32], 16) for value in hashes],
+                            "transaction_index": [
+                                int(value[32:], 16) for value in hashes
+                            ],
+                        },
+                        schema={
+                            "block_number": pl.UInt64,
+                            "transaction_index": pl.UInt64,
+                        },
+                    ).filter(
+                        pl.col("block_number").is_between(
+                            from_block, to_block, closed="left"
+                        )
+                    )
+                )
+            else:
+                tx_rows.append(_rows(from_block, to_block, self.logs_per_block))
+        tx_rows = (
+            pl.concat(tx_rows)
+            .unique(maintain_order=True)
+            .sort("block_number", "transaction_index")
+        )
+
+        hex_output = config.hex_output
+        column_mapping = config.column_mapping or hypersync.ColumnMapping()
+        transactions = self._table(
+            tx_rows,
+            _names(query.field_selection.transaction),
+            {"hash": self._tx_hash(hex_output)},
+            _mapping(column_mapping.transaction),
+            hex_output,
+        )
+
+        block_mapping = _mapping(column_mapping.block)
+        timestamp = pl.col("block_number") * BLOCK_TIME + GENESIS_TIMESTAMP
+        if block_mapping.get("timestamp") in POLARS_TYPES:
+            timestamp = timestamp.cast(POLARS_TYPES[block_mapping["timestamp"]])
+        else:
+            timestamp = _encode(_hex(timestamp, 32), hex_output)
+
+        block_rows = tx_rows.select("block_number").unique(maintain_order=True)
+        if query.blocks:
+            block_rows = _rows(from_block, to_block, 1).select("block_number")
+        blocks = self._table(
+            block_rows,
+            _names(query.field_selection.block),
+            {"number": pl.col("block_number"), "timestamp": timestamp},
+            block_mapping,
+            hex_output,
+        )
+
+        return SimpleNamespace(
+            archive_height=self.height,
+            next_block=to_block,
+            total_execution_time=0,
+            data=SimpleNamespace(
+                blocks=blocks,
+                transactions=transactions,
+                logs=logs,
+                traces=pa.table({}),
+                decoded_logs=decoded_logs,
+            ),
+            rollback_guard=None,
+        )
+
+    def _cached_response(
+        self,
+        query: hypersync.Query,
+        config: hypersync.StreamConfig,
+        from_block: int,
+        to_block: int,
+    ) -> SimpleNamespace:
+        """
+        Serve the response of a block range, generating it only the first time the same query asks for it.
+        """
+        if not self.cache:
+            return self._response(query, config, from_block, to_block)
+        key = (repr(query), repr(config), from_block, to_block)
+        if key not in self._responses:
+            self._responses[key] = self._response(query, config, from_block, to_block)
+        return self._responses[key]
+
+    def _pages(self, query: hypersync.Query) -> List[Tuple[int, int]]:
+        """
+        Split the block range of a query into pages.
+        """
+        to_block = min(query.to_block or self.height, self.height)
+        return [
+            (page_from, min(page_from + self.page_blocks, to_block))
+            for page_from in range(query.from_block, to_block, self.page_blocks)
+        ]
+
+    async def get_height(self) -> int:
+        await asyncio.sleep(self.latency)
+        return self.height
+
+    async def collect_arrow(
+        self, query: hypersync.Query, config: hypersync.StreamConfig
+    ) -> SimpleNamespace:
+        pages = self._pages(query)
+        await asyncio.sleep(self.latency * max(1, len(pages)))
+        to_block = pages[-1][1] if pages else query.from_block
+        return self._cached_response(query, config, query.from_block, to_block)
+
+    async def stream_arrow(
+        self, query: hypersync.Query, config: hypersync.StreamConfig
+    ) -> "MockStream":
+        return MockStream(self, query, config, self._pages(query))
+
+
+@dataclass
+class MockStream:
+    """
+    A stand-in for `hypersync.ArrowStream`, serving one page per `recv` call.
+    """
+
+    client: MockHypersyncClient
+    query: hypersync.Query
+    config: hypersync.StreamConfig
+    pages: List[Tuple[int, int]]
+
+    async def recv(self) -> Optional[SimpleNamespace]:
+        if not self.pages:
+            return None
+        page_from, page_to = self.pages.pop(0)
+        await asyncio.sleep(self.client.latency)
+        return self.client._cached_response(
+            self.query, self.config, page_from, page_to
+        )
+
+    async def close(self) -> None:
+        self.pages = []
+
+
+def save_response(response, path: str) -> None:
+    """
+    Record the tables of a real `collect_arrow` response as parquet files, so it can be replayed with
+    `ReplayHypersyncClient`.
+
+    Args:
+        response (hypersync.ArrowResponse): The response to record.
+        path (str): The directory to write the tables to.
+    """
+    os.makedirs(path, exist_ok=True)
+    for name in TABLE_NAMES:
+        pq.write_table(
+            getattr(response.data, name), os.path.join(path, f"{name}.parquet")
+        )
+
+
+@dataclass
+class ReplayHypersyncClient:
+    """
+    A stand-in for `hypersync.HypersyncClient` replaying a response recorded with `save_response`, sliced to the
+    block range of every query.
+
+    The recorded response is replayed as is, so it should be recorded with the same query shape and stream
+    configuration as the benchmarked method.
+
+    Attributes:
+        path (str): The directory of the recorded tables.
+        latency (float): The latency of a single response in seconds. Defaults to 0.
+    """
+
+    path: str
+    latency: float = 0.0
+    tables: Dict[str, pa.Table] = field(init=False)
+
+    def __post_init__(self):
+        self.tables = {
+            name: pq.read_table(os.path.join(self.path, f"{name}.parquet"))
+            for name in TABLE_NAMES
+        }
+
+    def _in_range(self, blocks: pa.ChunkedArray, query: hypersync.Query) -> pa.Array:
+        """
+        Get the mask of the rows within the block range of a query.
+        """
+        mask = pc.greater_equal(blocks, query.from_block)
+        if query.to_block is not None:
+            mask = pc.and_(mask, pc.less(blocks, query.to_block))
+        return mask
+
+    async def get_height(self) -> int:
+        await asyncio.sleep(self.latency)
+        blocks = self.tables["blocks"]
+        if "number" not in blocks.column_names or blocks.num_rows == 0:
+            return 0
+        return int(max(blocks["number"].to_pylist())) + 1
+
+    async def collect_arrow(
+        self, query: hypersync.Query, config: hypersync.StreamConfig
+    ) -> SimpleNamespace:
+        await asyncio.sleep(self.latency)
+        data = {}
+        for name, table in self.tables.items():
+            if name == "blocks" and "number" in table.column_names:
+                table = table.filter(self._in_range(table["number"], query))
+            elif "block_number" in table.column_names:
+                table = table.filter(self._in_range(table["block_number"], query))
+            elif name == "decoded_logs" and table.num_rows:
+                # decoded logs are row aligned with the logs
+                logs = self.tables["logs"]
+                table = table.filter(self._in_range(logs["block_number"], query))
+            data[name] = table
+
+        return SimpleNamespace(
+            archive_height=None,
+            next_block=query.to_block,
+            total_execution_time=0,
+            data=SimpleNamespace(**data),
+            rollback_guard=None,
+        )
@@ -0,0 +1,133 @@
+"""
+Event configurations and manager factories shared by the tests.
+"""
+
+import itertools
+from dataclasses import dataclass, field
+from typing import Collection, List, Optional
+
+from hypersync import ColumnMapping, DataType
+
+from hypermanager.clients import ClientRegistry
+from hypermanager.concurrency import RetryPolicy
+from hypermanager.events import EventConfig
+from hypermanager.manager import HyperManager
+from hypermanager.multichain import MultiChainManager
+from hypermanager.networks import HyperSyncClients
+from mock_client import MockHypersyncClient, MockStream
+
+# WETH style parameter names, which do not collide with the transaction columns
+TRANSFER = EventConfig(
+    name="Transfer",
+    signature="Transfer(address indexed src, address indexed dst, uint256 wad)",
+    column_mapping=ColumnMapping(decoded_log={"wad": DataType.FLOAT64}),
+)
+APPROVAL = EventConfig(
+    name="Approval",
+    signature="Approval(address indexed src, address indexed guy, uint256 wad)",
+    column_mapping=ColumnMapping(decoded_log={"wad": DataType.FLOAT64}),
+)
+# ERC-20 style parameter names, which share their names with the `from` and `to` transaction columns
+ERC20_TRANSFER = EventConfig(
+    name="Transfer",
+    signature="Transfer(address indexed from, address indexed to, uint256 value)",
+    column_mapping=ColumnMapping(decoded_log={"value": DataType.FLOAT64}),
+)
+CHAINS = [HyperSyncClients.BASE, HyperSyncClients.OPTIMISM]
+
+_urls = itertools.count()
+
+
+@dataclass
+class FlakyClient(MockHypersyncClient):
+    """
+    A mock client whose first `collect_arrow` calls are throttled and whose streams fail on some `recv` calls.
+
+    Attributes:
+        collect_failures (int): The number of `collect_arrow` calls that fail with a 429 response. Defaults to 0.
+        recv_failures (Collection[int]): The numbers of the `recv` calls, counted over every stream, that fail.
+            Defaults to none.
+        recv_error (Exception): The error of the failing `recv` calls. Defaults to a dropped connection.
+        recv_calls (int): The number of `recv` calls so far.
+        streams (List[MockStream]): The streams opened so far.
+    """
+
+    collect_failures: int = 0
+    recv_failures: Collection[int] = ()
+    recv_error: Exception = ConnectionError("connection reset by peer")
+    recv_calls: int = field(init=False, default=0)
+    streams: List[MockStream] = field(init=False, default_factory=list)
+
+    @property
+    def stream_from_blocks(self) -> List[int]:
+        """
+        The blocks the streams opened so far start at.
+        """
+        return [stream.query.from_block for stream in self.streams]
+
+    async def collect_arrow(self, query, config):
+        if self.collect_failures:
+            self.collect_failures -= 1
+            raise RuntimeError(
+                "http response status code 429, err body: too many requests"
+            )
+        return await super().collect_arrow(query, config)
+
+    async def stream_arrow(self, query, config):
+        stream = await super().stream_arrow(query, config)
+        recv = stream.recv
+
+        async def flaky_recv():
+            self.recv_calls += 1
+            if self.recv_calls in self.recv_failures:
+                raise self.recv_error
+            return await recv()
+
+        stream.recv = flaky_recv
+        self.streams.append(stream)
+        return stream
+
+
+def make_manager(
+    client: Optional[MockHypersyncClient] = None,
+    height: int = 1_000,
+    logs_per_block: int = 1,
+    **kwargs,
+) -> HyperManager:
+    """
+    Create a manager of a mock client with a url of its own, so it shares no height cache or concurrency controller
+    with the managers of other tests, and with retries that back off for a millisecond only.
+
+    Args:
+        client (Optional[MockHypersyncClient]): The client of the manager. Defaults to a new mock client of `height`
+            blocks with `logs_per_block` logs each.
+        height (int): The height of the default client. Defaults to 1,000.
+        logs_per_block (int): The logs per block of the default client. Defaults to 1.
+        **kwargs: Further arguments of the manager.
+
+    Returns:
+        HyperManager: The manager.
+    """
+    if client is None:
+        client = MockHypersyncClient(height=height, logs_per_block=logs_per_block)
+    kwargs.setdefault("url", f"http://test-{next(_urls)}")
+    manager = HyperManager(client=client, **kwargs)
+    manager.controller.retry = RetryPolicy(base_delay=0.001)
+    return manager
+
+
+def make_multichain(height: int = 1_000, **kwargs) -> MultiChainManager:
+    """
+    Create a multi-chain manager of `CHAINS`, with a mock client per chain.
+
+    Args:
+        height (int): The height of the mock clients. Defaults to 1,000.
+        **kwargs: Further arguments of the managers of the chains.
+
+    Returns:
+        MultiChainManager: The multi-chain manager.
+    """
+    registry = ClientRegistry()
+    for chain in CHAINS:
+        registry.managers[chain.client] = make_manager(height=height, **kwargs)
+    return MultiChainManager(CHAINS, registry=registry)
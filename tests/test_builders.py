@@ -0,0 +1,46 @@
+import re
+
+import polars as pl
+
+from hypermanager.builders import decode_extra_data, label_builders
+from hypermanager.helpers import byte_to_string
+
+EXTRA_DATA = [
+    b"beaverbuild.org",
+    "Titan (titanbuilder.xyz) é€\U0001f600".encode(),
+    b"rsync-builder.xyz\x00\x00",
+    b"\xd0bobTheBuilder\xff",
+    b"\xed\xa0\x80",
+    b"\xe0\x80\x80",
+    b"\xf0\x9f\x98",
+    b"",
+]
+
+
+def test_decode_extra_data_matches_byte_to_string():
+    expected = [byte_to_string("0x" + value.hex()) for value in EXTRA_DATA]
+    expected = [re.sub(r"[\x00-\x1f\x7f-\x9f]", "", text) for text in expected]
+
+    for extra_data in [
+        pl.Series("extra_data", EXTRA_DATA),
+        pl.Series("extra_data", ["0x" + value.hex() for value in EXTRA_DATA]),
+    ]:
+        assert decode_extra_data(extra_data).to_list() == expected
+
+
+def test_decode_extra_data_keeps_nulls():
+    extra_data = pl.Series("extra_data", [None, "0x"], dtype=pl.String)
+    assert decode_extra_data(extra_data).to_list() == [None, ""]
+
+
+def test_label_builders():
+    df = pl.DataFrame({"extra_data": EXTRA_DATA[:4] + [None]})
+    labelled = label_builders(df)
+    assert labelled["builder"].to_list() == [
+        "beaverbuild",
+        "titan",
+        "rsync",
+        "bobthebuilder",
+        None,
+    ]
+    assert labelled["extra_data_text"][2] == "rsync-builder.xyz"
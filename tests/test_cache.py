@@ -0,0 +1,67 @@
+import asyncio
+import json
+import os
+
+import polars as pl
+
+from hypermanager.cache import EventCache
+from mock_client import MockHypersyncClient
+from support import TRANSFER, make_manager
+
+def blocks(from_block: int, to_block: int, value: int) -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "block_number": list(range(from_block, to_block)),
+            "value": [value] * (to_block - from_block),
+        }
+    )
+
+
+def test_cached_query_without_block_number_column(tmp_path):
+    client = MockHypersyncClient(height=1_000, logs_per_block=1)
+    cached = make_manager(client, cache=EventCache(str(tmp_path)))
+    uncached = make_manager(client)
+
+    cached_df = asyncio.run(
+        cached.execute_event_query(
+            TRANSFER, 100, 110, columns=["timestamp"], print_time=False
+        )
+    )
+    uncached_df = asyncio.run(
+        uncached.execute_event_query(
+            TRANSFER, 100, 110, columns=["timestamp"], print_time=False
+        )
+    )
+    assert cached_df.equals(uncached_df)
+
+
+def test_write_appends_segments_and_replaces_overlaps(tmp_path):
+    cache = EventCache(str(tmp_path), max_segments=2)
+    cache.write("key", 0, 10, blocks(0, 10, 1))
+    cache.write("key", 10, 20, blocks(10, 20, 1))
+    assert sorted(os.listdir(tmp_path / "key")) == [
+        "0_10.parquet",
+        "10_20.parquet",
+        "catalog.json",
+    ]
+
+    cache.write("key", 5, 15, blocks(5, 15, 2))
+    df = cache.read("key", 0, 20)
+    assert df["block_number"].to_list() == list(range(20))
+    assert df["value"].to_list() == [1] * 5 + [2] * 10 + [1] * 5
+
+    # the third segment exceeds max_segments and compacts the interval into one file
+    with open(tmp_path / "key" / "catalog.json") as f:
+        assert json.load(f)["segments"] == [[0, 20]]
+    assert cache.read("key", 0, 20).equals(df)
+
+
+def test_unconfirmed_blocks_are_not_cached(tmp_path):
+    manager = make_manager(cache=EventCache(str(tmp_path), confirmations=10))
+    df = asyncio.run(
+        manager.execute_event_query(TRANSFER, 900, 1_000, print_time=False)
+    )
+    assert df.height == 100
+
+    (key,) = os.listdir(tmp_path)
+    assert EventCache(str(tmp_path)).get_intervals(key) == [(900, 990)]
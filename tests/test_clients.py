@@ -0,0 +1,23 @@
+import asyncio
+
+from hypermanager.clients import ClientRegistry
+from mock_client import MockHypersyncClient
+
+
+def test_evicted_manager_stops_height_refresher():
+    async def run():
+        registry = ClientRegistry(max_clients=1)
+        manager = registry.get_manager("http://evicted-refresher")
+        manager.client = MockHypersyncClient(height=1_000, logs_per_block=1)
+        manager.height_refresh_interval = 0.01
+        await manager._get_height()
+        refresher = manager.height_cache._refresher
+        assert refresher is not None and not refresher.done()
+
+        registry.get_manager("http://other-refresher")
+        await asyncio.sleep(0)
+        assert refresher.cancelled()
+        assert manager.height_cache._refresher is None
+        await registry.close()
+
+    asyncio.run(run())
@@ -0,0 +1,181 @@
+import asyncio
+
+import pytest
+
+from hypermanager.concurrency import (
+    TIER_POLICIES,
+    ConcurrencyController,
+    RetryPolicy,
+    TierPolicy,
+    get_controller,
+    get_tier,
+)
+from hypermanager.metrics import QueryMetrics, measure_query
+from support import TRANSFER, FlakyClient, make_manager
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        asyncio.TimeoutError(),
+        TimeoutError("read timed out"),
+        ConnectionResetError(),
+        RuntimeError("error sending request: connection refused"),
+        RuntimeError("http response status code 429, err body: slow down"),
+        RuntimeError("http response status code 503, err body: "),
+        RuntimeError("operation timed out"),
+    ],
+)
+def test_transient_errors_are_retried(error):
+    assert RetryPolicy().is_retryable(error)
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        ValueError("invalid address"),
+        TypeError("unexpected keyword"),
+        KeyError("number"),
+        RuntimeError("http response status code 400, err body: invalid query"),
+        RuntimeError("http response status code 401, err body: connection not allowed"),
+        RuntimeError("failed to parse event signature"),
+    ],
+)
+def test_other_errors_are_not_retried(error):
+    assert not RetryPolicy().is_retryable(error)
+
+
+def test_tier_policies():
+    assert get_tier("https://eth.hypersync.xyz/") == "gold"
+    assert get_tier("https://aurora.hypersync.xyz") == "bronze"
+    assert get_tier("http://unknown-endpoint") == "bronze"
+
+    controller = get_controller("https://eth.hypersync.xyz")
+    assert controller is get_controller("https://eth.hypersync.xyz")
+    assert controller.policy == TIER_POLICIES["gold"]
+    assert get_controller("http://unknown-endpoint").concurrency == 2
+
+
+def test_aimd_limit(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("hypermanager.concurrency.time.monotonic", lambda: now[0])
+    controller = ConcurrencyController(
+        url="http://aimd", policy=TierPolicy(initial_concurrency=4, max_concurrency=6)
+    )
+
+    async def request(latency: float, failed: bool = False) -> None:
+        started_at = await controller.acquire()
+        now[0] += latency
+        controller.release(started_at, failed=failed)
+
+    async def run():
+        # every full window of fast requests adds one request
+        for _ in range(4):
+            await request(0.1)
+        assert controller.concurrency == 5
+        for _ in range(20):
+            await request(0.1)
+        assert controller.concurrency == 6
+
+        # a failure or a request much slower than the average halves the limit
+        await request(0.1, failed=True)
+        assert controller.concurrency == 3
+        now[0] += 1
+        await request(5.0)
+        assert controller.concurrency == 1
+
+        # a burst of failures of requests started before the decrease only counts once
+        controller.limit = 4.0
+        started = [await controller.acquire() for _ in range(3)]
+        now[0] += 1
+        for started_at in started:
+            controller.release(started_at, failed=True)
+        assert controller.concurrency == 2
+        assert controller.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_controller_limits_requests_in_flight():
+    controller = ConcurrencyController(
+        url="http://in-flight",
+        policy=TierPolicy(initial_concurrency=3, max_concurrency=3),
+    )
+    running, peak = [0], [0]
+
+    async def request() -> None:
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.005)
+        running[0] -= 1
+
+    async def run():
+        await asyncio.gather(*[controller.call(request) for _ in range(12)])
+
+    asyncio.run(run())
+    assert peak[0] == 3 and controller.in_flight == 0
+
+
+def test_only_transient_errors_are_retried_until_exhausted():
+    controller = ConcurrencyController(
+        url="http://retries",
+        policy=TIER_POLICIES["bronze"],
+        retry=RetryPolicy(max_retries=3, base_delay=0.001),
+    )
+    attempts = []
+
+    async def fail(error: Exception) -> None:
+        attempts.append(error)
+        raise error
+
+    with pytest.raises(ValueError):
+        asyncio.run(controller.call(lambda: fail(ValueError("invalid query"))))
+    assert len(attempts) == 1
+
+    attempts.clear()
+    with pytest.raises(ConnectionError):
+        asyncio.run(controller.call(lambda: fail(ConnectionError("reset"))))
+    assert len(attempts) == 4
+
+
+def test_collect_arrow_resumes_from_the_next_block():
+    expected = asyncio.run(
+        make_manager(height=5_000).get_txs(0, 5_000, print_time=False)
+    )
+    client = FlakyClient(
+        height=5_000,
+        logs_per_block=1,
+        page_blocks=1_000,
+        collect_failures=1,
+        recv_failures=(3,),
+    )
+    manager = make_manager(client)
+
+    record = QueryMetrics(method="get_txs", chain="test")
+    with measure_query(record):
+        df = asyncio.run(manager.get_txs(0, 5_000, print_time=False))
+    # derived columns are numbered per page, so only the columns identifying the transactions are compared
+    key = ["block_number", "hash"]
+    assert df.select(key).equals(expected.select(key))
+    # the throttled collect is retried as a stream, which resumes after the last page it received
+    assert client.stream_from_blocks == [0, 2_000]
+    assert record.retries == 2
+
+
+def test_stream_data_reopens_from_the_next_block():
+    client = FlakyClient(
+        height=5_000, logs_per_block=1, page_blocks=1_000, recv_failures=(2, 4, 5)
+    )
+    manager = make_manager(client)
+    query = manager._create_event_query(TRANSFER, 0, 5_000)
+    config = manager._create_event_stream_config(TRANSFER)
+
+    async def stream():
+        return [
+            df["block_number"].to_list()
+            async for df in manager._stream_data(query, config, tx_data=True)
+        ]
+
+    batches = asyncio.run(stream())
+    assert sum(batches, []) == list(range(5_000))
+    assert client.stream_from_blocks == [0, 1_000, 2_000, 2_000]
@@ -0,0 +1,176 @@
+import asyncio
+from dataclasses import dataclass, field, replace
+from typing import List, Optional, Tuple
+
+import hypersync
+import pytest
+
+from hypermanager.events import EventConfig
+from hypermanager.protocols.mev_commit import mev_commit_config
+from hypermanager.protocols.uniswap_v3 import uniswap_config
+from hypermanager.registry import UNKNOWN_TOPICS
+from mock_client import MockHypersyncClient
+from support import APPROVAL, TRANSFER, make_manager
+
+POOL = "0x" + "ab" * 20
+OTHER_POOL = "0x" + "cd" * 20
+UNKNOWN_TOPIC = "0x" + "ef" * 32
+SWAP = uniswap_config["Swap"]
+NEW_L1_BLOCK = mev_commit_config["NewL1Block"]
+
+
+@dataclass
+class WildcardClient(MockHypersyncClient):
+    """
+    A mock client serving the logs of a fixed set of events to the topic-less log selections of contract queries.
+
+    Attributes:
+        emitted (List[Tuple[str, Optional[str]]]): The topic0 and contract of every emitted event. Events without a
+            contract are emitted by the queried contract, or by a contract of their own for wildcard queries.
+        addresses (List[Optional[List[str]]]): The contracts of every query received so far.
+    """
+
+    emitted: List[Tuple[str, Optional[str]]] = field(default_factory=list)
+    addresses: List[Optional[List[str]]] = field(init=False, default_factory=list)
+
+    async def collect_arrow(self, query, config):
+        (selection,) = query.logs
+        assert not selection.topics
+        self.addresses.append(selection.address)
+        logs = [
+            hypersync.LogSelection(
+                address=[contract] if contract else selection.address,
+                topics=[[topic0]],
+            )
+            for topic0, contract in self.emitted
+        ]
+        return await super().collect_arrow(replace(query, logs=logs), config)
+
+
+def make_client(*emitted: Tuple[str, Optional[str]]) -> WildcardClient:
+    return WildcardClient(
+        height=1_000, logs_per_block=2, page_blocks=200, emitted=list(emitted)
+    )
+
+
+@pytest.mark.parametrize("binary_output", [False, True])
+def test_known_topics_are_decoded_and_the_rest_kept_raw(binary_output):
+    client = make_client(
+        (SWAP.get_topic(), None),
+        (UNKNOWN_TOPIC, None),
+        (NEW_L1_BLOCK.get_topic(), None),
+    )
+    manager = make_manager(client, binary_output=binary_output)
+    event_dfs = asyncio.run(
+        manager.execute_contract_query(
+            POOL.upper().replace("0X", "0x"), 0, 500, print_time=False, shards=2
+        )
+    )
+
+    assert client.addresses == [[POOL], [POOL]]
+    assert set(event_dfs) == {"Swap", "NewL1Block", UNKNOWN_TOPICS}
+    assert event_dfs["Swap"].height == event_dfs["NewL1Block"].height == 1_000
+    assert {"sender", "recipient", "amount0", "hash", "timestamp"} <= set(
+        event_dfs["Swap"].columns
+    )
+    assert "winner" in event_dfs["NewL1Block"].columns
+
+    unknown_df = event_dfs[UNKNOWN_TOPICS]
+    assert unknown_df.height == 1_000
+    unknown_topic = bytes.fromhex(UNKNOWN_TOPIC[2:]) if binary_output else UNKNOWN_TOPIC
+    assert unknown_df["topic0"].unique().to_list() == [unknown_topic]
+    assert {"data", "topic1", "transaction_hash", "timestamp"} <= set(
+        unknown_df.columns
+    )
+
+
+def test_events_outside_the_given_configs_are_kept_raw():
+    client = make_client((SWAP.get_topic(), None), (NEW_L1_BLOCK.get_topic(), None))
+    event_dfs = asyncio.run(
+        make_manager(client).execute_contract_query(
+            None, 0, 500, event_configs=[SWAP], tx_data=False, print_time=False
+        )
+    )
+
+    # without a contract, the logs of every contract are queried
+    assert client.addresses == [None]
+    assert set(event_dfs) == {"Swap", UNKNOWN_TOPICS}
+    assert event_dfs["Swap"].height == 1_000
+    assert "timestamp" not in event_dfs["Swap"].columns
+    assert event_dfs[UNKNOWN_TOPICS]["topic0"].unique().to_list() == [
+        NEW_L1_BLOCK.get_topic()
+    ]
+
+
+def test_logs_are_routed_to_the_config_of_their_contract():
+    pool_transfer = EventConfig(
+        name="PoolTransfer",
+        signature=TRANSFER.signature,
+        contract=POOL,
+        column_mapping=TRANSFER.column_mapping,
+    )
+    client = make_client(
+        (TRANSFER.get_topic(), POOL),
+        (TRANSFER.get_topic(), OTHER_POOL),
+        (APPROVAL.get_topic(), POOL),
+    )
+    manager = make_manager(client)
+
+    event_dfs = asyncio.run(
+        manager.execute_contract_query(
+            None,
+            0,
+            100,
+            event_configs=[TRANSFER, pool_transfer, APPROVAL],
+            columns=["hash", "address"],
+            print_time=False,
+        )
+    )
+    assert event_dfs["PoolTransfer"]["address"].unique().to_list() == [POOL]
+    assert event_dfs["Transfer"]["address"].unique().to_list() == [OTHER_POOL]
+    assert event_dfs["Approval"].height == 200
+    assert event_dfs[UNKNOWN_TOPICS].is_empty()
+
+    # without a configuration of any contract, the logs of other contracts are not decoded
+    event_dfs = asyncio.run(
+        manager.execute_contract_query(
+            None,
+            0,
+            100,
+            event_configs=[pool_transfer],
+            columns=["hash", "address"],
+            print_time=False,
+        )
+    )
+    assert set(event_dfs) == {"PoolTransfer", UNKNOWN_TOPICS}
+    assert event_dfs["PoolTransfer"].height == 200
+    unknown_df = event_dfs[UNKNOWN_TOPICS]
+    assert unknown_df.group_by("address").len().sort("address").rows() == [
+        (POOL, 200),
+        (OTHER_POOL, 200),
+    ]
+
+
+def test_unsupported_events_are_queried_for_their_contracts():
+    batch = EventConfig(
+        name="Batch", signature="Batch(address indexed src, uint256[] amounts)"
+    )
+    client = make_client((batch.get_topic(), POOL), (batch.get_topic(), OTHER_POOL))
+    manager = make_manager(client)
+    fetched = []
+
+    async def fetch_event_range(event_config, from_block, to_block, **kwargs):
+        fetched.append((event_config, from_block, to_block, kwargs["contracts"]))
+        return None
+
+    manager.fetch_event_range = fetch_event_range
+    event_dfs = asyncio.run(
+        manager.execute_contract_query(
+            None, 0, 100, event_configs=[batch], print_time=False
+        )
+    )
+
+    # the logs of the event are not kept raw, they are decoded by the client instead
+    assert fetched == [(batch, 0, 100, [POOL, OTHER_POOL])]
+    assert set(event_dfs) == {UNKNOWN_TOPICS}
+    assert event_dfs[UNKNOWN_TOPICS].is_empty()
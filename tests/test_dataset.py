@@ -0,0 +1,131 @@
+import asyncio
+import os
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from hypermanager.dataset import DatasetWriter
+from support import make_manager
+
+
+def blocks_df(from_block: int, to_block: int) -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "block_number": list(range(from_block, to_block)),
+            "value": [float(block) for block in range(from_block, to_block)],
+        }
+    )
+
+
+def relative(dataset: DatasetWriter, paths) -> list:
+    return sorted(os.path.relpath(path, dataset.path) for path in paths)
+
+
+def test_write_partitions_rows_by_chain_event_and_block_bucket(tmp_path):
+    dataset = DatasetWriter(path=str(tmp_path), bucket_size=100)
+    # rows are sorted within their part file
+    paths = dataset.write(blocks_df(50, 250).reverse(), "eth", "Transfer")
+
+    partitions = [os.path.dirname(path) for path in relative(dataset, paths)]
+    assert partitions == [
+        os.path.join("chain=eth", "event=Transfer", f"block_bucket={bucket}")
+        for bucket in (0, 1, 2)
+    ]
+    names = [os.path.basename(path).rsplit("-", 1)[0] for path in sorted(paths)]
+    assert names == ["part-50-99", "part-100-199", "part-200-249"]
+
+    read_df = pl.concat([pl.read_parquet(path) for path in sorted(paths)])
+    assert read_df.equals(blocks_df(50, 250))
+
+    # every write adds part files, and never rewrites the existing ones
+    more_paths = dataset.write(blocks_df(250, 260), "eth", "Transfer")
+    assert len(dataset.files()) == 4 and set(paths) < set(dataset.files())
+    assert len(more_paths) == 1
+
+
+def test_write_requires_the_block_column(tmp_path):
+    dataset = DatasetWriter(path=str(tmp_path))
+    with pytest.raises(ValueError):
+        dataset.write(pl.DataFrame({"value": [1.0]}), "eth", "Transfer")
+    assert dataset.write(blocks_df(0, 0), "eth", "Transfer") == []
+
+
+def test_files_are_pruned_by_partition_and_block_range(tmp_path):
+    dataset = DatasetWriter(path=str(tmp_path), bucket_size=100)
+    for from_block, to_block in [(0, 50), (50, 100), (100, 180), (180, 300)]:
+        dataset.write(blocks_df(from_block, to_block), "eth", "Transfer")
+    dataset.write(blocks_df(0, 300), "eth", "Approval")
+    dataset.write(blocks_df(0, 300), "base", "Transfer")
+
+    def ranges(**kwargs) -> list:
+        return [
+            tuple(int(block) for block in os.path.basename(path).split("-")[1:3])
+            for path in dataset.files(**kwargs)
+        ]
+
+    assert len(dataset.files()) == 5 + 3 + 3
+    assert ranges(chain="eth", event="Transfer", from_block=60, to_block=181) == [
+        (50, 99),
+        (100, 179),
+        (180, 199),
+    ]
+    assert ranges(chain="eth", event="Transfer", from_block=99, to_block=100) == [
+        (50, 99)
+    ]
+    assert ranges(chain="eth", event="Transfer", to_block=50) == [(0, 49)]
+    assert ranges(chain="eth", event="Transfer", from_block=300) == []
+    assert ranges(event="Approval", from_block=250) == [(200, 299)]
+
+    scanned_df = dataset.scan(
+        chain="eth", event="Transfer", from_block=60, to_block=181
+    )
+    scanned_df = scanned_df.collect()
+    assert scanned_df["block_number"].to_list() == list(range(60, 181))
+    assert set(scanned_df["chain"]) == {"eth"}
+    assert set(scanned_df["event"]) == {"Transfer"}
+    assert dataset.scan(chain="op") is None
+
+
+def test_failed_writes_leave_no_part_files(tmp_path, monkeypatch):
+    dataset = DatasetWriter(path=str(tmp_path), bucket_size=100)
+    dataset.write(blocks_df(0, 50), "eth", "Transfer")
+
+    write_file = dataset._write_file
+
+    def fail(df, file_path):
+        # write a partial file, then fail before it is renamed into place
+        write_file(df.head(1), file_path)
+        raise OSError("disk full")
+
+    monkeypatch.setattr(dataset, "_write_file", fail)
+    with pytest.raises(OSError):
+        dataset.write(blocks_df(50, 100), "eth", "Transfer")
+
+    # the partial file keeps its temporary name, which is never listed or scanned
+    bucket_path = dataset.partition_path("eth", "Transfer", 0)
+    assert any(name.endswith(".tmp") for name in os.listdir(bucket_path))
+    assert len(dataset.files()) == 1
+    assert dataset.scan().collect().height == 50
+
+
+def test_binary_hashes_are_stored_as_fixed_size_binary(tmp_path):
+    dataset = DatasetWriter(path=str(tmp_path))
+    df = pl.DataFrame({"block_number": [1, 2], "hash": [bytes(32), bytes([1] * 32)]})
+    (path,) = dataset.write(df, "eth", "transactions")
+    assert pq.read_schema(path).field("hash").type == pa.binary(32)
+    assert pl.read_parquet(path)["hash"].to_list() == df["hash"].to_list()
+
+
+def test_saved_blocks_are_partitioned_without_a_requested_number(tmp_path):
+    manager = make_manager(dataset=DatasetWriter(path=str(tmp_path), bucket_size=100))
+    blocks = asyncio.run(
+        manager.get_blocks(
+            50, 150, save_data=True, columns=["timestamp"], print_time=False, shards=2
+        )
+    )
+    assert blocks.columns == ["timestamp"] and blocks.height == 100
+    saved_df = manager.dataset.scan(event="blocks", block_column="number").collect()
+    assert saved_df.sort("number")["number"].to_list() == list(range(50, 150))
+    assert saved_df["timestamp"].sort().equals(blocks["timestamp"].sort())
@@ -0,0 +1,161 @@
+import asyncio
+
+import polars as pl
+import pytest
+from hypersync import DataType
+
+from hypermanager.decoder import can_decode, decode_logs
+from hypermanager.protocols.across import across_config
+from hypermanager.registry import UNKNOWN_TOPICS, EventRegistry
+from support import TRANSFER, make_manager
+
+SIGNATURE = (
+    "Trade(address indexed trader, int32 indexed tick, uint256 amount, uint64 nonce, int64 delta, "
+    "int256 price, uint256 total, bool buy, bytes32 id, string memo, bytes payload)"
+)
+MAPPING = {
+    "tick": DataType.INT32,
+    "nonce": DataType.UINT64,
+    "delta": DataType.INT64,
+    "price": DataType.FLOAT64,
+    "total": DataType.INTSTR,
+}
+TRADER = "0x" + "ab" * 20
+ID = "0x" + "cd" * 32
+
+
+def word(value: int) -> str:
+    return f"{value % 2**256:064x}"
+
+
+def tail(content: bytes) -> str:
+    padded = content.hex().ljust((len(content) + 31) // 32 * 64, "0")
+    return word(len(content)) + padded
+
+
+def trade_logs(nonce: int = 2**64 - 1) -> pl.DataFrame:
+    memo, payload = "héllo".encode(), bytes(range(40))
+    head = [
+        word(10**30),
+        word(nonce),
+        word(-(2**63)),
+        word(-5),
+        word(2**255 + 7),
+        word(1),
+        ID[2:],
+        word(32 * 9),
+        word(32 * 9 + len(tail(memo)) // 2),
+    ]
+    return pl.DataFrame(
+        {
+            "topic1": ["0x" + word(int(TRADER, 16))],
+            "topic2": ["0x" + word(-7)],
+            "topic3": [None],
+            "data": ["0x" + "".join(head) + tail(memo) + tail(payload)],
+        },
+        schema={name: pl.String for name in ["topic1", "topic2", "topic3", "data"]},
+    )
+
+
+def test_decode_logs_matches_the_client_output():
+    decoded = decode_logs(trade_logs(), SIGNATURE, MAPPING)
+    assert decoded.schema == {
+        "trader": pl.String,
+        "tick": pl.Int32,
+        "amount": pl.String,
+        "nonce": pl.UInt64,
+        "delta": pl.Int64,
+        "price": pl.Float64,
+        "total": pl.String,
+        "buy": pl.Boolean,
+        "id": pl.String,
+        "memo": pl.String,
+        "payload": pl.String,
+    }
+    assert decoded.row(0) == (
+        TRADER,
+        -7,
+        "0x" + word(10**30),
+        2**64 - 1,
+        -(2**63),
+        -5.0,
+        str(2**255 + 7),
+        True,
+        ID,
+        "héllo",
+        "0x" + bytes(range(40)).hex(),
+    )
+
+
+def test_decode_binary_logs():
+    binary_logs = trade_logs().with_columns(
+        pl.col(name).str.slice(2).str.decode("hex")
+        for name in ["topic1", "topic2", "data"]
+    )
+    decoded = decode_logs(binary_logs, SIGNATURE, MAPPING)
+    assert decoded["trader"].to_list() == [bytes.fromhex(TRADER[2:])]
+    assert decoded["payload"].to_list() == [bytes(range(40))]
+    assert decoded.drop("trader", "amount", "id", "payload").equals(
+        decode_logs(trade_logs(), SIGNATURE, MAPPING).drop(
+            "trader", "amount", "id", "payload"
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "mapping",
+    [
+        {"nonce": DataType.INT64},
+        {"nonce": DataType.UINT32},
+        {"amount": DataType.UINT64},
+        {"delta": DataType.UINT64},
+        {"delta": DataType.INT32},
+    ],
+)
+def test_values_that_do_not_fit_raise(mapping):
+    with pytest.raises(ValueError, match="do not fit"):
+        decode_logs(trade_logs(), SIGNATURE, mapping)
+
+
+def test_can_decode():
+    assert can_decode(SIGNATURE, MAPPING)
+    assert not can_decode(SIGNATURE, {"amount": DataType.DECIMAL256})
+    assert not can_decode(across_config["FilledV3Relay"].signature)
+    assert not can_decode("Batch(uint256[] ids)")
+    assert can_decode("Batch(uint256[] indexed ids)")
+
+
+def test_events_query_returns_unsupported_events_like_the_event_query():
+    manager = make_manager(height=20_000_100, logs_per_block=2)
+    fill = across_config["FilledV3Relay"]
+    event_dfs = asyncio.run(
+        manager.execute_events_query(
+            [TRANSFER, fill], 20_000_000, 20_000_010, print_time=False
+        )
+    )
+    fill_df = asyncio.run(
+        manager.execute_event_query(fill, 20_000_000, 20_000_010, print_time=False)
+    )
+    assert list(event_dfs) == ["Transfer", "FilledV3Relay"]
+    assert event_dfs["FilledV3Relay"].equals(fill_df)
+    assert event_dfs["Transfer"].height == 20
+
+
+@pytest.mark.parametrize("binary_output", [False, True])
+def test_contract_query_routes_unsupported_events_to_the_client(binary_output):
+    manager = make_manager(binary_output=binary_output)
+    fill = across_config["FilledV3Relay"]
+    registry = EventRegistry()
+    registry.register(fill)
+    contract = "0x" + "12" * 20
+    logs_df = pl.DataFrame(
+        {
+            "topic0": [manager._encode_hex(fill.get_topic())] * 2,
+            "address": [manager._encode_hex(contract)] * 2,
+        }
+    )
+    event_dfs, client_decoded = manager._route_raw_logs(
+        logs_df, registry, tx_data=False
+    )
+    assert event_dfs[UNKNOWN_TOPICS].is_empty()
+    assert client_decoded == [(fill, [contract])]
@@ -0,0 +1,143 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import List
+
+import hypersync
+import pytest
+
+from hypermanager.schema import EVENT_LOG_FIELDS
+from mock_client import MockHypersyncClient
+from support import ERC20_TRANSFER, TRANSFER, make_manager
+
+
+@dataclass
+class RecordingClient(MockHypersyncClient):
+    """
+    A mock client recording the queries it receives.
+
+    Attributes:
+        queries (List[hypersync.Query]): The queries received so far.
+    """
+
+    queries: List[hypersync.Query] = field(init=False, default_factory=list)
+
+    async def collect_arrow(self, query, config):
+        self.queries.append(query)
+        return await super().collect_arrow(query, config)
+
+
+def test_columns_are_split_into_transaction_and_block_fields():
+    selection = make_manager()._create_field_selection(
+        ["hash", "to", "timestamp", "gas_used", "gas_used_block"]
+    )
+    assert selection.transaction == [
+        "block_number",
+        "gas_used",
+        "hash",
+        "to",
+        "transaction_index",
+    ]
+    assert selection.block == ["gas_used", "number", "timestamp"]
+    assert selection.log == []
+
+
+def test_join_keys_are_only_added_to_requested_tables():
+    manager = make_manager()
+    selection = manager._create_field_selection(["timestamp"])
+    assert selection.transaction == [] and selection.block == ["number", "timestamp"]
+
+    selection = manager._create_field_selection(["hash"])
+    assert selection.transaction == ["block_number", "hash", "transaction_index"]
+    assert selection.block == []
+
+    selection = manager._create_field_selection([], log_fields=EVENT_LOG_FIELDS)
+    assert selection.transaction == [] and selection.block == []
+    assert selection.log == [f.value for f in EVENT_LOG_FIELDS]
+
+
+def test_mapped_fields_are_only_added_to_requested_tables():
+    manager = make_manager()
+    column_mapping = hypersync.ColumnMapping(
+        transaction={hypersync.TransactionField.VALUE: hypersync.DataType.FLOAT64},
+        block={hypersync.BlockField.GAS_LIMIT: hypersync.DataType.FLOAT64},
+    )
+    selection = manager._create_field_selection(["hash"], column_mapping=column_mapping)
+    assert "value" in selection.transaction and selection.block == []
+
+    selection = manager._create_field_selection(
+        ["hash", "timestamp"], column_mapping=column_mapping
+    )
+    assert "value" in selection.transaction and "gas_limit" in selection.block
+
+
+def test_unknown_columns_are_rejected():
+    with pytest.raises(ValueError, match="Unknown transaction or block column"):
+        make_manager()._create_field_selection(["hash", "not_a_field"])
+
+
+def test_event_query_only_requests_the_requested_columns():
+    client = RecordingClient(height=1_000, logs_per_block=1)
+    manager = make_manager(client)
+    df = asyncio.run(
+        manager.execute_event_query(
+            TRANSFER,
+            0,
+            100,
+            columns=["hash", "block_number", "address", "timestamp"],
+            print_time=False,
+        )
+    )
+    assert df.columns == [
+        "src",
+        "dst",
+        "wad",
+        "hash",
+        "block_number",
+        "address",
+        "timestamp",
+    ]
+    assert df.height == 100
+
+    (query,) = client.queries
+    # the hash, block number and address are held by the logs
+    assert query.field_selection.transaction == []
+    assert query.field_selection.block == ["number", "timestamp"]
+    assert query.field_selection.log == [f.value for f in EVENT_LOG_FIELDS]
+
+
+def test_event_query_without_tx_data_requests_no_transactions_or_blocks():
+    client = RecordingClient(height=1_000, logs_per_block=1)
+    df = asyncio.run(
+        make_manager(client).execute_event_query(
+            ERC20_TRANSFER, 0, 100, tx_data=False, print_time=False
+        )
+    )
+    assert {"from", "to", "value"} <= set(df.columns)
+    assert "timestamp" not in df.columns
+
+    (query,) = client.queries
+    assert query.field_selection.transaction == []
+    assert query.field_selection.block == []
+
+
+def test_txs_query_returns_the_requested_columns():
+    client = RecordingClient(height=1_000, logs_per_block=2)
+    manager = make_manager(client)
+    df = asyncio.run(
+        manager.get_txs(
+            0, 100, columns=["hash", "timestamp", "gas_used_block"], print_time=False
+        )
+    )
+    assert df.columns == ["hash", "timestamp", "gas_used_block"]
+    assert df.height == 200
+
+    (query,) = client.queries
+    # the fields typed by the column mapping of the transactions are requested along with the columns
+    mapping = manager._create_txs_stream_config().column_mapping
+    assert query.field_selection.transaction == sorted(
+        {"block_number", "hash", "transaction_index"}
+        | {f.value for f in mapping.transaction}
+    )
+    assert query.field_selection.block == sorted(
+        {"gas_used", "number", "timestamp"} | {f.value for f in mapping.block or {}}
+    )
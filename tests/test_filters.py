@@ -0,0 +1,143 @@
+import asyncio
+from enum import Enum
+
+import pytest
+
+from hypermanager.cache import EventCache
+from hypermanager.errors import NoDataError
+from hypermanager.filters import (
+    batch_selections,
+    build_log_selections,
+    normalize_address,
+    normalize_addresses,
+    normalize_topic_value,
+    normalize_topic_values,
+)
+from support import TRANSFER, make_manager
+
+TOPIC0 = TRANSFER.get_topic()
+
+
+class Tokens(Enum):
+    WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+
+
+def addresses(count: int) -> list:
+    return [f"0x{i:040x}" for i in range(1, count + 1)]
+
+
+def test_normalize_address():
+    assert normalize_address(Tokens.WETH) == Tokens.WETH.value.lower()
+    assert normalize_address(bytes(range(20))) == "0x" + bytes(range(20)).hex()
+    invalid_addresses = ["0x1234", "ab" * 21, "0x" + "zz" * 20, 1]
+    for invalid in invalid_addresses:
+        with pytest.raises(ValueError, match="Invalid address"):
+            normalize_address(invalid)
+
+
+def test_normalize_topic_value():
+    address = "0x" + "AB" * 20
+    assert normalize_topic_value(address) == "0x" + "00" * 12 + "ab" * 20
+    assert normalize_topic_value(5) == "0x" + "00" * 31 + "05"
+    assert normalize_topic_value(bytes(32)) == "0x" + "00" * 32
+    for invalid in [-1, 2**256, "0x1234", "0x" + "zz" * 32]:
+        with pytest.raises(ValueError, match="Invalid topic value"):
+            normalize_topic_value(invalid)
+
+
+def test_normalize_sets_deduplicate_in_first_seen_order():
+    weth = Tokens.WETH.value
+    other = "0x" + "11" * 20
+    assert normalize_addresses([weth, weth.lower(), Tokens.WETH, other]) == [
+        weth.lower(),
+        other,
+    ]
+    assert normalize_addresses(weth) == [weth.lower()]
+    assert normalize_topic_values([1, "0x" + "00" * 31 + "01", 2]) == [
+        "0x" + "00" * 31 + "01",
+        "0x" + "00" * 31 + "02",
+    ]
+
+
+def test_build_log_selections_chunks_sets():
+    (selection,) = build_log_selections(TOPIC0)
+    assert selection.address is None and selection.topics == [[TOPIC0]]
+
+    selections = build_log_selections(TOPIC0, addresses(2_500))
+    assert [len(selection.address) for selection in selections] == [1_000, 1_000, 500]
+    assert sum((selection.address for selection in selections), []) == addresses(2_500)
+
+    # every combination of a contract chunk and a topic chunk gets its own selection
+    topics = normalize_topic_values(addresses(1_001))
+    selections = build_log_selections(TOPIC0, addresses(1_500), {2: topics})
+    assert len(selections) == 4
+    assert all(selection.topics[1] == [] for selection in selections)
+    topic_counts = sorted(len(selection.topics[2]) for selection in selections)
+    assert topic_counts == [1, 1, 1_000, 1_000]
+
+    assert build_log_selections(TOPIC0, []) == []
+    assert build_log_selections(TOPIC0, None, {1: []}) == []
+
+
+def test_batch_selections():
+    selections = build_log_selections(TOPIC0, addresses(70_000))
+    assert [len(batch) for batch in batch_selections(selections)] == [32, 32, 6]
+    assert batch_selections([]) == []
+
+
+def test_batched_queries_return_every_log_once():
+    manager = make_manager()
+    contracts = addresses(33_000)
+    # duplicates in any case are only queried once
+    duplicates = ["0x" + contract[2:].upper() for contract in contracts[:10]]
+    df = asyncio.run(
+        manager.execute_event_query(
+            TRANSFER,
+            100,
+            110,
+            contracts=contracts + duplicates,
+            columns=["block_number", "log_index", "address"],
+            print_time=False,
+        )
+    )
+    # 33 selections over two queries, every selection matches one log per block
+    assert df.height == 33 * 10
+    assert df.select("block_number", "log_index").is_duplicated().sum() == 0
+    assert df["block_number"].is_sorted()
+    assert set(df["address"]) <= set(contracts)
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [{"address": []}, {"contracts": []}, {"topic_filters": {2: []}}],
+)
+def test_empty_sets_match_no_logs(filters):
+    manager = make_manager()
+    with pytest.raises(NoDataError):
+        asyncio.run(
+            manager.execute_event_query(
+                TRANSFER, 100, 110, print_time=False, **filters
+            )
+        )
+
+
+def test_empty_address_set_matches_no_logs_of_any_event():
+    manager = make_manager()
+    with pytest.raises(NoDataError):
+        asyncio.run(
+            manager.execute_events_query(
+                [TRANSFER], 100, 110, address=[], print_time=False
+            )
+        )
+
+
+def test_empty_address_set_is_not_cached_as_no_filter(tmp_path):
+    manager = make_manager(cache=EventCache(str(tmp_path)))
+    with pytest.raises(NoDataError):
+        asyncio.run(
+            manager.execute_event_query(
+                TRANSFER, 100, 110, address=[], print_time=False
+            )
+        )
+    df = asyncio.run(manager.execute_event_query(TRANSFER, 100, 110, print_time=False))
+    assert df.height == 10
@@ -0,0 +1,70 @@
+import asyncio
+
+from hypermanager.cache import EventCache
+from hypermanager.manager import HyperManager
+from hypermanager.sync import SyncJob
+from mock_client import MockHypersyncClient
+from support import TRANSFER, make_manager
+
+
+class FlakyHeightClient(MockHypersyncClient):
+    """
+    A mock client whose height requests fail a number of times before succeeding.
+    """
+
+    failures: int = 0
+
+    async def get_height(self) -> int:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("connection reset")
+        return await super().get_height()
+
+
+async def follow(manager: HyperManager, batches: int, **kwargs):
+    blocks = []
+    async for df in manager.follow_event_query(
+        TRANSFER, poll_interval=0.001, **kwargs
+    ):
+        blocks.append(df["block_number"].unique(maintain_order=True).to_list())
+        if len(blocks) == batches:
+            return blocks
+        manager.client.height += 2
+
+
+def test_follow_yields_blocks_below_height():
+    manager = make_manager()
+    blocks = asyncio.run(follow(manager, 2, from_block=995))
+    assert blocks == [[995, 996, 997, 998, 999], [1_000, 1_001]]
+
+
+def test_follow_holds_back_unconfirmed_blocks():
+    manager = make_manager()
+    blocks = asyncio.run(follow(manager, 2, from_block=995, confirmations=2))
+    assert blocks == [[995, 996, 997], [998, 999]]
+
+
+def test_follow_retries_failed_height_requests():
+    client = FlakyHeightClient(height=1_000, logs_per_block=1)
+    client.failures = 3
+    manager = make_manager(client)
+    blocks = asyncio.run(follow(manager, 1, from_block=998))
+    assert blocks == [[998, 999]]
+    assert client.failures == 0
+
+
+def test_follow_sync_and_cache_hold_back_the_same_blocks(tmp_path):
+    manager = make_manager()
+    followed = asyncio.run(follow(manager, 1, from_block=900, confirmations=5))
+    job = SyncJob(
+        manager=manager,
+        event_config=TRANSFER,
+        path=str(tmp_path),
+        start_block=900,
+        confirmations=5,
+    )
+    synced = asyncio.run(job.run())
+    cache = EventCache(str(tmp_path), confirmations=5)
+
+    assert followed[0][-1] == synced["block_number"].max() == 994
+    assert job.get_checkpoint() == cache.cacheable_to_block(2_000, 1_000) == 995
@@ -0,0 +1,123 @@
+import asyncio
+
+from hypermanager.height import HeightCache
+from support import make_manager
+
+
+class CountingClient:
+    """
+    A client that counts its height requests, each taking `delay` seconds.
+    """
+
+    def __init__(self, height: int = 1_000, delay: float = 0.0):
+        self.height = height
+        self.delay = delay
+        self.requests = 0
+
+    async def get_height(self) -> int:
+        self.requests += 1
+        await asyncio.sleep(self.delay)
+        return self.height
+
+
+def test_height_is_fetched_on_every_get_by_default():
+    cache, client = HeightCache("http://height-default"), CountingClient()
+
+    async def run():
+        assert await cache.get(client) == 1_000
+        client.height = 1_001
+        assert await cache.get(client) == 1_001
+
+    asyncio.run(run())
+    assert client.requests == 2
+
+
+def test_ttl_serves_the_cached_height_until_it_expires(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("hypermanager.height.time.monotonic", lambda: now[0])
+    cache, client = HeightCache("http://height-ttl"), CountingClient()
+
+    async def run():
+        assert await cache.get(client, ttl=2.0) == 1_000
+        client.height = 1_005
+        now[0] += 2.0
+        assert await cache.get(client, ttl=2.0) == 1_000
+        assert await cache.get(client, ttl=2.0, force_refresh=True) == 1_005
+        client.height = 1_010
+        now[0] += 2.5
+        assert await cache.get(client, ttl=2.0) == 1_010
+
+    asyncio.run(run())
+    assert client.requests == 3
+
+
+def test_height_never_moves_backwards():
+    cache, client = HeightCache("http://height-backwards"), CountingClient()
+
+    async def run():
+        await cache.get(client)
+        client.height = 990
+        return await cache.get(client)
+
+    assert asyncio.run(run()) == 1_000
+
+
+def test_concurrent_gets_share_a_single_request():
+    cache, client = HeightCache("http://height-pending"), CountingClient(delay=0.01)
+
+    async def run():
+        return await asyncio.gather(*[cache.get(client) for _ in range(20)])
+
+    assert asyncio.run(run()) == [1_000] * 20
+    assert client.requests == 1
+
+
+def test_manager_fetches_the_height_unless_it_opts_in_to_a_ttl():
+    client = CountingClient()
+    manager = make_manager(client)
+
+    async def run():
+        await manager._get_height()
+        await manager._get_height()
+
+    asyncio.run(run())
+    assert client.requests == 2
+
+    manager = make_manager(CountingClient(), height_ttl=60.0)
+    asyncio.run(run())
+    assert manager.client.requests == 1
+
+
+def test_requests_and_refreshers_belong_to_their_event_loop():
+    cache, client = HeightCache("http://height-loops"), CountingClient()
+    other_loop = asyncio.new_event_loop()
+
+    async def start():
+        cache.start_refresher(client, interval=60.0)
+        # a request of this loop that never completes, since the loop stops running
+        cache._pending = asyncio.ensure_future(asyncio.Event().wait())
+
+    try:
+        other_loop.run_until_complete(start())
+        other_refresher = cache._refresher
+
+        async def run():
+            height = await asyncio.wait_for(cache.get(client), timeout=1.0)
+            cache.start_refresher(client, interval=60.0)
+            refresher = cache._refresher
+            assert refresher.get_loop() is asyncio.get_running_loop()
+            await cache.stop_refresher()
+            return height, refresher
+
+        height, refresher = asyncio.run(run())
+        assert height == 1_000
+        assert refresher.cancelled()
+
+        # the refresher of the other loop is cancelled once that loop runs again
+        other_loop.run_until_complete(asyncio.sleep(0))
+        assert other_refresher.cancelled()
+    finally:
+        for task in asyncio.all_tasks(other_loop):
+            task.cancel()
+        other_loop.run_until_complete(asyncio.sleep(0))
+        other_loop.close()
@@ -0,0 +1,148 @@
+import asyncio
+
+import polars as pl
+import pytest
+
+from hypermanager.errors import NoDataError
+from hypermanager.helpers import address_to_topic
+from support import ERC20_TRANSFER, TRANSFER, make_manager
+
+SENDER = "0x" + "AB" * 20
+RECEIVER = "0x" + "cd" * 20
+
+
+def test_plan_pushes_down_block_ranges():
+    manager = make_manager()
+    plan = (
+        manager.lazy_event_query(TRANSFER)
+        .filter(pl.col("block_number") >= 100, pl.col("block_number") < 200)
+        .filter(pl.col("block_number").is_between(150, 300))
+        .plan()
+    )
+    assert (plan.from_block, plan.to_block) == (150, 200)
+    assert plan.local_predicates == []
+
+    plan = manager.lazy_event_query(TRANSFER).filter(pl.col("block_number") == 7).plan()
+    assert (plan.from_block, plan.to_block) == (7, 8)
+    plan = (
+        manager.lazy_event_query(TRANSFER).filter(210 < pl.col("block_number")).plan()
+    )
+    assert (plan.from_block, plan.to_block) == (211, None)
+
+
+def test_plan_pushes_down_equality_on_indexed_parameters():
+    manager = make_manager()
+    plan = (
+        manager.lazy_event_query(TRANSFER)
+        .filter((pl.col("src") == SENDER) & pl.col("dst").is_in([RECEIVER, SENDER]))
+        .plan()
+    )
+    assert plan.topic_filters == {
+        1: [address_to_topic(SENDER.lower())],
+        2: [address_to_topic(RECEIVER), address_to_topic(SENDER.lower())],
+    }
+    assert plan.local_predicates == []
+
+    # contradicting equality filters can not match any log
+    plan = (
+        manager.lazy_event_query(TRANSFER)
+        .filter(pl.col("src") == SENDER, pl.col("src") == RECEIVER)
+        .plan()
+    )
+    assert plan.topic_filters == {1: []} and plan.is_empty
+
+
+def test_plan_pushes_down_transaction_filters():
+    manager = make_manager()
+    plan = (
+        manager.lazy_txs()
+        .filter(pl.col("from") == SENDER, pl.col("to").is_in([RECEIVER]))
+        .plan()
+    )
+    assert plan.transaction_filters == {"from_": [SENDER.lower()], "to": [RECEIVER]}
+
+    # events are not filtered by their transactions on the server
+    plan = manager.lazy_event_query(TRANSFER).filter(pl.col("from") == SENDER).plan()
+    assert plan.transaction_filters == {} and len(plan.local_predicates) == 1
+
+
+def test_plan_keeps_unsupported_predicates_local():
+    manager = make_manager()
+    predicates = [
+        pl.col("wad") > 5,
+        pl.col("src") != SENDER,
+        (pl.col("src") == SENDER) | (pl.col("dst") == SENDER),
+        pl.col("block_number") > 1.5,
+    ]
+    plan = manager.lazy_event_query(TRANSFER).filter(*predicates).plan()
+    assert plan.topic_filters == {} and plan.from_block is None
+    assert len(plan.local_predicates) == len(predicates)
+
+
+def test_plan_projection_requests_only_transaction_and_block_columns():
+    manager = make_manager()
+    plan = (
+        manager.lazy_event_query(TRANSFER)
+        .filter(pl.col("gas_used") > 0)
+        .select("src", "wad", "hash", "timestamp")
+        .plan()
+    )
+    assert plan.columns == ["hash", "timestamp", "gas_used"]
+
+    plan = manager.lazy_event_query(TRANSFER).select("src", "wad").plan()
+    assert plan.columns == []
+
+    # transaction columns sharing a name with a parameter are requested by their field name
+    plan = (
+        manager.lazy_event_query(ERC20_TRANSFER)
+        .select("from", "from_right", "to_right")
+        .plan()
+    )
+    assert plan.columns == ["from", "to"]
+
+
+def test_collect_selects_suffixed_transaction_columns():
+    manager = make_manager()
+    df = asyncio.run(
+        manager.lazy_event_query(ERC20_TRANSFER, 100, 110)
+        .select("block_number", "from", "from_right")
+        .collect()
+    )
+    assert df.columns == ["block_number", "from", "from_right"]
+    assert df.height == 10
+    assert (df["from"] != df["from_right"]).all()
+
+
+def test_collect_applies_local_predicates_like_an_eager_query():
+    manager = make_manager()
+    lazy_df = asyncio.run(
+        manager.lazy_event_query(TRANSFER, 100, 200)
+        .filter(pl.col("block_number") >= 150, pl.col("wad") % 2 == 0)
+        .select("block_number", "wad", "gas_used")
+        .collect()
+    )
+    eager_df = asyncio.run(
+        manager.execute_event_query(TRANSFER, 150, 200, print_time=False)
+    )
+    expected = eager_df.filter(pl.col("wad") % 2 == 0).select(
+        "block_number", "wad", "gas_used"
+    )
+    assert lazy_df.equals(expected)
+
+
+def test_collect_skips_contradicting_filters():
+    manager = make_manager()
+    query = manager.lazy_event_query(TRANSFER, 100, 200).filter(
+        pl.col("block_number") >= 300
+    )
+    with pytest.raises(NoDataError):
+        asyncio.run(query.collect())
+
+
+def test_txs_query_only_selects_blocks_for_block_columns():
+    manager = make_manager()
+    assert manager._create_txs_query(0, 10, ["hash", "from"]).blocks == []
+    assert len(manager._create_txs_query(0, 10, ["hash", "timestamp"]).blocks) == 1
+
+    df = asyncio.run(manager.lazy_txs(100, 110).select("hash", "from").collect())
+    assert df.columns == ["hash", "from"] and df.height == 10
@@ -0,0 +1,196 @@
+import asyncio
+import os
+from dataclasses import dataclass, field, replace
+from typing import Dict
+
+import polars as pl
+import pytest
+
+from hypermanager.clients import ClientRegistry
+from hypermanager.matching import AcrossMatcher
+from hypermanager.networks import HyperSyncClients
+from hypermanager.protocols.across import across_config, client_config
+from mock_client import BLOCK_TIME, GENESIS_TIMESTAMP, MockHypersyncClient
+from support import make_manager
+
+ORIGIN = HyperSyncClients.ETHEREUM_MAINNET
+DESTINATION = HyperSyncClients.BASE
+# the number of blocks between a deposit and its fill
+LAG = 5
+
+
+@dataclass
+class SpokePoolClient(MockHypersyncClient):
+    """
+    A mock client of a spoke pool that emits a single Across event, one log per block, with the decoded parameters
+    given by `values`.
+
+    Attributes:
+        event (str): The name of the emitted event. Defaults to "V3FundsDeposited".
+        values (Dict[str, pl.Expr]): The decoded parameters of every log, derived from its block number.
+    """
+
+    event: str = "V3FundsDeposited"
+    values: Dict[str, pl.Expr] = field(default_factory=dict)
+
+    def _logs(self, query, config, from_block, to_block):
+        topic0 = across_config[self.event].get_topic()
+        logs = [
+            selection
+            for selection in query.logs
+            if selection.topics and selection.topics[0] == [topic0]
+        ]
+        return super()._logs(replace(query, logs=logs), config, from_block, to_block)
+
+    def _column(self, name, mapping, hex_output):
+        if name in self.values:
+            return self.values[name]
+        return super()._column(name, mapping, hex_output)
+
+
+def make_matcher(tmp_path, height: int = 200, deadline: int = 3_600, **kwargs):
+    """
+    Create a matcher of deposits on `ORIGIN`, with a deposit id of their block number plus `LAG`, and their fills on
+    `DESTINATION`, with a deposit id of their block number, so the deposit of every block is filled `LAG` blocks later.
+    """
+    timestamp = pl.col("block_number") * BLOCK_TIME + GENESIS_TIMESTAMP
+    deposits = SpokePoolClient(
+        height=height,
+        logs_per_block=1,
+        page_blocks=20,
+        values={
+            "depositId": pl.col("block_number") + LAG,
+            "destinationChainId": pl.lit(DESTINATION.network_id, dtype=pl.UInt64),
+            "fillDeadline": timestamp + deadline,
+        },
+    )
+    fills = SpokePoolClient(
+        height=height,
+        logs_per_block=1,
+        page_blocks=20,
+        event="FilledV3Relay",
+        values={
+            "depositId": pl.col("block_number"),
+            "originChainId": pl.lit(ORIGIN.network_id, dtype=pl.UInt64),
+        },
+    )
+    registry = ClientRegistry()
+    registry.managers[ORIGIN.client] = make_manager(deposits)
+    registry.managers[DESTINATION.client] = make_manager(fills)
+    return AcrossMatcher(
+        str(tmp_path),
+        clients={chain: client_config[chain] for chain in (ORIGIN, DESTINATION)},
+        registry=registry,
+        **kwargs,
+    )
+
+
+def set_height(matcher: AcrossMatcher, height: int) -> None:
+    for manager in matcher.chains.managers.values():
+        manager.client.height = height
+
+
+def test_deposits_are_matched_with_their_fills(tmp_path):
+    matcher = make_matcher(tmp_path)
+    pairs_df = asyncio.run(matcher.run())
+
+    assert sorted(pairs_df["depositId"]) == list(range(LAG, 200))
+    assert set(pairs_df["origin_chain_id"]) == {ORIGIN.network_id}
+    assert set(pairs_df["fill_chain_id"]) == {DESTINATION.network_id}
+    assert set(pairs_df["fill_latency"]) == {LAG * BLOCK_TIME}
+    assert (
+        pairs_df["fill_block_number"] - pairs_df["deposit_block_number"] == LAG
+    ).all()
+
+    # the last deposits are not filled yet, and the first fills belong to deposits before the start block
+    assert sorted(matcher.open_deposits["depositId"]) == list(range(200, 200 + LAG))
+    assert sorted(matcher.open_fills["depositId"]) == list(range(LAG))
+    assert matcher.expired == 0
+    assert set(matcher.checkpoints.values()) == {200}
+
+
+def test_expired_deposits_and_fills_are_dropped(tmp_path):
+    # deposits expire a block after they are made, before the blocks of their fills
+    matcher = make_matcher(tmp_path, deadline=BLOCK_TIME, expiry_grace=0)
+    pairs_df = asyncio.run(matcher.run())
+
+    assert matcher.expired > 0
+    assert pairs_df.height + matcher.expired + matcher.open_deposits.height == 200
+    # expiry is checked once per batch of 20 blocks, so only fills of the same batch as the deadline still match
+    assert (
+        pairs_df["fill_timestamp"].cast(pl.Int64)
+        - pairs_df["fillDeadline"].cast(pl.Int64)
+        < 20 * BLOCK_TIME
+    ).all()
+
+    # nothing older than the last batches, which start at block 180, is kept open
+    watermark = GENESIS_TIMESTAMP + 180 * BLOCK_TIME
+    assert matcher.open_deposits["fillDeadline"].min() >= watermark
+    assert matcher.open_fills["fill_timestamp"].min() >= watermark
+
+
+def test_state_persists_across_runs(tmp_path):
+    expected_df = asyncio.run(make_matcher(tmp_path / "single").run())
+
+    matcher = make_matcher(tmp_path / "runs", save_interval=3)
+    set_height(matcher, 100)
+    first_df = asyncio.run(matcher.run())
+
+    # every save writes a new generation of the indexes and removes the previous one
+    assert sorted(os.listdir(matcher.path)) == [
+        f"open_deposits-{matcher._generation}.parquet",
+        f"open_fills-{matcher._generation}.parquet",
+        "state.json",
+    ]
+    assert matcher._generation > 1
+
+    resumed = make_matcher(tmp_path / "runs")
+    assert resumed._generation == matcher._generation
+    assert resumed.checkpoints == matcher.checkpoints
+    assert resumed.open_deposits.equals(matcher.open_deposits)
+    assert resumed.open_fills.equals(matcher.open_fills)
+
+    # the deposits left open by the first run are matched by the fills of the second one
+    second_df = asyncio.run(resumed.run())
+    assert sorted(second_df["depositId"])[:LAG] == list(range(100, 100 + LAG))
+    assert sorted(pl.concat([first_df, second_df])["depositId"]) == sorted(
+        expected_df["depositId"]
+    )
+    assert resumed.open_deposits.equals(make_matcher(tmp_path / "single").open_deposits)
+
+
+def test_interrupted_save_keeps_the_previous_state(tmp_path, monkeypatch):
+    matcher = make_matcher(tmp_path)
+    set_height(matcher, 100)
+    asyncio.run(matcher.run())
+    generation = matcher._generation
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("hypermanager.matching.os.replace", fail)
+    set_height(matcher, 200)
+    with pytest.raises(OSError):
+        asyncio.run(matcher.run())
+    monkeypatch.undo()
+
+    resumed = make_matcher(tmp_path)
+    assert resumed._generation == generation
+    assert set(resumed.checkpoints.values()) == {100}
+    assert sorted(resumed.open_deposits["depositId"]) == list(range(100, 100 + LAG))
+
+
+def test_pairs_after_the_last_save_are_emitted_again(tmp_path):
+    matcher = make_matcher(tmp_path, save_interval=1_000)
+
+    async def first_pairs():
+        matches = matcher.stream_matches()
+        pairs_df = await matches.__anext__()
+        await matches.aclose()
+        return pairs_df
+
+    first_df = asyncio.run(first_pairs())
+    # the interrupted run saved nothing, so the next run starts over
+    assert not os.path.exists(matcher.state_path)
+    pairs_df = asyncio.run(make_matcher(tmp_path).run())
+    assert set(first_df["depositId"]) <= set(pairs_df["depositId"])
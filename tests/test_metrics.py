@@ -0,0 +1,42 @@
+import asyncio
+import logging
+
+from hypermanager.decorators import timer
+from hypermanager.metrics import Metrics, PrometheusTextfileSink, QueryMetrics
+
+
+def test_prometheus_sink_buffers_writes_until_flush(tmp_path):
+    path = tmp_path / "hypermanager.prom"
+    sink = PrometheusTextfileSink(str(path), flush_interval=3600)
+    metrics = Metrics(sinks=[sink])
+
+    metrics.record(QueryMetrics(method="execute_event_query", chain="eth", rows=1))
+    assert "hypermanager_queries_total" in path.read_text()
+
+    metrics.record(QueryMetrics(method="execute_event_query", chain="eth", rows=2))
+    assert 'hypermanager_rows_total{method="execute_event_query",chain="eth",event=""} 1' in (
+        path.read_text()
+    )
+
+    metrics.flush()
+    assert 'hypermanager_rows_total{method="execute_event_query",chain="eth",event=""} 3' in (
+        path.read_text()
+    )
+
+
+def test_timer_logs_instead_of_printing(capsys, caplog):
+    class Manager:
+        chain = "eth"
+        metrics = None
+
+        @timer
+        async def query(self):
+            return None
+
+    with caplog.at_level(logging.INFO, logger="hypermanager"):
+        asyncio.run(Manager().query())
+        asyncio.run(Manager().query(print_time=False))
+
+    assert capsys.readouterr().out == ""
+    messages = [r.getMessage() for r in caplog.records if r.name == "hypermanager"]
+    assert len(messages) == 1 and messages[0].startswith("query query finished in")
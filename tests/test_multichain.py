@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+from hypermanager.dataset import DatasetWriter
+from support import TRANSFER, make_multichain
+
+
+def test_saved_queries_return_no_data(tmp_path):
+    multichain = make_multichain(dataset=DatasetWriter(str(tmp_path)))
+    results = asyncio.run(
+        multichain.execute_event_queries(
+            TRANSFER, from_block=0, to_block=100, save_data=True
+        )
+    )
+    assert results == {}
+    assert any(tmp_path.iterdir())
+
+
+def test_invalid_queries_are_raised():
+    multichain = make_multichain()
+    with pytest.raises(ValueError, match="Unknown transaction or block column"):
+        asyncio.run(
+            multichain.execute_event_queries(
+                TRANSFER, from_block=0, to_block=100, columns=["not_a_column"]
+            )
+        )
+
+
+def test_empty_chains_are_skipped():
+    multichain = make_multichain()
+    # the mock serves no logs beyond its height
+    results = asyncio.run(
+        multichain.execute_event_queries(TRANSFER, from_block=2_000, to_block=2_100)
+    )
+    assert results == {}
@@ -0,0 +1,126 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import List
+
+import hypersync
+import polars as pl
+import pytest
+
+from hypermanager.pools import UniswapV3Pools
+from hypermanager.protocols.uniswap_v3 import UniswapV3FactoryAddresses
+from mock_client import MockHypersyncClient
+from support import make_manager
+
+START_BLOCK = 1_000
+
+
+@dataclass
+class RecordingClient(MockHypersyncClient):
+    """
+    A mock client recording the queries it receives.
+
+    Attributes:
+        queries (List[hypersync.Query]): The queries received so far.
+    """
+
+    queries: List[hypersync.Query] = field(init=False, default_factory=list)
+
+    async def collect_arrow(self, query, config):
+        self.queries.append(query)
+        return await super().collect_arrow(query, config)
+
+
+def make_pools(tmp_path, binary_output: bool = False) -> UniswapV3Pools:
+    client = RecordingClient(height=START_BLOCK + 100, logs_per_block=2)
+    return UniswapV3Pools(
+        make_manager(client, binary_output=binary_output),
+        UniswapV3FactoryAddresses.BASE,
+        str(tmp_path),
+        start_block=START_BLOCK,
+    )
+
+
+def hex_addresses(values: pl.Series) -> List[str]:
+    return [
+        "0x" + value.hex() if isinstance(value, bytes) else value.lower()
+        for value in values
+    ]
+
+
+def test_nothing_is_discovered_before_the_first_sync(tmp_path):
+    pools = make_pools(tmp_path)
+    assert pools.pools().is_empty()
+    assert pools.pool_addresses(fees=[500]) == []
+
+
+@pytest.mark.parametrize("binary_output", [False, True])
+def test_pools_are_filtered_by_token(tmp_path, binary_output):
+    pools = make_pools(tmp_path, binary_output=binary_output)
+    created_df = asyncio.run(pools.sync())
+    assert created_df.height == 200
+    (query,) = pools.manager.client.queries
+    assert query.logs[0].address == [UniswapV3FactoryAddresses.BASE.value.lower()]
+
+    pools_df = pools.pools()
+    token0 = hex_addresses(pools_df["token0"])
+    token1 = hex_addresses(pools_df["token1"])
+    addresses = hex_addresses(pools_df["pool"])
+    assert pools.pool_addresses() == addresses
+
+    # checksummed tokens match either side of a pool
+    tokens = [token0[3].upper().replace("0X", "0x"), token1[7]]
+    assert pools.pool_addresses(tokens=tokens) == [addresses[3], addresses[7]]
+    assert pools.pools(tokens=tokens).height == 2
+    assert pools.pool_addresses(tokens=["0x" + "00" * 20]) == []
+
+
+def test_pools_are_filtered_by_fee(tmp_path):
+    pools = make_pools(tmp_path)
+    asyncio.run(pools.sync())
+    pools_df = pools.pools()
+    addresses = pools.pool_addresses()
+    # the mock creates every pool with a fee tier of its own
+    fees = [int(fee) for fee in pools_df["fee"][:3]]
+
+    assert pools.pools(fees=fees)["fee"].to_list() == [float(fee) for fee in fees]
+    assert pools.pool_addresses(fees=fees) == addresses[:3]
+    assert pools.pools(fees=[]).is_empty()
+
+    # the token and fee filters apply together
+    tokens = list(pools_df["token0"][:2])
+    assert pools.pool_addresses(tokens=tokens, fees=fees[1:]) == [addresses[1]]
+    assert pools.pool_addresses(tokens=tokens[:1], fees=fees[1:]) == []
+
+
+def test_swaps_are_only_queried_for_the_matching_pools(tmp_path):
+    pools = make_pools(tmp_path)
+    client = pools.manager.client
+    asyncio.run(pools.sync())
+    tokens = list(pools.pools()["token0"][:5])
+
+    client.height += 100
+    client.queries.clear()
+    swaps_df = asyncio.run(
+        pools.get_swaps(START_BLOCK, client.height, tokens=tokens, print_time=False)
+    )
+
+    # the new pools are synced before the swaps are queried
+    pools_query, swaps_query = client.queries
+    assert pools_query.from_block == START_BLOCK + 100
+    assert pools.pools().height == 400
+
+    matching = pools.pool_addresses(tokens=tokens)
+    assert len(matching) == 5
+    assert sorted(
+        address for selection in swaps_query.logs for address in selection.address
+    ) == sorted(matching)
+    assert "address" in swaps_df.columns
+    assert set(swaps_df["address"]) <= set(matching)
+    assert (
+        asyncio.run(
+            pools.get_swaps(
+                START_BLOCK, client.height, tokens=["0x" + "00" * 20], print_time=False
+            )
+        )
+        is None
+    )
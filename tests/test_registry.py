@@ -0,0 +1,132 @@
+import asyncio
+from collections import Counter
+
+import hypersync
+import pytest
+
+from hypermanager.events import EventConfig
+from hypermanager.protocols.uniswap_v3 import uniswap_config
+from hypermanager.registry import EventRegistry, get_event_registry, partition_logs
+from support import APPROVAL, TRANSFER, make_manager
+
+POOL = "0x" + "ab" * 20
+OTHER_POOL = "0x" + "cd" * 20
+# the same signature as `TRANSFER`, bound to a contract and under another name
+POOL_TRANSFER = EventConfig(
+    name="PoolTransfer",
+    signature=TRANSFER.signature,
+    contract=POOL.upper().replace("0X", "0x"),
+)
+
+
+def make_registry() -> EventRegistry:
+    registry = EventRegistry()
+    for event_config in [TRANSFER, POOL_TRANSFER, APPROVAL, TRANSFER]:
+        registry.register(event_config)
+    return registry
+
+
+def test_configs_are_indexed_by_topic_name_and_contract():
+    registry = make_registry()
+    topic0 = TRANSFER.get_topic()
+
+    # registering a configuration twice keeps a single entry
+    assert len(registry) == 3
+    assert registry.topics() == [topic0, APPROVAL.get_topic()]
+    assert registry.by_topic[topic0] == [TRANSFER, POOL_TRANSFER]
+    assert registry.get("Transfer") == [TRANSFER]
+    assert registry.get("Swap") == []
+    assert registry.for_contract(POOL.upper().replace("0X", "0x")) == [POOL_TRANSFER]
+    assert registry.by_contract[None] == [TRANSFER, APPROVAL]
+    assert list(registry) == [TRANSFER, POOL_TRANSFER, APPROVAL]
+
+
+@pytest.mark.parametrize(
+    "topic0",
+    [
+        TRANSFER.get_topic(),
+        TRANSFER.get_topic().upper().replace("0X", "0x"),
+        bytes.fromhex(TRANSFER.get_topic()[2:]),
+    ],
+)
+def test_lookup_prefers_the_configuration_of_the_contract(topic0):
+    registry = make_registry()
+
+    assert topic0 in registry
+    assert registry.lookup(topic0, POOL) is POOL_TRANSFER
+    assert registry.lookup(topic0, bytes.fromhex(POOL[2:])) is POOL_TRANSFER
+    # other contracts get the configuration of any contract
+    assert registry.lookup(topic0, OTHER_POOL) is TRANSFER
+    assert registry.lookup(topic0) is TRANSFER
+
+
+def test_lookup_of_configs_bound_to_other_contracts():
+    registry = EventRegistry()
+    registry.register(POOL_TRANSFER)
+    topic0 = POOL_TRANSFER.get_topic()
+
+    assert registry.lookup(topic0, OTHER_POOL) is None
+    # without the contract of the log, any configuration of the topic matches
+    assert registry.lookup(topic0) is POOL_TRANSFER
+    assert registry.lookup("0x" + "00" * 32) is None
+    assert "0x" + "00" * 32 not in registry
+
+
+def test_topic_table_labels_raw_logs():
+    registry = make_registry()
+    table = registry.topic_table()
+    assert table.columns == ["topic0", "contract", "name", "signature"]
+    assert table["name"].to_list() == ["Transfer", "PoolTransfer", "Approval"]
+    assert table["contract"].to_list() == [None, POOL, None]
+
+    binary_table = registry.topic_table(binary=True)
+    assert binary_table["topic0"].to_list()[0] == bytes.fromhex(
+        TRANSFER.get_topic()[2:]
+    )
+    assert binary_table["contract"].to_list()[1] == bytes.fromhex(POOL[2:])
+
+
+@pytest.mark.parametrize("binary_output", [False, True])
+def test_logs_of_the_mock_client_resolve_to_their_configs(binary_output):
+    manager = make_manager(height=1_000, logs_per_block=2, binary_output=binary_output)
+    registry = make_registry()
+    query = manager._create_query(
+        from_block=0,
+        to_block=10,
+        logs=[
+            hypersync.LogSelection(address=[POOL], topics=[[TRANSFER.get_topic()]]),
+            hypersync.LogSelection(
+                address=[OTHER_POOL], topics=[[TRANSFER.get_topic()]]
+            ),
+            hypersync.LogSelection(topics=[[APPROVAL.get_topic()]]),
+            hypersync.LogSelection(topics=[["0x" + "00" * 31 + "01"]]),
+        ],
+        field_selection=manager._create_field_selection(
+            [], log_fields=[hypersync.LogField.ADDRESS, hypersync.LogField.TOPIC0]
+        ),
+    )
+    config = hypersync.StreamConfig(hex_output=manager.hex_output)
+    data = asyncio.run(manager.client.collect_arrow(query, config))
+    logs_df = manager._process_raw_logs(data.data, tx_data=False)
+
+    names = Counter()
+    for topic0, topic_df in partition_logs(logs_df).items():
+        for contract in topic_df["address"]:
+            event_config = registry.lookup(topic0, contract)
+            names[event_config.name if event_config else None] += 1
+    assert names == {"PoolTransfer": 20, "Transfer": 20, "Approval": 20, None: 20}
+
+
+def test_bundled_registry_holds_every_protocol():
+    registry = get_event_registry()
+    assert registry is get_event_registry()
+    assert registry.by_protocol["uniswap_v3"] == uniswap_config
+    assert set(registry.by_protocol) == {
+        "across",
+        "mev_commit",
+        "mev_commit_validator",
+        "uniswap_v3",
+    }
+    swap = uniswap_config["Swap"]
+    assert registry.lookup(swap.get_topic()) is swap
+    assert swap in registry.get(swap.name)
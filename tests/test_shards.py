@@ -0,0 +1,83 @@
+import asyncio
+from dataclasses import dataclass
+
+import pytest
+
+from mock_client import MockHypersyncClient
+from support import TRANSFER, make_manager
+
+# decoded addresses and transaction hashes are derived from the block, so they match across shards
+KEY = ["block_number", "hash", "src", "dst"]
+
+
+@dataclass
+class OvershootingClient(MockHypersyncClient):
+    """
+    A mock client whose responses run `overshoot` blocks past the end of the query, like a server that rounds the
+    end of a response up to its page boundary.
+
+    Attributes:
+        overshoot (int): The number of blocks served past the end of the query. Defaults to 10.
+    """
+
+    overshoot: int = 10
+
+    async def collect_arrow(self, query, config):
+        to_block = min(query.to_block + self.overshoot, self.height)
+        return self._cached_response(query, config, query.from_block, to_block)
+
+
+@pytest.mark.parametrize(
+    "from_block, to_block, shards",
+    [(0, 100, 4), (0, 101, 4), (10, 13, 8), (5, 6, 3), (0, 1_000, 1), (0, 7, 7)],
+)
+def test_split_block_range_covers_the_range_once(from_block, to_block, shards):
+    shard_ranges = make_manager()._split_block_range(from_block, to_block, shards)
+
+    assert len(shard_ranges) <= max(1, min(shards, to_block - from_block))
+    assert shard_ranges[0][0] == from_block and shard_ranges[-1][1] == to_block
+    # every shard starts where the previous one ends
+    for (_, previous_to), (shard_from, shard_to) in zip(shard_ranges, shard_ranges[1:]):
+        assert shard_from == previous_to and shard_from < shard_to
+
+
+# more shards than blocks leaves a shard per block
+@pytest.mark.parametrize("to_block, shards", [(400, 2), (400, 3), (400, 7), (110, 50)])
+def test_sharded_event_query_matches_the_single_query(to_block, shards):
+    manager = make_manager(height=1_000, logs_per_block=2)
+    expected = asyncio.run(
+        manager.execute_event_query(TRANSFER, 100, to_block, print_time=False)
+    )
+    df = asyncio.run(
+        manager.execute_event_query(
+            TRANSFER, 100, to_block, print_time=False, shards=shards
+        )
+    )
+    assert df.select(KEY).equals(expected.select(KEY))
+
+
+def test_shards_drop_the_rows_past_their_boundary():
+    client = OvershootingClient(height=1_000, logs_per_block=2)
+    df = asyncio.run(
+        make_manager(client).execute_event_query(
+            TRANSFER, 100, 400, print_time=False, shards=4
+        )
+    )
+    # without trimming, the first blocks of every later shard and the blocks past the query would be returned
+    assert df["block_number"].to_list() == [
+        block for block in range(100, 400) for _ in range(2)
+    ]
+    assert df.select(KEY).is_duplicated().sum() == 0
+
+
+def test_sharded_txs_and_blocks_match_the_single_query():
+    manager = make_manager(height=1_000, logs_per_block=2)
+    txs = asyncio.run(manager.get_txs(0, 500, print_time=False))
+    sharded_txs = asyncio.run(manager.get_txs(0, 500, print_time=False, shards=6))
+    key = ["block_number", "hash"]
+    assert sharded_txs.select(key).equals(txs.select(key))
+
+    blocks = asyncio.run(manager.get_blocks(0, 500, print_time=False))
+    sharded_blocks = asyncio.run(manager.get_blocks(0, 500, print_time=False, shards=6))
+    assert sharded_blocks["number"].to_list() == list(range(500))
+    assert sharded_blocks["number"].equals(blocks["number"])
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from support import TRANSFER, FlakyClient, make_manager
+
+# decoded addresses and transaction hashes are derived from the block, so they match across pages
+KEY = ["block_number", "hash", "src", "dst"]
+
+
+async def stream(manager) -> list:
+    return [df async for df in manager.stream_event_query(TRANSFER, 0, 5_000)]
+
+
+def make_client(**kwargs) -> FlakyClient:
+    return FlakyClient(height=5_000, logs_per_block=2, page_blocks=1_000, **kwargs)
+
+
+def test_stream_yields_the_pages_of_the_event_query():
+    manager = make_manager(make_client())
+    batches = asyncio.run(stream(manager))
+    expected = asyncio.run(
+        manager.execute_event_query(TRANSFER, 0, 5_000, print_time=False)
+    )
+
+    assert len(batches) == 5
+    assert all(df["block_number"].n_unique() == 1_000 for df in batches)
+    streamed = [df.select(KEY) for df in batches]
+    assert sum(df.height for df in streamed) == expected.height
+    for df, page_from in zip(streamed, range(0, 5_000, 1_000)):
+        assert df.equals(
+            expected.select(KEY).filter(
+                (expected["block_number"] >= page_from)
+                & (expected["block_number"] < page_from + 1_000)
+            )
+        )
+
+
+def test_failed_stream_reopens_after_the_last_batch():
+    client = make_client(recv_failures=(2, 4, 5))
+    batches = asyncio.run(stream(make_manager(client)))
+
+    blocks = [block for df in batches for block in df["block_number"].unique()]
+    assert blocks == list(range(5_000))
+    assert client.stream_from_blocks == [0, 1_000, 2_000, 2_000]
+    assert all(not stream.pages for stream in client.streams)
+
+
+def test_stream_raises_once_retries_are_exhausted():
+    client = make_client(recv_failures=range(2, 100))
+    with pytest.raises(ConnectionError):
+        asyncio.run(stream(make_manager(client)))
+    # the first retry and `max_retries` reopened streams all start after the first batch
+    assert client.stream_from_blocks == [0] + [1_000] * 5
+
+
+def test_stream_raises_invalid_queries_without_reopening():
+    client = make_client(recv_failures=(1,), recv_error=ValueError("invalid query"))
+    with pytest.raises(ValueError):
+        asyncio.run(stream(make_manager(client)))
+    assert client.stream_from_blocks == [0]
+
+
+def test_consumer_exit_closes_the_stream():
+    client = make_client()
+    manager = make_manager(client)
+
+    async def first_batch():
+        batches = manager.stream_event_query(TRANSFER, 0, 5_000)
+        df = await batches.__anext__()
+        await batches.aclose()
+        return df
+
+    assert asyncio.run(first_batch())["block_number"].max() == 999
+    (opened,) = client.streams
+    assert opened.pages == []
@@ -0,0 +1,105 @@
+import asyncio
+import os
+
+import pytest
+
+from hypermanager.sync import SyncJob
+from mock_client import MockHypersyncClient
+from support import TRANSFER, make_manager
+
+
+def make_job(tmp_path, manager, **kwargs) -> SyncJob:
+    return SyncJob(
+        manager=manager,
+        event_config=TRANSFER,
+        path=str(tmp_path),
+        start_block=900,
+        columns=["block_number", "address", "hash"],
+        **kwargs,
+    )
+
+
+def test_runs_resume_from_the_checkpoint(tmp_path):
+    client = MockHypersyncClient(height=1_000, logs_per_block=1)
+    job = make_job(tmp_path, make_manager(client))
+
+    first_df = asyncio.run(job.run())
+    assert first_df["block_number"].min() == 900
+    assert job.get_checkpoint() == 1_000
+    assert asyncio.run(job.run()) is None
+
+    client.height = 1_100
+    second_df = asyncio.run(job.run())
+    assert second_df["block_number"].min() == 1_000
+    assert job.get_checkpoint() == 1_100
+
+    # a new job of the same query resumes from the same checkpoint
+    synced_df = make_job(tmp_path, make_manager(client, url=job.manager.url)).read()
+    assert synced_df.height == 200
+    assert synced_df["block_number"].is_sorted()
+    assert synced_df.select("block_number", "hash").is_duplicated().sum() == 0
+    assert job._part_files() == ["part-900-1000.parquet", "part-1000-1100.parquet"]
+
+
+def test_failed_checkpoint_write_keeps_the_previous_checkpoint(tmp_path, monkeypatch):
+    client = MockHypersyncClient(height=1_000, logs_per_block=1)
+    job = make_job(tmp_path, make_manager(client))
+    asyncio.run(job.run())
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    client.height = 1_100
+    monkeypatch.setattr("hypermanager.sync.json.dump", fail)
+    with pytest.raises(OSError):
+        asyncio.run(job.run())
+    monkeypatch.undo()
+
+    # the checkpoint is intact and the part file it does not commit is not read
+    assert job.get_checkpoint() == 1_000
+    assert "part-1000-1100.parquet" in job._part_files()
+    assert job.read().height == 100
+
+
+def test_parts_beyond_the_checkpoint_are_removed_before_syncing(tmp_path):
+    client = MockHypersyncClient(height=1_000, logs_per_block=1)
+    job = make_job(tmp_path, make_manager(client))
+    asyncio.run(job.run())
+
+    # a crashed run that wrote a part file without advancing the checkpoint
+    orphan_df = job.read().head(3)
+    orphan_df.write_parquet(os.path.join(job.job_path, "part-1000-1050.parquet"))
+
+    client.height = 1_100
+    asyncio.run(job.run())
+    assert job._part_files() == ["part-900-1000.parquet", "part-1000-1100.parquet"]
+    synced_df = job.read()
+    assert synced_df.height == 200
+    assert synced_df.select("block_number", "hash").is_duplicated().sum() == 0
+
+
+def test_filters_sync_into_checkpoints_of_their_own(tmp_path):
+    manager = make_manager()
+    contracts = ["0x" + "11" * 20, "0x" + "22" * 20]
+    topic = "0x" + "00" * 31 + "01"
+    jobs = [
+        make_job(tmp_path, manager),
+        make_job(tmp_path, manager, address="0x" + "33" * 20),
+        make_job(tmp_path, manager, contracts=contracts),
+        make_job(tmp_path, manager, contracts=contracts[::-1] + [contracts[0]]),
+        make_job(tmp_path, manager, contracts=[]),
+        make_job(tmp_path, manager, topic_filters={2: [topic]}),
+    ]
+    keys = [job.key for job in jobs]
+    # the same contract set in another order shares its checkpoint
+    assert keys[2] == keys[3]
+    assert len(set(keys)) == 5
+
+    synced_df = asyncio.run(jobs[2].run())
+    assert set(synced_df["address"]) <= set(contracts)
+    assert jobs[2].get_checkpoint() == 1_000
+    assert jobs[0].get_checkpoint() == 900
+
+    # an empty contract set matches no logs, but still advances its checkpoint
+    assert asyncio.run(jobs[4].run()) is None
+    assert jobs[4].get_checkpoint() == 1_000
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from support import ERC20_TRANSFER, make_manager
+
+
+@pytest.mark.parametrize("binary_output", [False, True])
+def test_event_query_suffixes_colliding_tx_columns(binary_output):
+    manager = make_manager(
+        height=20_000_100, logs_per_block=2, binary_output=binary_output
+    )
+    df = asyncio.run(
+        manager.execute_event_query(
+            ERC20_TRANSFER, 20_000_000, 20_000_100, print_time=False
+        )
+    )
+    assert {"from", "to", "value", "from_right", "to_right", "hash"} <= set(df.columns)
+    assert df.height == 200
+
+    df = asyncio.run(
+        manager.execute_event_query(
+            ERC20_TRANSFER,
+            20_000_000,
+            20_000_100,
+            columns=["to", "timestamp"],
+            print_time=False,
+        )
+    )
+    assert df.columns == ["from", "to", "value", "hash", "to_right", "timestamp"]
+
+
+@pytest.mark.parametrize("binary_output", [False, True])
+def test_events_query_suffixes_colliding_tx_columns(binary_output):
+    manager = make_manager(
+        height=20_000_100, logs_per_block=2, binary_output=binary_output
+    )
+    event_dfs = asyncio.run(
+        manager.execute_events_query(
+            [ERC20_TRANSFER], 20_000_000, 20_000_100, print_time=False
+        )
+    )
+    single_df = asyncio.run(
+        manager.execute_event_query(
+            ERC20_TRANSFER, 20_000_000, 20_000_100, print_time=False
+        )
+    )
+    assert set(event_dfs["Transfer"].columns) == set(single_df.columns)
+    assert event_dfs["Transfer"].height == single_df.height
@@ -0,0 +1,117 @@
+import asyncio
+import math
+
+import polars as pl
+import pytest
+
+from hypermanager.txindex import TxIndex
+from mock_client import BLOCK_TIME, GENESIS_TIMESTAMP, tx_hash
+from support import make_manager
+
+
+def test_group_splits_indexed_hashes_by_block_gap():
+    index = TxIndex()
+    index.update(
+        pl.DataFrame(
+            {
+                "hash": ["0xAA", "0xbb", "0xcc", "0xdd"],
+                "block_number": [100, 5, 150, 400],
+            }
+        )
+    )
+    groups, unindexed = index.group(["0xaa", "0xBB", "0xcc", "0xdd", "0xee"], 100)
+    assert groups == [(5, 151, ["0xBB", "0xaa", "0xcc"]), (400, 401, ["0xdd"])]
+    assert unindexed == ["0xee"]
+
+    groups, _ = index.group(["0xaa", "0xcc", "0xdd"], 49)
+    assert [group[:2] for group in groups] == [(100, 101), (150, 151), (400, 401)]
+
+
+def test_update_indexes_binary_hashes_and_ignores_other_data():
+    index = TxIndex()
+    index.update(pl.DataFrame({"hash": [bytes([0xAB] * 32)], "block_number": [7]}))
+    index.update(pl.DataFrame({"hash": ["0x01"]}))
+    assert index.get("0x" + "AB" * 32) == 7
+    assert len(index) == 1
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "txs.parquet")
+    index = TxIndex(path)
+    index.update(pl.DataFrame({"hash": ["0xaa", "0xbb"], "block_number": [1, 2]}))
+    index.save()
+
+    loaded = TxIndex(path)
+    assert loaded.blocks == {"0xaa": 1, "0xbb": 2}
+    assert TxIndex(str(tmp_path / "missing.parquet")).blocks == {}
+    with pytest.raises(ValueError):
+        TxIndex().save()
+
+
+def test_search_of_indexed_txs_skips_the_height_lookup():
+    manager = make_manager(tx_index=TxIndex())
+    hashes = [tx_hash(500, 0), tx_hash(510, 0), tx_hash(900, 0)]
+    manager.tx_index.update(
+        pl.DataFrame({"hash": hashes, "block_number": [500, 510, 900]})
+    )
+
+    async def no_height(*args, **kwargs):
+        raise AssertionError("the height is not needed")
+
+    manager._get_height = no_height
+    df = asyncio.run(
+        manager.search_txs(
+            hashes, print_time=False, columns=["hash", "block_number"], from_timestamp=1
+        )
+    )
+    assert df["hash"].to_list() == hashes
+
+
+def count_timestamp_queries(manager) -> list:
+    queries = []
+    get_block_timestamp = manager._get_block_timestamp
+
+    async def counted(block_number):
+        queries.append(block_number)
+        return await get_block_timestamp(block_number)
+
+    manager._get_block_timestamp = counted
+    return queries
+
+
+def test_block_by_timestamp_interpolates_the_block_time():
+    manager = make_manager(height=20_000_000)
+    queries = count_timestamp_queries(manager)
+    for block in [0, 1, 777, 12_345_678, 19_999_999]:
+        for timestamp in [
+            GENESIS_TIMESTAMP + block * BLOCK_TIME - offset for offset in (0, 5)
+        ]:
+            queries.clear()
+            assert asyncio.run(manager._get_block_by_timestamp(timestamp)) == block
+            # the bounds and a few interpolation steps, instead of 25 bisection steps
+            assert len(queries) <= 6
+    assert asyncio.run(manager._get_block_by_timestamp(0)) == 0
+    assert asyncio.run(manager._get_block_by_timestamp(2**40)) == 20_000_000
+
+
+def test_block_by_timestamp_is_bounded_for_irregular_block_times():
+    height = 1_000_000
+    manager = make_manager(height=height)
+
+    async def timestamp_of(block_number):
+        # a slow chain that speeds up, with a long halt at block 500,000
+        return block_number**2 // 1_000 + (10**9 if block_number >= 500_000 else 0)
+
+    manager._get_block_timestamp = timestamp_of
+    queries = count_timestamp_queries(manager)
+    for block in [1, 123_456, 499_999, 500_000, 500_001, 999_999]:
+        expected = block
+        # blocks with the same timestamp resolve to the first of them
+        while expected > 0 and asyncio.run(timestamp_of(expected - 1)) == asyncio.run(
+            timestamp_of(block)
+        ):
+            expected -= 1
+        queries.clear()
+        timestamp = asyncio.run(timestamp_of(block))
+        assert asyncio.run(manager._get_block_by_timestamp(timestamp)) == expected
+        assert len(queries) <= 2 * math.ceil(math.log2(height)) + 2
@@ -0,0 +1,58 @@
+import asyncio
+
+import polars as pl
+import pytest
+from hypersync import ColumnMapping, DataType
+
+from hypermanager.events import EventConfig
+from hypermanager.protocols.mev_commit import mev_commit_config
+from hypermanager.uint256 import UINT256, uint256_sum, uint256_to_int_string
+from support import make_manager
+
+
+@pytest.mark.parametrize("binary_output", [False, True])
+def test_event_query_returns_uint256_columns(binary_output):
+    manager = make_manager(
+        height=20_000_100, logs_per_block=2, binary_output=binary_output
+    )
+    df = asyncio.run(
+        manager.execute_event_query(
+            mev_commit_config["FundsRewarded"],
+            20_000_000,
+            20_000_010,
+            print_time=False,
+        )
+    )
+    assert df.schema["amount"] == UINT256
+    assert df.schema["window"] == pl.UInt64
+
+    amounts = df.select(uint256_to_int_string(pl.col("amount")))["amount"]
+    assert amounts.to_list() == [str(i) for i in range(df.height)]
+    total = df.select(uint256_to_int_string(uint256_sum(pl.col("amount"))))
+    assert total.item() == str(sum(range(df.height)))
+
+
+@pytest.mark.parametrize("binary_output", [False, True])
+def test_events_query_returns_uint256_columns(binary_output):
+    manager = make_manager(
+        height=20_000_100, logs_per_block=2, binary_output=binary_output
+    )
+    event_dfs = asyncio.run(
+        manager.execute_events_query(
+            [mev_commit_config["FundsRewarded"]],
+            20_000_000,
+            20_000_010,
+            print_time=False,
+        )
+    )
+    assert event_dfs["FundsRewarded"].schema["amount"] == UINT256
+
+
+def test_mapped_uint256_column_raises():
+    with pytest.raises(ValueError):
+        EventConfig(
+            name="Transfer",
+            signature="Transfer(address indexed src, address indexed dst, uint256 wad)",
+            column_mapping=ColumnMapping(decoded_log={"wad": DataType.INTSTR}),
+            uint256_columns=["wad"],
+        )